@@ -0,0 +1,611 @@
+#!/usr/bin/env python3
+"""
+Streaming reader for DummyJSON-style product dumps
+
+json.load() keeps the whole `products` list in memory. Paginated API dumps
+({"products": [...], "total": ..., "skip": ..., "limit": ...}) are often
+concatenated into one multi-GB file, one page object after another. This
+module reads such files one product at a time, turns each product into
+products / reviews / tags rows, writes them out in batches (DuckDB or
+Parquet) and keeps running data-quality statistics, so memory stays flat
+no matter how large the file is.
+
+Only the standard library is needed to read and check a file. Writing
+batches needs pyarrow (Parquet) or duckdb + pyarrow (DuckDB).
+
+Usage:
+    from products_stream import iter_products, StreamStats
+
+    stats = StreamStats()
+    for product in iter_products('data/products.json'):
+        stats.add(product)
+
+    # Or through the validator:
+    python validation_check.py --stream --data dump.json --duckdb techmart.duckdb
+    python validation_check.py --stream --data dump.json --parquet out/
+"""
+
+import json
+import math
+import os
+import shutil
+import tempfile
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+
+CHUNK_SIZE = 1024 * 1024
+WHITESPACE = ' \t\n\r'
+DEFAULT_BATCH_SIZE = 50_000
+
+# Normalized table layouts: column -> (pyarrow type name, DuckDB type)
+PRODUCT_SCHEMA = {
+    'id': ('int64', 'BIGINT'),
+    'title': ('string', 'VARCHAR'),
+    'description': ('string', 'VARCHAR'),
+    'category': ('string', 'VARCHAR'),
+    'price': ('float64', 'DOUBLE'),
+    'discountPercentage': ('float64', 'DOUBLE'),
+    'rating': ('float64', 'DOUBLE'),
+    'stock': ('int64', 'BIGINT'),
+    'brand': ('string', 'VARCHAR'),
+    'sku': ('string', 'VARCHAR'),
+    'weight': ('float64', 'DOUBLE'),
+    'warrantyInformation': ('string', 'VARCHAR'),
+    'shippingInformation': ('string', 'VARCHAR'),
+    'availabilityStatus': ('string', 'VARCHAR'),
+    'returnPolicy': ('string', 'VARCHAR'),
+    'minimumOrderQuantity': ('int64', 'BIGINT'),
+    'thumbnail': ('string', 'VARCHAR'),
+    'width': ('float64', 'DOUBLE'),
+    'height': ('float64', 'DOUBLE'),
+    'depth': ('float64', 'DOUBLE'),
+    'created_at': ('timestamp', 'TIMESTAMPTZ'),
+    'updated_at': ('timestamp', 'TIMESTAMPTZ'),
+    'barcode': ('string', 'VARCHAR'),
+    'qr_code': ('string', 'VARCHAR'),
+}
+REVIEW_SCHEMA = {
+    'review_id': ('int64', 'BIGINT'),
+    'product_id': ('int64', 'BIGINT'),
+    'rating': ('int64', 'BIGINT'),
+    'comment': ('string', 'VARCHAR'),
+    'date': ('timestamp', 'TIMESTAMPTZ'),
+    'reviewer_name': ('string', 'VARCHAR'),
+    'reviewer_email': ('string', 'VARCHAR'),
+}
+TAG_SCHEMA = {
+    'product_id': ('int64', 'BIGINT'),
+    'tag': ('string', 'VARCHAR'),
+}
+TABLES = {'products': PRODUCT_SCHEMA, 'reviews': REVIEW_SCHEMA, 'tags': TAG_SCHEMA}
+
+
+class ProductStreamError(ValueError):
+    """Raised when the file is not a sequence of product page objects."""
+    pass
+
+
+# ----------------------------------------------------------------------
+# Reading
+# ----------------------------------------------------------------------
+
+class ProductReader:
+    """
+    Incremental reader for one or more concatenated page objects.
+
+    Products are decoded one at a time with json.JSONDecoder.raw_decode()
+    from a buffer refilled from the file. Other page fields (total, skip,
+    limit) are collected in `pages`, one dict per page object.
+
+    The buffer handling mirrors scripts/notebook_stream.NotebookReader on
+    purpose: this folder is handed to students on its own, so it cannot
+    import from scripts/, and a dump is a sequence of top-level objects
+    rather than the single object a notebook is.
+    """
+
+    def __init__(self, path, chunk_size: int = CHUNK_SIZE):
+        self.path = path
+        self.chunk_size = chunk_size
+        self.pages: List[Dict[str, Any]] = []
+        self._decoder = json.JSONDecoder()
+        self._file = None
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        with open(self.path, 'r', encoding='utf-8') as self._file:
+            while True:
+                self._skip_whitespace()
+                if not self._fill():
+                    return
+                if not self._expect('{'):
+                    raise ProductStreamError(f"Expecting '{{' at start of page {len(self.pages) + 1}")
+                yield from self._iter_page()
+
+    def _iter_page(self) -> Iterator[Dict[str, Any]]:
+        page = {'products': 0}
+        self.pages.append(page)
+
+        self._skip_whitespace()
+        if self._expect('}'):
+            return
+        while True:
+            self._skip_whitespace()
+            key = self._decode_value()
+            self._skip_whitespace()
+            if not isinstance(key, str) or not self._expect(':'):
+                raise ProductStreamError(f"Malformed member in page {len(self.pages)}")
+            self._skip_whitespace()
+
+            if key == 'products':
+                if not self._expect('['):
+                    raise ProductStreamError("'products' must be a list")
+                for product in self._iter_array():
+                    page['products'] += 1
+                    yield product
+            else:
+                page[key] = self._decode_value()
+
+            self._skip_whitespace()
+            if self._expect(','):
+                continue
+            if self._expect('}'):
+                return
+            raise ProductStreamError(f"Expecting ',' or '}}' in page {len(self.pages)}")
+
+    def _iter_array(self) -> Iterator[Any]:
+        self._skip_whitespace()
+        if self._expect(']'):
+            return
+        while True:
+            self._skip_whitespace()
+            yield self._decode_value()
+            self._skip_whitespace()
+            if self._expect(','):
+                continue
+            if self._expect(']'):
+                return
+            raise ProductStreamError("Expecting ',' or ']' between products")
+
+    def _fill(self, min_chars: int = 1) -> bool:
+        if len(self._buffer) - self._pos >= min_chars:
+            return True
+        if self._eof:
+            return False
+        self._buffer = self._buffer[self._pos:]
+        self._pos = 0
+        while len(self._buffer) < min_chars and not self._eof:
+            chunk = self._file.read(max(self.chunk_size, min_chars))
+            if not chunk:
+                self._eof = True
+            self._buffer += chunk
+        return len(self._buffer) >= min_chars
+
+    def _skip_whitespace(self):
+        while self._fill():
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return
+
+    def _expect(self, char: str) -> bool:
+        if self._fill() and self._buffer[self._pos] == char:
+            self._pos += 1
+            return True
+        return False
+
+    def _decode_value(self) -> Any:
+        """Decode one value, growing the buffer until it parses (or EOF)."""
+        want = self.chunk_size
+        while True:
+            self._fill(want)
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError as e:
+                if self._eof:
+                    raise ProductStreamError(str(e)) from None
+                want = (len(self._buffer) - self._pos) * 2 + self.chunk_size
+                continue
+            # A number at the very end of the buffer may be truncated
+            if end == len(self._buffer) and not self._eof and not isinstance(value, (dict, list, str)):
+                want = (len(self._buffer) - self._pos) + self.chunk_size
+                continue
+            self._pos = end
+            return value
+
+
+def iter_products(path, chunk_size: int = CHUNK_SIZE) -> Iterator[Dict[str, Any]]:
+    """Yield every product of every page object in the file."""
+    yield from ProductReader(path, chunk_size)
+
+
+# ----------------------------------------------------------------------
+# Normalization
+# ----------------------------------------------------------------------
+
+def _timestamp(value) -> Optional[datetime]:
+    if not isinstance(value, str):
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+def _coerce(value, arrow_type: str):
+    """
+    (value as the column type, True), or (None, False) if it does not fit:
+    int64 takes whole numbers in range, float64 any number, and text
+    columns keep strings and store anything else as JSON text.
+    """
+    if value is None or arrow_type == 'timestamp':
+        return value, True
+    if arrow_type == 'string':
+        return (value if isinstance(value, str) else json.dumps(value)), True
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None, False
+    if arrow_type == 'float64':
+        return float(value), True
+    if isinstance(value, float):
+        if not math.isfinite(value) or not value.is_integer():
+            return None, False
+        value = int(value)
+    return (value, True) if -2 ** 63 <= value < 2 ** 63 else (None, False)
+
+
+def _coerce_row(table: str, row: Dict[str, Any], invalid: Optional[Dict[str, int]]) -> Dict[str, Any]:
+    """Coerce a row in place to TABLES[table]; values that do not fit become NULL."""
+    for column, (arrow_type, _) in TABLES[table].items():
+        row[column], ok = _coerce(row[column], arrow_type)
+        if not ok and invalid is not None:
+            key = f'{table}.{column}'
+            invalid[key] = invalid.get(key, 0) + 1
+    return row
+
+
+def _as_dict(value) -> Dict[str, Any]:
+    return value if isinstance(value, dict) else {}
+
+
+def _as_list(value) -> List[Any]:
+    return value if isinstance(value, list) else []
+
+
+def split_product(product: Dict[str, Any], next_review_id: int,
+                  invalid: Optional[Dict[str, int]] = None
+                  ) -> Tuple[Optional[Dict], List[Dict], List[Dict]]:
+    """
+    Turn one nested product into (product_row, review_rows, tag_rows).
+
+    Values that do not fit their column type (a rating of 4.5, an id of
+    'abc') become NULL so one dirty record cannot abort a whole stream;
+    each is counted in `invalid` under 'table.column'. A product or review
+    that is not a JSON object is skipped (product_row is None for such a
+    product); StreamStats.add() counts them as bad rows.
+    """
+    if not isinstance(product, dict):
+        return None, [], []
+    dimensions = _as_dict(product.get('dimensions'))
+    meta = _as_dict(product.get('meta'))
+    product_id = product.get('id')
+
+    product_row = {column: product.get(column) for column in PRODUCT_SCHEMA}
+    product_row.update({
+        'width': dimensions.get('width'),
+        'height': dimensions.get('height'),
+        'depth': dimensions.get('depth'),
+        'created_at': _timestamp(meta.get('createdAt')),
+        'updated_at': _timestamp(meta.get('updatedAt')),
+        'barcode': meta.get('barcode'),
+        'qr_code': meta.get('qrCode'),
+    })
+
+    review_rows = []
+    reviews = [review for review in _as_list(product.get('reviews')) if isinstance(review, dict)]
+    for offset, review in enumerate(reviews):
+        review_rows.append({
+            'review_id': next_review_id + offset,
+            'product_id': product_id,
+            'rating': review.get('rating'),
+            'comment': review.get('comment'),
+            'date': _timestamp(review.get('date')),
+            'reviewer_name': review.get('reviewerName'),
+            'reviewer_email': review.get('reviewerEmail'),
+        })
+
+    tag_rows = [{'product_id': product_id, 'tag': tag} for tag in _as_list(product.get('tags'))]
+
+    _coerce_row('products', product_row, invalid)
+    for row in review_rows:
+        _coerce_row('reviews', row, invalid)
+    for row in tag_rows:
+        _coerce_row('tags', row, invalid)
+    return product_row, review_rows, tag_rows
+
+
+# ----------------------------------------------------------------------
+# Incremental checks
+# ----------------------------------------------------------------------
+
+class IdSet:
+    """
+    Seen-ID tracker. Integer IDs below MAX_BITMAP_ID go into a bitmap (one
+    bit per possible ID, so 1M IDs cost 125 KB), anything else into a set.
+    """
+
+    MAX_BITMAP_ID = 1 << 30
+
+    def __init__(self):
+        self._bits = bytearray()
+        self._other = set()
+
+    def add(self, value) -> bool:
+        """Add value; returns True if it was already present."""
+        if isinstance(value, int) and not isinstance(value, bool) and 0 <= value < self.MAX_BITMAP_ID:
+            byte, bit = divmod(value, 8)
+            if byte >= len(self._bits):
+                self._bits.extend(bytes(max(byte + 1 - len(self._bits), len(self._bits))))
+            seen = self._bits[byte] & (1 << bit)
+            self._bits[byte] |= 1 << bit
+            return bool(seen)
+        seen = value in self._other
+        self._other.add(value)
+        return seen
+
+
+class StreamStats:
+    """Counts, category set and data-quality checks updated per product."""
+
+    def __init__(self):
+        self.products = 0
+        self.reviews = 0
+        self.tags = 0
+        self.categories = set()
+        self.missing_id = 0
+        self.missing_price = 0
+        self.duplicate_ids = 0
+        self.orphan_rows = 0
+        self.bad_ratings = 0
+        self.bad_dates = 0
+        self.bad_rows = 0  # products / reviews that are not JSON objects (skipped)
+        self.invalid_values: Dict[str, int] = {}  # 'table.column' -> values stored as NULL
+        self._ids = IdSet()
+
+    def add(self, product: Dict[str, Any], review_rows: Optional[List[Dict]] = None):
+        if not isinstance(product, dict):
+            self.bad_rows += 1
+            return
+        self.products += 1
+        self.categories.add(product.get('category'))
+
+        all_reviews = _as_list(product.get('reviews'))
+        reviews = [review for review in all_reviews if isinstance(review, dict)]
+        self.bad_rows += len(all_reviews) - len(reviews)
+        tags = _as_list(product.get('tags'))
+
+        if 'id' not in product or product['id'] is None:
+            self.missing_id += 1
+            # Reviews/tags of this product cannot reference it
+            self.orphan_rows += len(reviews) + len(tags)
+        elif self._ids.add(product['id']):
+            self.duplicate_ids += 1
+
+        if 'price' not in product or product['price'] is None:
+            self.missing_price += 1
+
+        self.reviews += len(reviews)
+        self.tags += len(tags)
+
+        for review in reviews:
+            rating = review.get('rating')
+            if not isinstance(rating, int) or not 1 <= rating <= 5:
+                self.bad_ratings += 1
+        if review_rows is not None:
+            self.bad_dates += sum(1 for row in review_rows if row['date'] is None)
+
+    def errors(self) -> List[str]:
+        errors = []
+        if self.missing_id:
+            errors.append(f"❌ {self.missing_id} products missing ID")
+        if self.missing_price:
+            errors.append(f"❌ {self.missing_price} products missing price")
+        if self.duplicate_ids:
+            errors.append(f"❌ {self.duplicate_ids} duplicate product IDs (overlapping pages?)")
+        if self.orphan_rows:
+            errors.append(f"❌ {self.orphan_rows} review/tag rows without a product ID")
+        if self.bad_rows:
+            errors.append(f"❌ {self.bad_rows} products/reviews that are not JSON objects (skipped)")
+        return errors
+
+    def warnings(self, pages: List[Dict[str, Any]]) -> List[str]:
+        warnings = []
+        if self.bad_ratings:
+            warnings.append(f"⚠️ {self.bad_ratings} reviews with a rating outside 1-5")
+        if self.bad_dates:
+            warnings.append(f"⚠️ {self.bad_dates} reviews with an unparseable date")
+        if self.invalid_values:
+            columns = ', '.join(f"{column} ({count})" for column, count in sorted(self.invalid_values.items()))
+            warnings.append(f"⚠️ {sum(self.invalid_values.values())} values of the wrong type "
+                            f"stored as NULL: {columns}")
+
+        # Each page says how many products exist in total; a complete dump
+        # should contain all of them
+        totals = {page['total'] for page in pages if isinstance(page.get('total'), int)}
+        if len(totals) > 1:
+            warnings.append(f"⚠️ Pages disagree on 'total': {sorted(totals)}")
+        elif totals:
+            total = totals.pop()
+            if self.products != total:
+                warnings.append(f"⚠️ Pages report total={total}, streamed {self.products} products")
+        return warnings
+
+
+# ----------------------------------------------------------------------
+# Batch sinks
+# ----------------------------------------------------------------------
+
+def _arrow_schema(schema: Dict[str, Tuple[str, str]]):
+    import pyarrow as pa
+
+    types = {
+        'int64': pa.int64(),
+        'float64': pa.float64(),
+        'string': pa.string(),
+        'timestamp': pa.timestamp('us', tz='UTC'),
+    }
+    return pa.schema([(name, types[arrow_type]) for name, (arrow_type, _) in schema.items()])
+
+
+class ParquetSink:
+    """
+    One Parquet file per table, one row group per batch. Files are written
+    under temp names and renamed into place by close(); abort() removes them.
+    A table that got no rows is written as an empty file, so a file left by
+    an earlier run is never mistaken for this run's output.
+    """
+
+    def __init__(self, output_dir):
+        import pyarrow.parquet as pq
+
+        self._pq = pq
+        self.output_dir = output_dir
+        os.makedirs(output_dir, exist_ok=True)
+        self.schemas = {table: _arrow_schema(schema) for table, schema in TABLES.items()}
+        self.writers = {}
+
+    def _tmp_path(self, table: str) -> str:
+        return os.path.join(self.output_dir, f'.{table}.parquet.tmp')
+
+    def write(self, table: str, rows: List[Dict]):
+        import pyarrow as pa
+
+        batch = pa.Table.from_pylist(rows, schema=self.schemas[table])
+        if table not in self.writers:
+            self.writers[table] = self._pq.ParquetWriter(self._tmp_path(table), self.schemas[table])
+        self.writers[table].write_table(batch)
+
+    def close(self):
+        for table in TABLES:
+            if table not in self.writers:
+                self.writers[table] = self._pq.ParquetWriter(self._tmp_path(table),
+                                                             self.schemas[table])
+        for writer in self.writers.values():
+            writer.close()
+        for table in self.writers:
+            os.replace(self._tmp_path(table), os.path.join(self.output_dir, f'{table}.parquet'))
+        self.writers = {}
+
+    def abort(self):
+        for table, writer in self.writers.items():
+            writer.close()
+            os.unlink(self._tmp_path(table))
+        self.writers = {}
+
+
+class DuckDBSink:
+    """
+    Append batches to products / reviews / tags tables in a DuckDB file.
+
+    The tables are built in a copy of the database (other tables it holds
+    are kept) that close() renames over the original, so a failed run
+    leaves the file as it was; abort() discards the copy.
+    """
+
+    def __init__(self, database):
+        import duckdb
+
+        self.database = os.fspath(database)
+        fd, self._tmp_path = tempfile.mkstemp(prefix=f'.{os.path.basename(self.database)}.',
+                                              suffix='.tmp', dir=os.path.dirname(self.database) or '.')
+        os.close(fd)
+        os.unlink(self._tmp_path)  # DuckDB refuses to open an empty file
+        if os.path.exists(self.database):
+            shutil.copy2(self.database, self._tmp_path)
+            if os.path.exists(self.database + '.wal'):
+                shutil.copy2(self.database + '.wal', self._tmp_path + '.wal')
+
+        try:
+            self.con = duckdb.connect(self._tmp_path)
+            self.schemas = {table: _arrow_schema(schema) for table, schema in TABLES.items()}
+            for table, schema in TABLES.items():
+                columns = ', '.join(f'"{name}" {db_type}' for name, (_, db_type) in schema.items())
+                self.con.execute(f"CREATE OR REPLACE TABLE {table} ({columns})")
+        except BaseException:
+            self.abort()
+            raise
+
+    def write(self, table: str, rows: List[Dict]):
+        import pyarrow as pa
+
+        batch = pa.Table.from_pylist(rows, schema=self.schemas[table])
+        self.con.register('batch_rows', batch)
+        self.con.execute(f"INSERT INTO {table} SELECT * FROM batch_rows")
+        self.con.unregister('batch_rows')
+
+    def close(self):
+        self.con.close()  # checkpoints, so the copy has no WAL left
+        os.replace(self._tmp_path, self.database)
+        if os.path.exists(self.database + '.wal'):
+            os.unlink(self.database + '.wal')  # belonged to the replaced file
+
+    def abort(self):
+        if getattr(self, 'con', None) is not None:
+            self.con.close()
+        for path in (self._tmp_path, self._tmp_path + '.wal'):
+            if os.path.exists(path):
+                os.unlink(path)
+
+
+def stream_products(path, sink=None, batch_size: int = DEFAULT_BATCH_SIZE,
+                    chunk_size: int = CHUNK_SIZE) -> Tuple[StreamStats, List[Dict[str, Any]]]:
+    """
+    Stream a dump through the incremental checks and (optionally) a sink.
+
+    Args:
+        path: products.json or concatenated page dump
+        sink: ParquetSink / DuckDBSink, or None to only run the checks. It is
+            closed (output moved into place) on success and aborted
+            (nothing written) if reading or writing fails
+        batch_size: Rows buffered per table before a batch is written
+
+    Returns:
+        (stats, pages) - StreamStats and the per-page fields (total, skip, ...)
+    """
+    reader = ProductReader(path, chunk_size)
+    stats = StreamStats()
+    buffers = {table: [] for table in TABLES}
+    next_review_id = 1
+
+    def flush(table):
+        if sink is not None and buffers[table]:
+            sink.write(table, buffers[table])
+        buffers[table] = []
+
+    try:
+        for product in reader:
+            product_row, review_rows, tag_rows = split_product(product, next_review_id,
+                                                               stats.invalid_values)
+            next_review_id += len(review_rows)
+            stats.add(product, review_rows)
+
+            if sink is None or product_row is None:
+                continue
+            buffers['products'].append(product_row)
+            buffers['reviews'].extend(review_rows)
+            buffers['tags'].extend(tag_rows)
+            for table, rows in buffers.items():
+                if len(rows) >= batch_size:
+                    flush(table)
+
+        for table in TABLES:
+            flush(table)
+    except BaseException:
+        if sink is not None:
+            sink.abort()
+        raise
+    if sink is not None:
+        sink.close()
+
+    return stats, reader.pages
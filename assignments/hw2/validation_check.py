@@ -4,14 +4,58 @@ HW2 Validation Script
 Run this to check if your homework is ready for submission.
 
 Usage: python validation_check.py
+
+Large catalogs (columnar mode):
+    python validation_check.py --columnar
+    python validation_check.py --columnar --engine duckdb --data dump.json --expected-products 0
+
+--columnar loads products.json once into columnar tables, builds the
+normalized products_df / reviews_df / tags_df itself (whole-column
+DataFrame constructors + explode instead of appending rows product by
+product) and runs every check as a vectorized pandas operation, so
+catalogs with millions of products validate in seconds. --engine duckdb does the loading and normalization
+with DuckDB's read_json + unnest instead of pandas.
+
+Multi-GB dumps (streaming mode, flat memory):
+    python validation_check.py --stream --data dump.json --expected-products 0
+    python validation_check.py --stream --data dump.json --duckdb techmart.duckdb
+    python validation_check.py --stream --data dump.json --parquet tables/
+
+--stream reads one product at a time (see products_stream.py), computes
+counts, categories and data-quality checks incrementally and optionally
+writes the products / reviews / tags rows in batches to DuckDB or Parquet.
+Concatenated page dumps ({"products": [...], "total": ...} objects one
+after another) are supported.
 """
 
+import argparse
 import pandas as pd
 import json
 import sys
 import os
+import time
+
+DEFAULT_DATA_PATH = 'data/products.json'
+EXPECTED_PRODUCTS = 194
+
+# Flattened nested fields -> products_df column names
+PRODUCT_COLUMNS = {
+    'dimensions.width': 'width',
+    'dimensions.height': 'height',
+    'dimensions.depth': 'depth',
+    'meta.createdAt': 'created_at',
+    'meta.updatedAt': 'updated_at',
+    'meta.barcode': 'barcode',
+    'meta.qrCode': 'qr_code',
+}
+REVIEW_COLUMNS = ['review_id', 'product_id', 'rating', 'comment', 'date',
+                  'reviewer_name', 'reviewer_email']
+NESTED_DICTS = ['dimensions', 'meta']
+NESTED_LISTS = ['reviews', 'tags', 'images']
+MIN_PRODUCT_COLUMNS = 24
+
 
-def check_hw2():
+def check_hw2(data_path=DEFAULT_DATA_PATH, expected_products=EXPECTED_PRODUCTS):
     """Validate HW2 implementation"""
 
     print("=" * 50)
@@ -24,9 +68,9 @@ def check_hw2():
 
     # Check 1: Data file exists
     print("\n✓ Checking data file...")
-    if not os.path.exists('data/products.json'):
-        errors.append("❌ data/products.json not found")
-        print("  ❌ data/products.json not found")
+    if not os.path.exists(data_path):
+        errors.append(f"❌ {data_path} not found")
+        print(f"  ❌ {data_path} not found")
         return False
     else:
         print("  ✅ Data file exists")
@@ -34,13 +78,13 @@ def check_hw2():
     # Check 2: Load JSON data
     print("\n✓ Loading JSON data...")
     try:
-        with open('data/products.json', 'r') as f:
+        with open(data_path, 'r') as f:
             data = json.load(f)
         products = data['products']
         print(f"  ✅ Loaded {len(products)} products")
 
-        if len(products) != 194:
-            warnings.append(f"⚠️ Expected 194 products, found {len(products)}")
+        if expected_products and len(products) != expected_products:
+            warnings.append(f"⚠️ Expected {expected_products} products, found {len(products)}")
     except Exception as e:
         errors.append(f"❌ Failed to load JSON: {e}")
         return False
@@ -62,7 +106,7 @@ def check_hw2():
     total_reviews = sum(len(p.get('reviews', [])) for p in products)
     total_tags = sum(len(p.get('tags', [])) for p in products)
 
-    print(f"  📊 Products: 194")
+    print(f"  📊 Products: {len(products)}")
     print(f"  💬 Reviews: {total_reviews}")
     print(f"  🏷️ Tags: {total_tags}")
 
@@ -86,7 +130,13 @@ def check_hw2():
     else:
         print("  ✅ All products have prices")
 
-    # Summary
+    print_summary(errors, warnings)
+
+    return len(errors) == 0
+
+
+def print_summary(errors, warnings, checklist=True):
+    """Print errors, warnings and (for students) the submission checklist"""
     print("\n" + "=" * 50)
     print("📋 VALIDATION SUMMARY")
     print("=" * 50)
@@ -105,6 +155,9 @@ def check_hw2():
         print("\n✅ ALL CHECKS PASSED!")
         print("Your data is ready for normalization.")
 
+    if not checklist:
+        return
+
     print("\n📝 CHECKLIST before submission:")
     print("  □ All TODO sections completed")
     print("  □ Three tables created (products, reviews, tags)")
@@ -119,10 +172,384 @@ def check_hw2():
     print("  reviews_df.shape should be (582, 7)")
     print("  tags_df.shape should be (364, 2)")
 
+
+# ----------------------------------------------------------------------
+# Columnar mode
+# ----------------------------------------------------------------------
+
+def load_tables_pandas(data_path):
+    """
+    Load products.json once and normalize it with vectorized pandas ops.
+
+    Returns (products_df, reviews_df, tags_df, source_counts) where
+    source_counts holds the product/review/tag counts of the raw JSON.
+    """
+    with open(data_path, 'r') as f:
+        products = json.load(f)['products']
+
+    raw = pd.DataFrame(products)
+    del products
+
+    # Nested dicts (dimensions, meta) become dotted columns; lists stay lists.
+    # One DataFrame per nested dict is much faster than pd.json_normalize()
+    # on the whole catalog.
+    parts = [raw.drop(columns=[c for c in NESTED_DICTS if c in raw])]
+    for column in NESTED_DICTS:
+        if column in raw:
+            nested = pd.DataFrame([v if isinstance(v, dict) else {} for v in raw[column]],
+                                  index=raw.index)
+            parts.append(nested.add_prefix(f'{column}.'))
+    flat = pd.concat(parts, axis=1)
+    del raw, parts
+
+    source_counts = {
+        'products': len(flat),
+        'reviews': int(flat['reviews'].str.len().fillna(0).sum()) if 'reviews' in flat else 0,
+        'tags': int(flat['tags'].str.len().fillna(0).sum()) if 'tags' in flat else 0,
+    }
+
+    # reviews_df: one row per review with the product FK
+    if 'reviews' in flat:
+        exploded = flat[['id', 'reviews']].explode('reviews').dropna(subset=['reviews'])
+        reviews_df = pd.DataFrame(exploded['reviews'].tolist()).rename(
+            columns={'reviewerName': 'reviewer_name', 'reviewerEmail': 'reviewer_email'}
+        )
+        reviews_df.insert(0, 'product_id', exploded['id'].to_numpy())
+    else:
+        reviews_df = pd.DataFrame(columns=REVIEW_COLUMNS[1:])
+    reviews_df.insert(0, 'review_id', range(1, len(reviews_df) + 1))
+    reviews_df = reviews_df.reindex(columns=REVIEW_COLUMNS)
+    reviews_df['date'] = pd.to_datetime(reviews_df['date'])
+
+    # tags_df: product-tag bridge table
+    if 'tags' in flat:
+        tags_df = (flat[['id', 'tags']].explode('tags').dropna(subset=['tags'])
+                   .rename(columns={'id': 'product_id', 'tags': 'tag'})
+                   .reset_index(drop=True))
+    else:
+        tags_df = pd.DataFrame(columns=['product_id', 'tag'])
+
+    # products_df: flattened scalars, nested lists moved out above
+    products_df = flat.drop(columns=[c for c in NESTED_LISTS if c in flat])
+    products_df = products_df.rename(columns=PRODUCT_COLUMNS)
+    for column in ['created_at', 'updated_at']:
+        if column in products_df:
+            products_df[column] = pd.to_datetime(products_df[column])
+
+    return products_df, reviews_df, tags_df, source_counts
+
+
+def load_tables_duckdb(data_path):
+    """
+    Same as load_tables_pandas(), but parsed and normalized by DuckDB.
+
+    The whole file is a single {"products": [...]} object, so
+    maximum_object_size is raised to the file size. Nested fields a
+    catalog does not have become NULL columns (or empty tables).
+    """
+    import duckdb
+
+    con = duckdb.connect()
+    path_sql = str(data_path).replace("'", "''")
+    max_size = max(os.path.getsize(data_path) + 1, 16 * 1024 * 1024)
+
+    con.execute(f"""
+        CREATE TEMP TABLE raw_products AS
+        SELECT unnest(products) AS p
+        FROM read_json('{path_sql}', maximum_object_size = {max_size})
+    """)
+
+    def fields(struct, source='raw_products'):
+        """Field names of a struct column (none if absent or not a struct)."""
+        try:
+            return [row[0] for row in
+                    con.execute(f"DESCRIBE SELECT unnest({struct}) FROM {source}").fetchall()]
+        except duckdb.Error:
+            return []
+
+    def field(struct, name, present, cast=None):
+        expr = f'{struct}.{name}' if name in present else 'NULL'
+        return f'CAST({expr} AS {cast})' if cast else expr
+
+    product_fields = fields('p')
+    nested = {column: fields(f'p.{column}') if column in product_fields else []
+              for column in NESTED_DICTS}
+
+    products, reviews, tags = con.execute(f"""
+        SELECT count(*),
+               coalesce(sum(len({field('p', 'reviews', product_fields)})), 0),
+               coalesce(sum(len({field('p', 'tags', product_fields)})), 0)
+        FROM raw_products
+    """).fetchone()
+    source_counts = {'products': products, 'reviews': int(reviews), 'tags': int(tags)}
+
+    exclude = [column for column in NESTED_DICTS + NESTED_LISTS if column in product_fields]
+    columns = [f"* EXCLUDE ({', '.join(exclude)})" if exclude else '*']
+    for dotted, name in PRODUCT_COLUMNS.items():
+        struct, key = dotted.split('.')
+        cast = 'TIMESTAMPTZ' if name in ('created_at', 'updated_at') else None
+        columns.append(f"{field(struct, key, nested[struct], cast)} AS {name}")
+    products_df = con.execute(f"""
+        SELECT {', '.join(columns)}
+        FROM (SELECT unnest(p) FROM raw_products)
+    """).df()
+
+    if 'reviews' in product_fields:
+        con.execute("""
+            CREATE TEMP TABLE raw_reviews AS
+            SELECT p.id AS product_id, unnest(p.reviews) AS r FROM raw_products
+        """)
+        review_fields = fields('r', 'raw_reviews')
+        reviews_df = con.execute(f"""
+            SELECT row_number() OVER () AS review_id,
+                   product_id,
+                   {field('r', 'rating', review_fields)} AS rating,
+                   {field('r', 'comment', review_fields)} AS comment,
+                   {field('r', 'date', review_fields, 'TIMESTAMPTZ')} AS date,
+                   {field('r', 'reviewerName', review_fields)} AS reviewer_name,
+                   {field('r', 'reviewerEmail', review_fields)} AS reviewer_email
+            FROM raw_reviews
+        """).df()
+    else:
+        reviews_df = pd.DataFrame(columns=REVIEW_COLUMNS)
+
+    if 'tags' in product_fields:
+        tags_df = con.execute("""
+            SELECT p.id AS product_id, unnest(p.tags) AS tag FROM raw_products
+        """).df()
+    else:
+        tags_df = pd.DataFrame(columns=['product_id', 'tag'])
+
+    con.close()
+    return products_df, reviews_df, tags_df, source_counts
+
+
+def run_columnar_checks(products_df, reviews_df, tags_df, source_counts, expected_products):
+    """Run every HW2 check as a vectorized operation; returns (errors, warnings)"""
+    errors = []
+    warnings = []
+
+    # Product count
+    print("\n✓ Checking product count...")
+    print(f"  ✅ {len(products_df)} products")
+    if len(products_df) != source_counts['products']:
+        errors.append(f"❌ products_df has {len(products_df)} rows, JSON has {source_counts['products']} products")
+    if expected_products and len(products_df) != expected_products:
+        warnings.append(f"⚠️ Expected {expected_products} products, found {len(products_df)}")
+
+    # Missing fields
+    print("\n✓ Data quality checks:")
+    for column, label in [('id', 'ID'), ('price', 'price')]:
+        missing = int(products_df[column].isna().sum()) if column in products_df else len(products_df)
+        if missing:
+            errors.append(f"❌ {missing} products missing {label}")
+        else:
+            print(f"  ✅ All products have {label}s")
+
+    # Primary keys
+    if 'id' in products_df:
+        duplicates = int(products_df['id'].duplicated().sum())
+        if duplicates:
+            errors.append(f"❌ {duplicates} duplicate product IDs")
+        else:
+            print("  ✅ Product IDs are unique")
+
+    # Categories
+    print("\n✓ Checking categories...")
+    categories = products_df['category'].nunique(dropna=False) if 'category' in products_df else 0
+    print(f"  ✅ Found {categories} unique categories")
+
+    # Foreign keys
+    print("\n✓ Checking foreign keys...")
+    product_ids = products_df['id'] if 'id' in products_df else pd.Series(dtype='int64')
+    for name, table in [('reviews_df', reviews_df), ('tags_df', tags_df)]:
+        orphans = int((~table['product_id'].isin(product_ids)).sum())
+        if orphans:
+            errors.append(f"❌ {orphans} rows in {name} reference non-existent products")
+        else:
+            print(f"  ✅ All {name} rows link to valid products")
+
+    # Completeness of the normalization
+    print("\n✓ Checking normalized tables...")
+    for name, table, key in [('reviews_df', reviews_df, 'reviews'), ('tags_df', tags_df, 'tags')]:
+        if len(table) != source_counts[key]:
+            errors.append(f"❌ {name} has {len(table)} rows, JSON has {source_counts[key]} {key}")
+        else:
+            print(f"  ✅ All {source_counts[key]} {key} preserved")
+
+    # Shapes
+    print("\n✓ Table shapes:")
+    print(f"  📊 products_df: {products_df.shape}")
+    print(f"  💬 reviews_df: {reviews_df.shape}")
+    print(f"  🏷️ tags_df: {tags_df.shape}")
+    if products_df.shape[1] < MIN_PRODUCT_COLUMNS:
+        warnings.append(f"⚠️ products_df has {products_df.shape[1]} columns, expected {MIN_PRODUCT_COLUMNS}+")
+    if reviews_df.shape[1] != len(REVIEW_COLUMNS):
+        warnings.append(f"⚠️ reviews_df has {reviews_df.shape[1]} columns, expected {len(REVIEW_COLUMNS)}")
+    if tags_df.shape[1] != 2:
+        warnings.append(f"⚠️ tags_df has {tags_df.shape[1]} columns, expected 2")
+
+    return errors, warnings
+
+
+def check_hw2_columnar(data_path=DEFAULT_DATA_PATH, expected_products=EXPECTED_PRODUCTS,
+                       engine='pandas'):
+    """Validate a (possibly very large) catalog in columnar mode"""
+
+    print("=" * 50)
+    print("🔍 HW2 VALIDATION CHECK (columnar)")
+    print("TechMart Acquisition Data Integration")
+    print("=" * 50)
+
+    print("\n✓ Checking data file...")
+    if not os.path.exists(data_path):
+        print(f"  ❌ {data_path} not found")
+        return False
+    print("  ✅ Data file exists")
+
+    print(f"\n✓ Loading and normalizing JSON data ({engine})...")
+    started = time.perf_counter()
+    try:
+        if engine == 'duckdb':
+            tables = load_tables_duckdb(data_path)
+        else:
+            tables = load_tables_pandas(data_path)
+    except ImportError as e:
+        print(f"  ❌ {engine} engine unavailable: {e}")
+        return False
+    except Exception as e:
+        print(f"  ❌ Failed to load JSON: {e}")
+        return False
+    print(f"  ✅ Built products_df, reviews_df and tags_df in {time.perf_counter() - started:.2f}s")
+
+    started = time.perf_counter()
+    errors, warnings = run_columnar_checks(*tables, expected_products=expected_products)
+    print(f"\n⏱️ Checks ran in {time.perf_counter() - started:.2f}s")
+
+    print_summary(errors, warnings, checklist=False)
     return len(errors) == 0
 
+
+def check_hw2_stream(data_path=DEFAULT_DATA_PATH, expected_products=EXPECTED_PRODUCTS,
+                     duckdb_path=None, parquet_dir=None, batch_size=None):
+    """Validate a catalog of any size by streaming it product by product"""
+    from products_stream import DEFAULT_BATCH_SIZE, DuckDBSink, ParquetSink, stream_products
+
+    print("=" * 50)
+    print("🔍 HW2 VALIDATION CHECK (streaming)")
+    print("TechMart Acquisition Data Integration")
+    print("=" * 50)
+
+    print("\n✓ Checking data file...")
+    if not os.path.exists(data_path):
+        print(f"  ❌ {data_path} not found")
+        return False
+    print(f"  ✅ Data file exists ({os.path.getsize(data_path) / 1024 / 1024:.1f} MB)")
+
+    try:
+        if duckdb_path:
+            sink = DuckDBSink(duckdb_path)
+        elif parquet_dir:
+            sink = ParquetSink(parquet_dir)
+        else:
+            sink = None
+    except ImportError as e:
+        print(f"  ❌ Output needs an optional package: {e}")
+        return False
+
+    print("\n✓ Streaming products...")
+    started = time.perf_counter()
+    try:
+        stats, pages = stream_products(data_path, sink=sink,
+                                       batch_size=batch_size or DEFAULT_BATCH_SIZE)
+    except Exception as e:
+        print(f"  ❌ Failed to read JSON: {e}")
+        return False
+    print(f"  ✅ Streamed {stats.products} products from {len(pages)} page(s) "
+          f"in {time.perf_counter() - started:.2f}s")
+
+    print("\n✓ Expected data counts:")
+    print(f"  📊 Products: {stats.products}")
+    print(f"  💬 Reviews: {stats.reviews}")
+    print(f"  🏷️ Tags: {stats.tags}")
+
+    print("\n✓ Checking categories...")
+    print(f"  ✅ Found {len(stats.categories)} unique categories")
+
+    if duckdb_path:
+        print(f"\n✓ Tables written to {duckdb_path} (products, reviews, tags)")
+    elif parquet_dir:
+        print(f"\n✓ Tables written to {parquet_dir}/ (products, reviews, tags .parquet)")
+
+    errors = stats.errors()
+    warnings = stats.warnings(pages)
+    if expected_products and stats.products != expected_products:
+        warnings.append(f"⚠️ Expected {expected_products} products, found {stats.products}")
+
+    print_summary(errors, warnings, checklist=False)
+    return len(errors) == 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Validate HW2 data and normalization')
+    parser.add_argument(
+        '--data',
+        default=DEFAULT_DATA_PATH,
+        help=f'Path to products.json (default: {DEFAULT_DATA_PATH})'
+    )
+    parser.add_argument(
+        '--expected-products',
+        type=int,
+        default=EXPECTED_PRODUCTS,
+        help=f'Warn if the product count differs (default: {EXPECTED_PRODUCTS}, 0 = no check)'
+    )
+    parser.add_argument(
+        '--columnar',
+        action='store_true',
+        help='Load once into columnar tables and run vectorized checks (for large catalogs)'
+    )
+    parser.add_argument(
+        '--engine',
+        choices=['pandas', 'duckdb'],
+        default='pandas',
+        help='Columnar engine (default: pandas)'
+    )
+    parser.add_argument(
+        '--stream',
+        action='store_true',
+        help='Stream products one at a time with flat memory (for multi-GB dumps)'
+    )
+    output = parser.add_mutually_exclusive_group()
+    output.add_argument(
+        '--duckdb',
+        metavar='DB_FILE',
+        help='With --stream: write products/reviews/tags tables to this DuckDB file'
+    )
+    output.add_argument(
+        '--parquet',
+        metavar='DIR',
+        help='With --stream: write products/reviews/tags Parquet files to DIR'
+    )
+    parser.add_argument(
+        '--batch-size',
+        type=int,
+        help='With --stream: rows per written batch (default: 50000)'
+    )
+    args = parser.parse_args()
+
+    if (args.duckdb or args.parquet) and not args.stream:
+        parser.error('--duckdb/--parquet require --stream')
+
+    if args.stream:
+        return check_hw2_stream(args.data, args.expected_products, duckdb_path=args.duckdb,
+                                parquet_dir=args.parquet, batch_size=args.batch_size)
+    if args.columnar:
+        return check_hw2_columnar(args.data, args.expected_products, engine=args.engine)
+    return check_hw2(args.data, args.expected_products)
+
+
 if __name__ == "__main__":
-    success = check_hw2()
+    success = main()
 
     if success:
         print("\n🎉 Great work! Ready for the board meeting!")
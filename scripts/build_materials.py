@@ -0,0 +1,485 @@
+#!/usr/bin/env python3
+"""
+Build Materials - Rebuild generated course materials only when needed
+
+prepare_day3_datasets.py and create_day3_teaching_notebook.py redo every
+step on every run. This script declares each generated artifact once (the
+command that makes it, its input files, parameters and output files) and
+rebuilds a target only when something it depends on changed:
+
+- inputs are fingerprinted by SHA-256; a file whose size and mtime match
+  the last build is not read again
+- a target is rebuilt when its command, parameters or input hashes
+  changed, when an output is missing or was modified since, or when a
+  target it depends on was rebuilt (its outputs are inputs here)
+- independent targets run in parallel (--jobs); a failed target skips the
+  targets that depend on it
+- every build is timed; the last timings are kept with the build state in
+  .build_cache/state.json
+
+Remote data (the HW3 data pack) is not fingerprinted: prepare_day3_datasets.py
+already skips unchanged sources through its HTTP cache, so `--force
+hw3-data-pack` is a cheap way to check for new data.
+
+The Day 3 notebook targets are built only when named: the checked-in
+notebook was edited by hand after it was generated, and regenerating it
+would overwrite those edits.
+
+A plain run skips, with a message, targets whose input files are not in
+the checkout (the Olist orders, customers and order items CSVs are not
+checked in); naming such a target still fails on the missing input.
+
+Usage:
+    python scripts/build_materials.py                   # every default target
+    python scripts/build_materials.py olist-subsets
+    python scripts/build_materials.py --dry-run         # what would rebuild and why
+    python scripts/build_materials.py --force hw3-data-pack
+    python scripts/build_materials.py --list
+    python scripts/build_materials.py --timings
+
+Exit codes:
+    0 - All requested targets built or up to date
+    1 - A target failed (or a dependency of it did)
+"""
+
+import argparse
+import hashlib
+import json
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from http_cache import write_json_atomic
+from notebook_cache import file_sha256
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+STATE_PATH = REPO_ROOT / '.build_cache' / 'state.json'
+STATE_FORMAT = 1
+
+DAY3_DATA = 'data/day3'
+
+# Each target: command (formatted with params), input file globs, output
+# files, the targets it depends on and whether a plain run builds it
+# (default, True if absent). All paths are relative to the repo.
+TARGETS: Dict[str, Dict[str, Any]] = {
+    'olist-subsets': {
+        'help': 'Day 3 teaching and exercise subsets of the Olist dump',
+        'command': ['scripts/prepare_day3_datasets.py', '--steps', 'olist',
+                    '--olist-engine', '{olist_engine}'],
+        'params': {'olist_engine': 'pandas'},
+        'inputs': [
+            'data/day2/block_a/olist_orders_dataset.csv',
+            'data/day2/block_a/olist_customers_dataset.csv',
+            'data/day2/block_a/olist_order_items_dataset.csv',
+            'scripts/prepare_day3_datasets.py',
+        ],
+        'outputs': [
+            f'{DAY3_DATA}/teaching/olist_orders_subset.csv',
+            f'{DAY3_DATA}/teaching/olist_customers_subset.csv',
+            f'{DAY3_DATA}/teaching/olist_order_items_subset.csv',
+            f'{DAY3_DATA}/exercise/mini_orders.csv',
+            f'{DAY3_DATA}/exercise/mini_customers.csv',
+            f'{DAY3_DATA}/exercise/mini_order_items.csv',
+        ],
+    },
+    'hw3-data-pack': {
+        'help': 'Chicago licenses + NYC permits from the open data portals',
+        'command': ['scripts/prepare_day3_datasets.py', '--steps', 'chicago', 'nyc',
+                    '--chicago-limit', '{chicago_limit}', '--nyc-limit', '{nyc_limit}',
+                    '--nyc-format', 'parquet', 'json'],
+        'params': {'chicago_limit': 50000, 'nyc_limit': 20000},
+        'inputs': [
+            'scripts/prepare_day3_datasets.py',
+            'scripts/socrata_fetch.py',
+            'scripts/socrata_export.py',
+            'scripts/http_cache.py',
+        ],
+        'outputs': [
+            f'{DAY3_DATA}/hw3_data_pack/chicago_business_licenses.csv',
+            f'{DAY3_DATA}/hw3_data_pack/nyc_building_permits.parquet',
+            f'{DAY3_DATA}/hw3_data_pack/nyc_building_permits.json',
+        ],
+    },
+    'day3-teaching-notebook': {
+        'help': 'Day 3 Block A notebook (pipelines and validations)',
+        'default': False,  # overwrites the hand-edited notebook in the repo
+        'command': ['scripts/create_day3_teaching_notebook.py'],
+        'inputs': ['scripts/create_day3_teaching_notebook.py'],
+        'outputs': ['notebooks/day3/day3_block_a_pipelines_and_validations.ipynb'],
+    },
+    'day3-notebook-check': {
+        'help': 'Format check of the generated Day 3 notebook',
+        'default': False,
+        'command': ['scripts/validate_notebook_format.py', '--quiet', '--no-cache',
+                    'notebooks/day3/day3_block_a_pipelines_and_validations.ipynb'],
+        'inputs': ['scripts/validate_notebook_format.py', 'scripts/notebook_*.py'],
+        'deps': ['day3-teaching-notebook'],
+    },
+}
+
+
+class BuildError(Exception):
+    """A target could not be built (bad declaration, missing input, failed command)."""
+    pass
+
+
+# =============================================================================
+# Build state
+# =============================================================================
+
+class BuildState:
+    """Fingerprints, output signatures and timings of previous builds."""
+
+    def __init__(self, path: Path = STATE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        data = self._load()
+        self.files: Dict[str, Dict[str, Any]] = data.get('files', {})
+        self.targets: Dict[str, Dict[str, Any]] = data.get('targets', {})
+
+    def _load(self) -> Dict[str, Any]:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return data if data.get('format') == STATE_FORMAT else {}
+
+    def save(self):
+        with self._lock:
+            write_json_atomic(self.path, {'format': STATE_FORMAT, 'files': self.files,
+                                          'targets': self.targets})
+
+    def file_hash(self, rel_path: str) -> str:
+        """SHA-256 of a repo file, reusing the last hash if size and mtime match."""
+        stat = (REPO_ROOT / rel_path).stat()
+        with self._lock:
+            known = self.files.get(rel_path)
+        if known and known['size'] == stat.st_size and known['mtime_ns'] == stat.st_mtime_ns:
+            return known['sha256']
+        digest = file_sha256(REPO_ROOT / rel_path)
+        with self._lock:
+            self.files[rel_path] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns,
+                                    'sha256': digest}
+        return digest
+
+    def record(self, name: str, entry: Dict[str, Any]):
+        with self._lock:
+            self.targets[name] = entry
+
+
+def output_signature(rel_path: str) -> Optional[List[int]]:
+    try:
+        stat = (REPO_ROOT / rel_path).stat()
+    except OSError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+# =============================================================================
+# Targets
+# =============================================================================
+
+def target_command(target: Dict[str, Any]) -> List[str]:
+    params = target.get('params', {})
+    script, *args = [part.format(**params) for part in target['command']]
+    return [sys.executable, script, *args]
+
+
+def missing_inputs(target: Dict[str, Any]) -> List[str]:
+    """Declared input globs that match no file."""
+    return [pattern for pattern in target.get('inputs', []) if not any(REPO_ROOT.glob(pattern))]
+
+
+def target_inputs(name: str, target: Dict[str, Any]) -> List[str]:
+    """Input files (globs expanded) plus the outputs of the dependencies."""
+    files = []
+    for pattern in target.get('inputs', []):
+        matches = sorted(p.relative_to(REPO_ROOT).as_posix() for p in REPO_ROOT.glob(pattern))
+        if not matches:
+            raise BuildError(f"{name}: missing input {pattern}")
+        files.extend(matches)
+    for dep in target.get('deps', []):
+        files.extend(TARGETS[dep].get('outputs', []))
+    return list(dict.fromkeys(files))
+
+
+def fingerprint(name: str, target: Dict[str, Any], state: BuildState) -> Dict[str, Any]:
+    inputs = {path: state.file_hash(path) for path in target_inputs(name, target)}
+    command = target_command(target)[1:]  # the interpreter path is not part of the recipe
+    digest = hashlib.sha256(json.dumps([command, inputs], sort_keys=True).encode('utf-8'))
+    return {'fingerprint': digest.hexdigest(), 'command': command, 'inputs': inputs}
+
+
+def stale_reasons(name: str, target: Dict[str, Any], current: Dict[str, Any],
+                  state: BuildState) -> List[str]:
+    """Why the target needs a rebuild (empty list = up to date)."""
+    previous = state.targets.get(name)
+    if previous is None:
+        return ['never built']
+    reasons = []
+    if previous['command'] != current['command']:
+        reasons.append('command or parameters changed')
+    changed = [path for path, digest in current['inputs'].items()
+               if previous['inputs'].get(path) != digest]
+    if changed:
+        reasons.append(f"inputs changed: {', '.join(changed[:3])}"
+                       + (f" (+{len(changed) - 3} more)" if len(changed) > 3 else ''))
+    for path in target.get('outputs', []):
+        signature = output_signature(path)
+        if signature is None:
+            reasons.append(f"missing output: {path}")
+        elif signature != previous['outputs'].get(path):
+            reasons.append(f"output modified: {path}")
+    return reasons
+
+
+def build_target(name: str, state: BuildState, force: Optional[str] = None,
+                 dry_run: bool = False) -> Dict[str, Any]:
+    """
+    Bring one target up to date; returns status, reasons, seconds and output.
+
+    force is the reason to rebuild regardless of the fingerprint (None =
+    only if stale).
+    """
+    target = TARGETS[name]
+    if dry_run and force:
+        # Dependency outputs may not exist yet, so do not fingerprint
+        return {'status': 'would build', 'reasons': [force], 'seconds': 0.0}
+    current = fingerprint(name, target, state)
+    reasons = [force] if force else stale_reasons(name, target, current, state)
+    if not reasons:
+        return {'status': 'up to date', 'reasons': [], 'seconds': 0.0}
+    if dry_run:
+        return {'status': 'would build', 'reasons': reasons, 'seconds': 0.0}
+
+    started = time.perf_counter()
+    proc = subprocess.run(target_command(target), cwd=REPO_ROOT, capture_output=True, text=True)
+    seconds = time.perf_counter() - started
+    output = proc.stdout + proc.stderr
+
+    if proc.returncode != 0:
+        return {'status': 'failed', 'reasons': reasons, 'seconds': seconds,
+                'error': f"exit code {proc.returncode}", 'output': output}
+    missing = [path for path in target.get('outputs', []) if output_signature(path) is None]
+    if missing:
+        return {'status': 'failed', 'reasons': reasons, 'seconds': seconds,
+                'error': f"did not produce {', '.join(missing)}", 'output': output}
+
+    state.record(name, {
+        **current,
+        'outputs': {path: output_signature(path) for path in target.get('outputs', [])},
+        'seconds': round(seconds, 3),
+        'built_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    })
+    state.save()
+    return {'status': 'built', 'reasons': reasons, 'seconds': seconds, 'output': output}
+
+
+# =============================================================================
+# Scheduling
+# =============================================================================
+
+def with_dependencies(names: List[str]) -> List[str]:
+    """Requested targets plus everything they depend on, dependencies first."""
+    ordered = []
+
+    def visit(name, chain):
+        if name in chain:
+            raise BuildError(f"dependency cycle: {' -> '.join(chain + [name])}")
+        if name in ordered:
+            return
+        for dep in TARGETS[name].get('deps', []):
+            visit(dep, chain + [name])
+        ordered.append(name)
+
+    for name in names:
+        visit(name, [])
+    return ordered
+
+
+def build(names: List[str], jobs: int = 1, force: List[str] = (), dry_run: bool = False,
+          verbose: bool = False, state: Optional[BuildState] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Build the targets and their dependencies, up to `jobs` at a time.
+
+    A target starts once all its dependencies finished; with --dry-run a
+    dependency that would be rebuilt marks its dependents as well.
+    """
+    state = state or BuildState()
+    pending = with_dependencies(names)
+    results: Dict[str, Dict[str, Any]] = {}
+    running = {}
+
+    def ready(name):
+        return all(dep in results for dep in TARGETS[name].get('deps', []))
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+        while pending or running:
+            for name in [n for n in pending if ready(n)]:
+                pending.remove(name)
+                dep_results = [results[dep] for dep in TARGETS[name].get('deps', [])]
+                if any(r['status'] in ('failed', 'skipped') for r in dep_results):
+                    results[name] = {'status': 'skipped', 'reasons': ['a dependency failed'],
+                                     'seconds': 0.0}
+                    print_result(name, results[name], verbose)
+                    continue
+                reason = 'forced' if name in force else None
+                if any(r['status'] == 'would build' for r in dep_results):
+                    reason = 'a dependency would be rebuilt'
+                running[executor.submit(build_target, name, state, force=reason,
+                                        dry_run=dry_run)] = name
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    results[name] = future.result()
+                except (BuildError, OSError) as e:
+                    results[name] = {'status': 'failed', 'reasons': [], 'seconds': 0.0,
+                                     'error': str(e)}
+                print_result(name, results[name], verbose)
+    return results
+
+
+# =============================================================================
+# Output
+# =============================================================================
+
+STATUS_ICONS = {'built': '✅', 'up to date': '✓ ', 'would build': '🔨', 'failed': '❌', 'skipped': '⏭️ '}
+
+
+def print_result(name: str, result: Dict[str, Any], verbose: bool = False):
+    line = f"{STATUS_ICONS[result['status']]} {name}: {result['status']}"
+    if result['status'] in ('built', 'failed') and result['seconds']:
+        line += f" in {result['seconds']:.1f}s"
+    if result['reasons'] and (verbose or result['status'] != 'built'):
+        line += f" ({'; '.join(result['reasons'])})"
+    print(line, flush=True)
+    if result.get('error'):
+        print(f"   {result['error']}")
+    if result.get('output') and (verbose or result['status'] == 'failed'):
+        for out_line in result['output'].rstrip().splitlines()[-(None if verbose else 20):]:
+            print(f"   | {out_line}")
+
+
+def print_summary(results: Dict[str, Dict[str, Any]], elapsed: float):
+    counts = {}
+    for result in results.values():
+        counts[result['status']] = counts.get(result['status'], 0) + 1
+    built_seconds = sum(r['seconds'] for r in results.values() if r['status'] == 'built')
+    print(f"\n{', '.join(f'{n} {status}' for status, n in counts.items())} "
+          f"in {elapsed:.1f}s wall ({built_seconds:.1f}s of build time)")
+
+
+def print_timings(state: BuildState):
+    """Last recorded build time of every target, slowest first."""
+    timed = sorted(((entry['seconds'], name, entry['built_at'])
+                    for name, entry in state.targets.items() if name in TARGETS), reverse=True)
+    if not timed:
+        print("No builds recorded yet.")
+        return
+    print("Last build times:")
+    for seconds, name, built_at in timed:
+        print(f"   {seconds:8.1f}s  {name:<26} (built {built_at})")
+    never = [name for name in TARGETS if name not in state.targets]
+    if never:
+        print(f"   never built: {', '.join(never)}")
+
+
+def print_targets():
+    for name, target in TARGETS.items():
+        deps = f" [after {', '.join(target['deps'])}]" if target.get('deps') else ''
+        default = '' if target.get('default', True) else ' (only when named)'
+        print(f"   {name:<26} {target['help']}{deps}{default}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Rebuild generated datasets and notebooks whose inputs changed',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument(
+        'targets',
+        nargs='*',
+        help='Targets to build (default: all but the notebook targets; see --list)'
+    )
+    parser.add_argument(
+        '-j', '--jobs',
+        type=int,
+        default=4,
+        help='Build up to N independent targets in parallel (default: 4)'
+    )
+    parser.add_argument(
+        '--force',
+        nargs='*',
+        metavar='TARGET',
+        help='Rebuild these targets (all requested ones if none given) even if up to date'
+    )
+    parser.add_argument(
+        '-n', '--dry-run',
+        action='store_true',
+        help='Show what would be rebuilt and why, without building'
+    )
+    parser.add_argument(
+        '--list',
+        action='store_true',
+        help='List the declared targets'
+    )
+    parser.add_argument(
+        '--timings',
+        action='store_true',
+        help='Show the recorded build time of each target'
+    )
+    parser.add_argument(
+        '-v', '--verbose',
+        action='store_true',
+        help='Show the output of every command that ran'
+    )
+    args = parser.parse_args()
+
+    if args.list:
+        print_targets()
+        return
+    if args.timings:
+        print_timings(BuildState())
+        return
+
+    unknown = [name for name in args.targets + (args.force or []) if name not in TARGETS]
+    if unknown:
+        parser.error(f"unknown target(s): {', '.join(unknown)} (see --list)")
+    names = args.targets
+    if not names:
+        names = []
+        for name, target in TARGETS.items():
+            if not target.get('default', True):
+                continue
+            missing = missing_inputs(target)
+            if missing:
+                print(f"⏭️  {name}: not built - missing input {', '.join(missing)} "
+                      f"(name the target to build it anyway)")
+                continue
+            names.append(name)
+    force = names if args.force == [] else (args.force or [])
+
+    started = time.perf_counter()
+    try:
+        results = build(names, jobs=args.jobs, force=force, dry_run=args.dry_run,
+                        verbose=args.verbose)
+    except BuildError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    print_summary(results, time.perf_counter() - started)
+
+    sys.exit(1 if any(r['status'] in ('failed', 'skipped') for r in results.values()) else 0)
+
+
+if __name__ == '__main__':
+    main()
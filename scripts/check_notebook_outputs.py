@@ -11,6 +11,9 @@ This script inspects EXECUTED Jupyter notebooks and reports:
 Usage:
     python scripts/check_notebook_outputs.py notebooks/day1_block_a.ipynb
     python scripts/check_notebook_outputs.py notebooks/day*_block_*.ipynb
+    python scripts/check_notebook_outputs.py --jobs 4 notebooks/*/*.ipynb assignments/*/*.ipynb
+    python scripts/check_notebook_outputs.py --all --jobs 4
+    python scripts/check_notebook_outputs.py --changed-since origin/main
 
 Exit codes:
     0 - All notebooks clean (all queries return data)
@@ -18,149 +21,157 @@ Exit codes:
 """
 
 import json
+import os
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 import argparse
 
+from notebook_cache import ResultCache
+from notebook_discovery import add_selection_arguments, record_run, select_notebooks, wants_discovery
+from notebook_lint import OutputQualityRule, lint_cache, lint_document, lint_notebook
+
 
 class NotebookInspector:
-    def __init__(self, notebook_path: str):
+    def __init__(self, notebook_path: str, notebook: Optional[Dict[str, Any]] = None):
         self.path = Path(notebook_path)
-        self.notebook = self._load_notebook()
+        self.notebook = notebook
         self.issues = []
 
-    def _load_notebook(self) -> Dict[str, Any]:
-        """Load notebook JSON"""
-        with open(self.path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-
     def inspect(self) -> Dict[str, Any]:
         """Run all inspections and return report"""
-        cells = self.notebook.get('cells', [])
-
-        code_cells = [c for c in cells if c.get('cell_type') == 'code']
-        cells_with_outputs = []
-        cells_without_outputs = []
-        empty_result_cells = []
-        error_cells = []
-
-        for idx, cell in enumerate(cells):
-            if cell.get('cell_type') != 'code':
-                continue
-
-            cell_id = cell.get('id', f'cell-{idx}')
-            outputs = cell.get('outputs', [])
-            source = ''.join(cell.get('source', []))
-
-            # Check for outputs
-            if not outputs:
-                # Skip if cell is just a comment or whitespace
-                if source.strip() and not source.strip().startswith('#'):
-                    cells_without_outputs.append({
-                        'index': idx,
-                        'id': cell_id,
-                        'source_preview': source[:100].strip()
-                    })
-                continue
-
-            cells_with_outputs.append(cell_id)
-
-            # Check for errors
-            for output in outputs:
-                if output.get('output_type') == 'error':
-                    error_cells.append({
-                        'index': idx,
-                        'id': cell_id,
-                        'error_name': output.get('ename', 'Unknown'),
-                        'error_value': output.get('evalue', 'No message'),
-                        'source_preview': source[:100].strip()
-                    })
-
-            # Check for empty DataFrames
-            for output in outputs:
-                if output.get('output_type') in ['execute_result', 'display_data']:
-                    data = output.get('data', {})
-                    text_plain = data.get('text/plain', '')
-
-                    # Convert list to string if needed
-                    if isinstance(text_plain, list):
-                        text_plain = ''.join(text_plain)
-
-                    # Check for empty results
-                    if ('Empty DataFrame' in text_plain or
-                        '[0 rows' in text_plain or
-                        'shape: (0,' in text_plain):
-                        empty_result_cells.append({
-                            'index': idx,
-                            'id': cell_id,
-                            'output_preview': text_plain[:200],
-                            'source_preview': source[:100].strip()
-                        })
-
-        return {
-            'notebook_path': str(self.path),
-            'total_code_cells': len(code_cells),
-            'cells_with_outputs': len(cells_with_outputs),
-            'cells_without_outputs': len(cells_without_outputs),
-            'empty_result_cells': len(empty_result_cells),
-            'error_cells': len(error_cells),
-            'issues': {
-                'no_output': cells_without_outputs,
-                'empty_results': empty_result_cells,
-                'errors': error_cells
-            }
-        }
+        if self.notebook is not None:
+            # Already in memory (e.g. just executed by run_notebooks.py)
+            results = lint_document(self.notebook, [OutputQualityRule])
+        else:
+            results = lint_notebook(self.path, [OutputQualityRule])
+        return make_report(self.path, results)
 
     def print_report(self, report: Dict[str, Any], verbose: bool = False):
         """Print human-readable report"""
-        print(f"\n{'='*70}")
-        print(f"📊 Notebook: {self.path.name}")
-        print(f"{'='*70}")
-        print(f"  Total code cells: {report['total_code_cells']}")
-        print(f"  Cells with outputs: {report['cells_with_outputs']}")
-        print(f"  Cells without outputs: {report['cells_without_outputs']}")
-        print(f"  Cells with empty results: {report['empty_result_cells']}")
-        print(f"  Cells with errors: {report['error_cells']}")
-
-        has_issues = (report['cells_without_outputs'] > 0 or
-                     report['empty_result_cells'] > 0 or
-                     report['error_cells'] > 0)
-
-        if not has_issues:
-            print(f"\n✅ CLEAN: All queries return data, no errors!")
-            return True
-
-        # Report issues
-        print(f"\n{'⚠️ ISSUES FOUND':-^70}")
-
-        if report['issues']['errors']:
-            print(f"\n🚨 EXECUTION ERRORS ({len(report['issues']['errors'])}):")
-            for err in report['issues']['errors']:
-                print(f"\n  Cell {err['index']} ({err['id']}):")
-                print(f"    Error: {err['error_name']}: {err['error_value']}")
-                if verbose:
-                    print(f"    Source: {err['source_preview']}")
-
-        if report['issues']['empty_results']:
-            print(f"\n🚨 EMPTY RESULTS ({len(report['issues']['empty_results'])}):")
-            print("    (Students will think THEY made a mistake!)")
-            for empty in report['issues']['empty_results']:
-                print(f"\n  Cell {empty['index']} ({empty['id']}):")
-                if verbose:
-                    print(f"    Source: {empty['source_preview']}")
-                    print(f"    Output: {empty['output_preview']}")
-
-        if report['issues']['no_output']:
-            print(f"\n⚠️ CELLS WITHOUT OUTPUT ({len(report['issues']['no_output'])}):")
-            print("    (May not have been executed)")
-            for no_out in report['issues']['no_output']:
-                print(f"\n  Cell {no_out['index']} ({no_out['id']}):")
-                if verbose:
-                    print(f"    Source: {no_out['source_preview']}")
-
-        print(f"\n{'='*70}\n")
-        return False
+        return print_report(report, verbose=verbose)
+
+
+def print_report(report: Dict[str, Any], verbose: bool = False) -> bool:
+    """Print human-readable report for an inspection result"""
+    print(f"\n{'='*70}")
+    print(f"📊 Notebook: {Path(report['notebook_path']).name}")
+    print(f"{'='*70}")
+    print(f"  Total code cells: {report['total_code_cells']}")
+    print(f"  Cells with outputs: {report['cells_with_outputs']}")
+    print(f"  Cells without outputs: {report['cells_without_outputs']}")
+    print(f"  Cells with empty results: {report['empty_result_cells']}")
+    print(f"  Cells with errors: {report['error_cells']}")
+
+    has_issues = (report['cells_without_outputs'] > 0 or
+                 report['empty_result_cells'] > 0 or
+                 report['error_cells'] > 0)
+
+    if not has_issues:
+        print(f"\n✅ CLEAN: All queries return data, no errors!")
+        return True
+
+    # Report issues
+    print(f"\n{'⚠️ ISSUES FOUND':-^70}")
+
+    if report['issues']['errors']:
+        print(f"\n🚨 EXECUTION ERRORS ({len(report['issues']['errors'])}):")
+        for err in report['issues']['errors']:
+            print(f"\n  Cell {err['index']} ({err['id']}):")
+            print(f"    Error: {err['error_name']}: {err['error_value']}")
+            if verbose:
+                print(f"    Source: {err['source_preview']}")
+
+    if report['issues']['empty_results']:
+        print(f"\n🚨 EMPTY RESULTS ({len(report['issues']['empty_results'])}):")
+        print("    (Students will think THEY made a mistake!)")
+        for empty in report['issues']['empty_results']:
+            print(f"\n  Cell {empty['index']} ({empty['id']}):")
+            if verbose:
+                print(f"    Source: {empty['source_preview']}")
+                print(f"    Output: {empty['output_preview']}")
+
+    if report['issues']['no_output']:
+        print(f"\n⚠️ CELLS WITHOUT OUTPUT ({len(report['issues']['no_output'])}):")
+        print("    (May not have been executed)")
+        for no_out in report['issues']['no_output']:
+            print(f"\n  Cell {no_out['index']} ({no_out['id']}):")
+            if verbose:
+                print(f"    Source: {no_out['source_preview']}")
+
+    print(f"\n{'='*70}\n")
+    return False
+
+
+def make_report(notebook_path, results: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the inspection report from notebook_lint results"""
+    return {'notebook_path': str(Path(notebook_path)), **results['outputs']}
+
+
+def _lint_notebook(notebook_path: str) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """
+    Lint one notebook with all default rules, returning (results, error).
+
+    All rules run (not just the output checks) so the cached results also
+    serve validate_notebook_format.py and clear_notebook_outputs.py.
+    Module-level so it can be pickled and run in a worker process.
+    """
+    try:
+        return lint_notebook(notebook_path), None
+    except Exception as e:
+        return None, str(e)
+
+
+def iter_reports(notebook_paths: List[str], jobs: int = 1,
+                 cache: Optional[ResultCache] = None) -> Iterator[Tuple[str, Optional[Dict[str, Any]], Optional[str]]]:
+    """
+    Yield (notebook_path, report, error) for each notebook in input order.
+    Missing notebooks are yielded as (notebook_path, None, None).
+
+    With jobs > 1 the inspections run in a process pool, but results are
+    still yielded in the order the notebooks were given, so the printed
+    output is identical to a serial run. With a cache, unchanged notebooks
+    are answered from it and only the rest are inspected.
+    """
+    existing = [p for p in notebook_paths if Path(p).exists()]
+
+    cached = {}
+    if cache is not None:
+        for notebook_path in existing:
+            results = cache.get(notebook_path)
+            if results is not None:
+                cached[notebook_path] = results
+    to_lint = [p for p in existing if p not in cached]
+
+    if jobs > 1 and len(to_lint) > 1:
+        executor = ProcessPoolExecutor(max_workers=min(jobs, len(to_lint)))
+        computed = executor.map(_lint_notebook, to_lint)
+    else:
+        executor = None
+        computed = map(_lint_notebook, to_lint)
+
+    try:
+        for notebook_path in notebook_paths:
+            if not Path(notebook_path).exists():
+                yield notebook_path, None, None
+                continue
+            if notebook_path in cached:
+                yield notebook_path, make_report(notebook_path, cached[notebook_path]), None
+                continue
+            results, error = next(computed)
+            if results is None:
+                yield notebook_path, None, error
+                continue
+            if cache is not None:
+                cache.put(notebook_path, results)
+            yield notebook_path, make_report(notebook_path, results), None
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+        if cache is not None:
+            cache.save()
 
 
 def main():
@@ -169,8 +180,8 @@ def main():
     )
     parser.add_argument(
         'notebooks',
-        nargs='+',
-        help='Notebook file(s) to check'
+        nargs='*',
+        help='Notebook file(s) to check (directories with --all/--changed*)'
     )
     parser.add_argument(
         '-v', '--verbose',
@@ -182,33 +193,62 @@ def main():
         action='store_true',
         help='Output results as JSON'
     )
+    parser.add_argument(
+        '-j', '--jobs',
+        type=int,
+        default=1,
+        help='Inspect notebooks in N parallel processes (0 = one per CPU core)'
+    )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Re-inspect every notebook instead of reusing cached results'
+    )
+
+    add_selection_arguments(parser)
 
     args = parser.parse_args()
+    started = time.time()
+
+    if wants_discovery(args):
+        try:
+            # Solution notebooks are only inspected, so they are checked too
+            notebooks = [str(p) for p in select_notebooks(args, 'check_outputs', paths=args.notebooks,
+                                                          exclude_solutions=False)]
+        except ValueError as e:
+            print(f"❌ ERROR: {e}", file=sys.stderr)
+            sys.exit(1)
+        if not notebooks:
+            print("No notebooks to check.")
+            sys.exit(0)
+    elif args.notebooks:
+        notebooks = args.notebooks
+    else:
+        parser.error('provide notebook files or use --all / --changed-since / --changed')
+
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    cache = lint_cache(enabled=not args.no_cache)
 
     all_clean = True
     all_reports = []
 
-    for notebook_path in args.notebooks:
-        path = Path(notebook_path)
-
-        if not path.exists():
+    for notebook_path, report, error in iter_reports(notebooks, jobs=jobs, cache=cache):
+        if report is None and error is None:
             print(f"❌ ERROR: Notebook not found: {notebook_path}", file=sys.stderr)
             all_clean = False
             continue
 
-        try:
-            inspector = NotebookInspector(notebook_path)
-            report = inspector.inspect()
-            all_reports.append(report)
+        if error is not None:
+            print(f"❌ ERROR inspecting {notebook_path}: {error}", file=sys.stderr)
+            all_clean = False
+            continue
 
-            if not args.json:
-                clean = inspector.print_report(report, verbose=args.verbose)
-                if not clean:
-                    all_clean = False
+        all_reports.append(report)
 
-        except Exception as e:
-            print(f"❌ ERROR inspecting {notebook_path}: {e}", file=sys.stderr)
-            all_clean = False
+        if not args.json:
+            clean = print_report(report, verbose=args.verbose)
+            if not clean:
+                all_clean = False
 
     # JSON output
     if args.json:
@@ -222,7 +262,7 @@ def main():
                 all_clean = False
 
     # Summary for multiple notebooks
-    if len(args.notebooks) > 1 and not args.json:
+    if len(notebooks) > 1 and not args.json:
         total_cells = sum(r['total_code_cells'] for r in all_reports)
         total_empty = sum(r['empty_result_cells'] for r in all_reports)
         total_errors = sum(r['error_cells'] for r in all_reports)
@@ -232,6 +272,7 @@ def main():
         print(f"  Total code cells: {total_cells}")
         print(f"  Total empty results: {total_empty}")
         print(f"  Total errors: {total_errors}")
+        print(f"  {cache.stats_line()}")
 
         if all_clean:
             print(f"\n✅ ALL NOTEBOOKS CLEAN!")
@@ -239,6 +280,9 @@ def main():
             print(f"\n⚠️ ISSUES FOUND - See details above")
         print(f"{'='*70}\n")
 
+    if all_clean and (args.all or args.changed):
+        record_run('check_outputs', started)
+
     sys.exit(0 if all_clean else 1)
 
 
@@ -23,133 +23,203 @@ Examples:
 
     # Dry run (show what would be cleared)
     python scripts/clear_notebook_outputs.py --all --dry-run
+
+    # Clear in 4 parallel processes
+    python scripts/clear_notebook_outputs.py --all --jobs 4
+
+    # Only notebooks changed since a git ref / since the last run
+    python scripts/clear_notebook_outputs.py --changed-since HEAD
+    python scripts/clear_notebook_outputs.py --changed
+
+Clean notebooks are detected with a cheap byte scan and never rewritten.
+Changed notebooks are written to a temp file and renamed over the original,
+so an interrupted run never leaves a half-written notebook.
 """
 
 import argparse
 import json
+import mmap
 import os
+import re
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+from notebook_discovery import (
+    add_selection_arguments, find_notebooks, is_solution_notebook, record_run,
+    select_notebooks,
+)
+from notebook_lint import lint_cache, lint_notebook
+from notebook_stream import NotebookReader, NotebookStreamError, rewrite_notebook, rewritten_size
+
+
+# Non-empty outputs list or numeric execution count (whitespace-tolerant)
+DIRTY_PATTERN = re.compile(rb'"outputs"\s*:\s*\[\s*[^\]\s]|"execution_count"\s*:\s*[0-9]')
+
+STATUS_RESULTS = {'cleared': True, 'skipped': None, 'error': False}
 
-def is_solution_notebook(file_path):
-    """Check if this is a solution notebook (which we should skip)."""
-    path_str = str(file_path).lower()
-    return (
-        '_solution' in path_str or
-        '/solution' in path_str or
-        'solutions/' in path_str
-    )
 
+def clear_cell_outputs(cell):
+    """Clear outputs and execution count from a code cell."""
+    if cell.get('cell_type') == 'code':
+        cell['outputs'] = []
+        cell['execution_count'] = None
+    return cell
 
-def clear_notebook_outputs(notebook_path, dry_run=False):
+
+def may_have_outputs(notebook_path):
     """
-    Clear all outputs from a Jupyter notebook.
+    Cheap pre-check: could this notebook have anything to clear?
+
+    Scans the raw bytes for a non-empty "outputs" list or a numeric
+    "execution_count" without parsing JSON. A False answer is definitive
+    (the notebook is clean); True only means a full parse is needed.
+    """
+    with open(notebook_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return False
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return DIRTY_PATTERN.search(data) is not None
+
+
+def clear_notebook(notebook_path, dry_run=False, cache=None):
+    """
+    Clear all outputs from a Jupyter notebook without printing.
 
     Args:
         notebook_path: Path to the notebook file
         dry_run: If True, don't write changes, just report what would happen
+        cache: Optional shared lint cache (see notebook_lint.lint_cache)
 
     Returns:
-        True if outputs were cleared, False if no outputs found or error
+        Dict with 'path', 'status' ('cleared', 'skipped', 'error'),
+        'message' (or None), 'output_count' and 'bytes_reclaimed'
     """
+    result = {
+        'path': str(notebook_path),
+        'status': 'error',
+        'message': None,
+        'output_count': 0,
+        'bytes_reclaimed': 0,
+    }
+
+    # First pass: count outputs with the shared lint engine (or its cache).
+    # Notebooks the cache doesn't know are pre-checked byte-wise first, so
+    # clean ones skip the lint engine; they are still streamed through the
+    # notebook reader (one cell in memory at a time) so malformed files are
+    # reported instead of skipped.
     try:
-        with open(notebook_path, 'r', encoding='utf-8') as f:
-            notebook = json.load(f)
-    except json.JSONDecodeError as e:
-        print(f"❌ Error: Invalid JSON in {notebook_path}: {e}")
-        return False
+        results = cache.get(notebook_path) if cache is not None else None
+        if results is None:
+            if not may_have_outputs(notebook_path):
+                with NotebookReader(notebook_path) as reader:
+                    reader.finish()
+                if not reader.has_cells:
+                    result['message'] = (f"⚠️  Warning: {notebook_path} doesn't have 'cells' key "
+                                         f"(not a notebook?)")
+                    return result
+                result['status'] = 'skipped'
+                return result
+            results = lint_notebook(notebook_path)
+            if cache is not None:
+                cache.put(notebook_path, results)
+        counts = results['output_count']
+    except (json.JSONDecodeError, NotebookStreamError) as e:
+        result['message'] = f"❌ Error: Invalid JSON in {notebook_path}: {e}"
+        return result
     except Exception as e:
-        print(f"❌ Error reading {notebook_path}: {e}")
-        return False
+        result['message'] = f"❌ Error reading {notebook_path}: {e}"
+        return result
+
+    output_count = counts['output_count']
+    result['output_count'] = output_count
 
     # Check notebook structure
-    if 'cells' not in notebook:
-        print(f"⚠️  Warning: {notebook_path} doesn't have 'cells' key (not a notebook?)")
-        return False
-
-    # Count outputs before clearing
-    output_count = 0
-    execution_count_found = False
-
-    for cell in notebook['cells']:
-        # Code cells have outputs and execution_count
-        if cell.get('cell_type') == 'code':
-            if cell.get('outputs'):
-                output_count += len(cell['outputs'])
-            if cell.get('execution_count') is not None:
-                execution_count_found = True
+    if not counts['has_cells']:
+        result['message'] = f"⚠️  Warning: {notebook_path} doesn't have 'cells' key (not a notebook?)"
+        return result
 
     # If no outputs found, skip
-    if output_count == 0 and not execution_count_found:
-        return None
-
-    # Clear outputs from code cells
-    for cell in notebook['cells']:
-        if cell.get('cell_type') == 'code':
-            cell['outputs'] = []
-            cell['execution_count'] = None
-
-    # Reset notebook metadata execution count
-    if 'metadata' in notebook:
-        if 'language_info' in notebook['metadata']:
-            # Keep language_info but clear version-specific details
-            pass
-        if 'kernelspec' in notebook['metadata']:
-            # Keep kernelspec but clear session details
-            pass
+    if output_count == 0 and not counts['execution_count_found']:
+        result['status'] = 'skipped'
+        return result
 
-    if dry_run:
-        print(f"🔍 Would clear {output_count} outputs from {notebook_path}")
-        return True
+    size_before = os.path.getsize(notebook_path)
 
-    # Write back to file
+    if dry_run:
+        try:
+            size_after = rewritten_size(notebook_path, clear_cell_outputs)
+        except Exception as e:
+            result['message'] = f"❌ Error reading {notebook_path}: {e}"
+            return result
+        result['bytes_reclaimed'] = size_before - size_after
+        result['status'] = 'cleared'
+        result['message'] = (f"🔍 Would clear {output_count} outputs from {notebook_path}"
+                             f" (would reclaim {format_bytes(result['bytes_reclaimed'])})")
+        return result
+
+    # Second pass: stream cells through clear_cell_outputs into a temp file
+    # that atomically replaces the original. Notebook metadata (kernelspec,
+    # language_info) is copied through unchanged.
     try:
-        with open(notebook_path, 'w', encoding='utf-8') as f:
-            json.dump(notebook, f, indent=1, ensure_ascii=False)
-            f.write('\n')  # Add trailing newline
-
-        print(f"✅ Cleared {output_count} outputs from {notebook_path}")
-        return True
-
+        rewrite_notebook(notebook_path, clear_cell_outputs)
     except Exception as e:
-        print(f"❌ Error writing {notebook_path}: {e}")
-        return False
+        result['message'] = f"❌ Error writing {notebook_path}: {e}"
+        return result
 
+    result['bytes_reclaimed'] = size_before - os.path.getsize(notebook_path)
+    result['status'] = 'cleared'
+    result['message'] = (f"✅ Cleared {output_count} outputs from {notebook_path}"
+                         f" (reclaimed {format_bytes(result['bytes_reclaimed'])})")
+    return result
 
-def find_all_notebooks(exclude_solutions=True):
+
+def clear_notebook_outputs(notebook_path, dry_run=False, cache=None):
     """
-    Find all notebooks in the repository.
+    Clear all outputs from a Jupyter notebook.
 
     Args:
-        exclude_solutions: If True, skip solution notebooks
+        notebook_path: Path to the notebook file
+        dry_run: If True, don't write changes, just report what would happen
+        cache: Optional shared lint cache (see notebook_lint.lint_cache)
 
     Returns:
-        List of Path objects for notebooks
+        True if outputs were cleared, None if no outputs found, False on error
     """
-    repo_root = Path(__file__).parent.parent
-    notebooks = []
+    result = clear_notebook(notebook_path, dry_run=dry_run, cache=cache)
+    if result['message']:
+        print(result['message'])
+    return STATUS_RESULTS[result['status']]
+
 
-    # Search in common directories
-    search_dirs = [
-        repo_root / 'notebooks',
-        repo_root / 'assignments',
-    ]
+def _clear_worker(task):
+    """Process-pool entry point: (notebook_path, dry_run) -> result dict."""
+    notebook_path, dry_run = task
+    return clear_notebook(notebook_path, dry_run=dry_run)
 
-    for search_dir in search_dirs:
-        if search_dir.exists():
-            for notebook in search_dir.rglob('*.ipynb'):
-                # Skip checkpoint files
-                if '.ipynb_checkpoints' in str(notebook):
-                    continue
 
-                # Skip solution notebooks if requested
-                if exclude_solutions and is_solution_notebook(notebook):
-                    continue
+def format_bytes(size_bytes):
+    """Format a byte count in human-readable form."""
+    if size_bytes < 1024:
+        return f"{size_bytes} B"
+    elif size_bytes < 1024 * 1024:
+        return f"{size_bytes/1024:.1f} KB"
+    else:
+        return f"{size_bytes/(1024*1024):.1f} MB"
+
 
-                notebooks.append(notebook)
+def find_all_notebooks(exclude_solutions=True):
+    """
+    Find all notebooks in the repository.
 
-    return sorted(notebooks)
+    Args:
+        exclude_solutions: If True, skip solution notebooks
+
+    Returns:
+        List of Path objects for notebooks
+    """
+    return find_notebooks(exclude_solutions=exclude_solutions)
 
 
 def main():
@@ -171,6 +241,8 @@ def main():
         help='Clear all teaching notebooks (excludes solutions)'
     )
 
+    add_selection_arguments(parser, include_all=False)
+
     parser.add_argument(
         '--dry-run',
         action='store_true',
@@ -183,12 +255,39 @@ def main():
         help='Include solution notebooks (use with caution!)'
     )
 
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Re-scan every notebook instead of reusing cached lint results'
+    )
+
+    parser.add_argument(
+        '-j', '--jobs',
+        type=int,
+        default=1,
+        help='Clear notebooks in N parallel processes (0 = one per CPU core)'
+    )
+
     args = parser.parse_args()
+    started = time.time()
 
     # Determine which notebooks to process
     notebooks_to_process = []
 
-    if args.all:
+    if args.changed_since or args.changed:
+        print("🔍 Finding changed notebooks...")
+        try:
+            notebooks_to_process = select_notebooks(
+                args, 'clear_outputs', paths=args.notebooks,
+                exclude_solutions=not args.include_solutions
+            )
+        except ValueError as e:
+            print(f"❌ Error: {e}")
+            return 1
+        print(f"📚 Found {len(notebooks_to_process)} changed notebooks")
+        if not notebooks_to_process:
+            return 0
+    elif args.all:
         print("🔍 Finding all teaching notebooks...")
         notebooks_to_process = find_all_notebooks(
             exclude_solutions=not args.include_solutions
@@ -204,7 +303,7 @@ def main():
                 print(f"⚠️  Warning: {notebook_pattern} not found")
     else:
         parser.print_help()
-        print("\n❌ Error: Provide notebook files or use --all")
+        print("\n❌ Error: Provide notebook files or use --all / --changed-since / --changed")
         return 1
 
     if not notebooks_to_process:
@@ -227,32 +326,55 @@ def main():
     cleared_count = 0
     skipped_count = 0
     error_count = 0
+    bytes_reclaimed = 0
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    cache = lint_cache(enabled=not args.no_cache)
+
+    if jobs > 1 and len(notebooks_to_process) > 1:
+        # Workers skip the cache; the byte pre-check already makes clean
+        # notebooks cheap. Results come back in input order.
+        with ProcessPoolExecutor(max_workers=min(jobs, len(notebooks_to_process))) as executor:
+            results = list(executor.map(
+                _clear_worker, [(nb, args.dry_run) for nb in notebooks_to_process]
+            ))
+    else:
+        results = (clear_notebook(nb, dry_run=args.dry_run, cache=cache)
+                   for nb in notebooks_to_process)
 
-    for notebook in notebooks_to_process:
-        result = clear_notebook_outputs(notebook, dry_run=args.dry_run)
-        if result is True:
+    for result in results:
+        if result['message']:
+            print(result['message'])
+        if result['status'] == 'cleared':
             cleared_count += 1
-        elif result is False:
+            bytes_reclaimed += result['bytes_reclaimed']
+        elif result['status'] == 'error':
             error_count += 1
-        elif result is None:
+        elif result['status'] == 'skipped':
             skipped_count += 1
 
+    cache.save()
+
     # Summary
     print("")
     if args.dry_run:
         print(f"🔍 Dry run complete:")
         print(f"   Would clear: {cleared_count}")
         print(f"   Would skip: {skipped_count} (no outputs)")
+        print(f"   Would reclaim: {format_bytes(bytes_reclaimed)}")
         if error_count > 0:
             print(f"   Errors: {error_count}")
     else:
         print(f"✅ Done:")
         print(f"   Cleared: {cleared_count}")
         print(f"   Skipped: {skipped_count} (no outputs)")
+        print(f"   Reclaimed: {format_bytes(bytes_reclaimed)}")
         if error_count > 0:
             print(f"   Errors: {error_count}")
             return 1
 
+    if args.all or args.changed:
+        record_run('clear_outputs', started)
+
     return 0
 
 
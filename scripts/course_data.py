@@ -0,0 +1,402 @@
+#!/usr/bin/env python3
+"""
+Course Data - Shared DuckDB database of pre-loaded course tables
+
+Every notebook opens duckdb.connect(':memory:') and parses the same CSVs
+again (Superstore through pandas + con.register, the Olist files with
+CREATE TABLE ... AS SELECT * FROM '...csv'). This module loads each course
+dataset once into an on-disk DuckDB database (.data_cache/course.duckdb)
+and hands out connections that already see those tables, so notebook setup
+takes milliseconds instead of seconds of CSV parsing.
+
+Tables are declared in TABLES (name -> source file and how it is read; the
+same reads and types the notebooks use). For every table the database
+records its source's size, mtime and SHA-256 and a hash of its definition:
+- size and mtime match      -> fresh (no read needed)
+- size matches, mtime moved -> hash the file; same hash is still fresh
+- anything else             -> only that table is reloaded
+A table whose source file disappeared is dropped.
+
+connect() returns a cursor on one in-memory database per process (the
+pool) with the cache database ATTACHed read-only and first on the search
+path after the in-memory schema: cached tables are read by plain name, and
+CREATE TABLE in a notebook goes to memory as before, so several notebooks
+can read the cache at the same time. When a table is stale, connect()
+reloads it in the cache; if another process holds the cache open it loads
+the table into its own in-memory database instead (correct, just not
+cached) and says so. The same happens while a cursor from an earlier
+connect() in this process still holds a result from the cache (DuckDB
+cannot reopen the file for writing until that result is gone).
+
+Usage (from a notebook in notebooks/dayN/):
+    import sys; sys.path.insert(0, '../../scripts')
+    from course_data import connect
+    con = connect()                            # every available table
+    con = connect('orders', 'customers')       # only check/load these
+    con.execute("SELECT COUNT(*) FROM orders").fetchone()
+
+    python scripts/course_data.py              # status of every table
+    python scripts/course_data.py --refresh    # load new / changed sources
+    python scripts/course_data.py --refresh orders --force
+"""
+
+import argparse
+import datetime
+import hashlib
+import inspect
+import os
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from notebook_cache import file_sha256
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_DB = REPO_ROOT / '.data_cache' / 'course.duckdb'
+CACHE_ALIAS = 'course'
+
+# What `SELECT * FROM 'file.csv'` in a notebook does
+CSV_SQL = "SELECT * FROM read_csv({source})"
+
+
+def _read_superstore(path):
+    """Superstore as the Day 1 notebooks load it (DuckDB rejects the file's cp1252 bytes)."""
+    import pandas as pd
+
+    superstore = pd.read_csv(path, encoding='latin-1')
+    superstore['Order Date'] = pd.to_datetime(superstore['Order Date'])
+    return superstore
+
+
+# name -> source (repo-relative), sql (with {source}) or loader (path -> DataFrame)
+TABLES: Dict[str, Dict[str, Any]] = {
+    # Day 1
+    'superstore': {'source': 'data/day1/Sample - Superstore.csv', 'loader': _read_superstore},
+    'dirty_cafe_sales': {'source': 'data/day1/dirty_cafe_sales.csv'},
+    # Day 2 (Olist, block A)
+    'orders': {'source': 'data/day2/block_a/olist_orders_dataset.csv'},
+    'customers': {'source': 'data/day2/block_a/olist_customers_dataset.csv'},
+    'order_items': {'source': 'data/day2/block_a/olist_order_items_dataset.csv'},
+    'products': {'source': 'data/day2/block_a/olist_products_dataset.csv'},
+    'sellers': {'source': 'data/day2/block_a/olist_sellers_dataset.csv'},
+    'order_payments': {'source': 'data/day2/block_a/olist_order_payments_dataset.csv'},
+    'order_reviews': {'source': 'data/day2/block_a/olist_order_reviews_dataset.csv'},
+    'category_translation': {'source': 'data/day2/block_a/product_category_name_translation.csv'},
+    'geolocation': {'source': 'data/day2/block_a/olist_geolocation_dataset.csv'},
+    # Day 3 (teaching and exercise subsets)
+    'olist_orders_subset': {'source': 'data/day3/teaching/olist_orders_subset.csv'},
+    'olist_customers_subset': {'source': 'data/day3/teaching/olist_customers_subset.csv'},
+    'olist_order_items_subset': {'source': 'data/day3/teaching/olist_order_items_subset.csv'},
+    'mini_orders': {'source': 'data/day3/exercise/mini_orders.csv'},
+    'mini_customers': {'source': 'data/day3/exercise/mini_customers.csv'},
+    'mini_items': {'source': 'data/day3/exercise/mini_order_items.csv'},
+}
+
+# One in-memory database per cache file per process; connect() hands out cursors
+_pool: Dict[str, Any] = {}
+# Tables connect() had to load into a pooled in-memory database instead of the cache
+_memory_tables: Dict[str, set] = {}
+
+
+def sql_string(value) -> str:
+    """
+    Value as a SQL string literal, for the places DuckDB takes no parameters
+    (table function arguments in templates, ATTACH, COPY ... TO).
+    """
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def source_path(name: str) -> Path:
+    return REPO_ROOT / TABLES[name]['source']
+
+
+def definition_hash(name: str) -> str:
+    """Hash of how a table is built, so editing its entry in TABLES reloads it."""
+    table = TABLES[name]
+    definition = (inspect.getsource(table['loader']) if 'loader' in table
+                  else table.get('sql', CSV_SQL))
+    return hashlib.sha256(definition.encode('utf-8')).hexdigest()[:16]
+
+
+def _selected(names) -> List[str]:
+    unknown = [name for name in names or () if name not in TABLES]
+    if unknown:
+        raise KeyError(f"unknown table(s): {', '.join(unknown)} (see TABLES in course_data.py)")
+    return list(names) if names else list(TABLES)
+
+
+def check_freshness(name: str, entry: Optional[Dict[str, Any]]) -> str:
+    """'fresh', 'touched' (fresh, mtime moved), 'stale' or 'missing' (no source file)."""
+    path = source_path(name)
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return 'missing'
+    if entry is None or entry['definition'] != definition_hash(name):
+        return 'stale'
+    if entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+        return 'fresh'
+    if entry['size'] == stat.st_size and file_sha256(path) == entry['sha256']:
+        return 'touched'
+    return 'stale'
+
+
+def _entries(con, database: str) -> Dict[str, Dict[str, Any]]:
+    """Recorded sources by table name ({} for a new database)."""
+    # Literals, not parameters: binding parameters makes DuckDB import pandas
+    exists = con.execute(
+        f"SELECT count(*) FROM duckdb_tables() WHERE database_name = {sql_string(database)} "
+        f"AND table_name = '_sources'").fetchone()[0]
+    if not exists:
+        return {}
+    cursor = con.execute(f"SELECT * FROM {database}.main._sources")
+    columns = [column[0] for column in cursor.description]
+    return {row[0]: dict(zip(columns, row)) for row in cursor.fetchall()}
+
+
+def _load_table(con, name: str, target: str):
+    """(Re)create target from a table's source."""
+    table = TABLES[name]
+    path = source_path(name)
+    if 'loader' in table:
+        con.register('_source_frame', table['loader'](path))
+        try:
+            con.execute(f"CREATE OR REPLACE TABLE {target} AS SELECT * FROM _source_frame")
+        finally:
+            con.unregister('_source_frame')
+    else:
+        sql = table.get('sql', CSV_SQL).format(source=sql_string(path))
+        con.execute(f"CREATE OR REPLACE TABLE {target} AS {sql}")
+
+
+def _refresh(con, database: str, names: List[str], force: bool = False) -> Dict[str, str]:
+    """refresh() on a connection with the cache database attached read-write as `database`."""
+    schema = f"{database}.main"
+    con.execute(f"""
+        CREATE TABLE IF NOT EXISTS {schema}._sources (
+            name       TEXT PRIMARY KEY,
+            source     TEXT,
+            size       BIGINT,
+            mtime_ns   BIGINT,
+            sha256     TEXT,
+            definition TEXT,
+            rows       BIGINT,
+            loaded_at  TIMESTAMP
+        )
+    """)
+    entries = _entries(con, database)
+    results = {}
+    for name in names:
+        state = check_freshness(name, entries.get(name))
+        if state == 'missing':
+            if name in entries:
+                con.execute(f"DROP TABLE IF EXISTS {schema}.{name}")
+                con.execute(f"DELETE FROM {schema}._sources WHERE name = ?", [name])
+            results[name] = 'dropped' if name in entries else 'missing'
+            continue
+        path = source_path(name)
+        stat = os.stat(path)
+        if state == 'touched' and not force:
+            con.execute(f"UPDATE {schema}._sources SET mtime_ns = ? WHERE name = ?",
+                        [stat.st_mtime_ns, name])
+        if state in ('fresh', 'touched') and not force:
+            results[name] = 'fresh'
+            continue
+
+        con.execute("BEGIN TRANSACTION")
+        try:
+            _load_table(con, name, f"{schema}.{name}")
+            rows = con.execute(f"SELECT count(*) FROM {schema}.{name}").fetchone()[0]
+            con.execute(f"INSERT OR REPLACE INTO {schema}._sources VALUES (?, ?, ?, ?, ?, ?, ?, ?)", [
+                name, TABLES[name]['source'], stat.st_size, stat.st_mtime_ns,
+                file_sha256(path), definition_hash(name), rows, datetime.datetime.now(),
+            ])
+            con.execute("COMMIT")
+        except BaseException:
+            con.execute("ROLLBACK")
+            raise
+        results[name] = 'loaded'
+    return results
+
+
+def refresh(names=None, db_path=DEFAULT_DB, force: bool = False) -> Dict[str, str]:
+    """
+    Bring tables (default: all) in the cache database up to date.
+
+    Returns {name: 'loaded' | 'fresh' | 'missing' | 'dropped'}. Needs the
+    database file to itself; raises duckdb.IOException while another process
+    has it open. Inside a process that uses connect(), let connect() reload
+    instead: the file is already attached there.
+    """
+    import duckdb
+
+    names = _selected(names)
+    db_path = Path(db_path)
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    # Attached under a fixed alias: the file name need not be a valid SQL name
+    con = duckdb.connect(':memory:')
+    try:
+        _attach(con, db_path, read_only=False)
+        return _refresh(con, CACHE_ALIAS, names, force)
+    finally:
+        con.close()
+
+
+def _attach(base, db_path: Path, read_only: bool = True):
+    base.execute(f"ATTACH {sql_string(db_path)} AS {CACHE_ALIAS}"
+                 + (" (READ_ONLY)" if read_only else ""))
+
+
+def _attached(base) -> bool:
+    return base.execute(f"SELECT count(*) FROM duckdb_databases() "
+                        f"WHERE database_name = {sql_string(CACHE_ALIAS)}").fetchone()[0] > 0
+
+
+def connect(*tables: str, db_path=DEFAULT_DB):
+    """
+    A DuckDB connection that sees the cached tables (default: all whose
+    source exists) by name; stale ones are reloaded first. New tables go to
+    the connection's in-memory database.
+    """
+    import duckdb
+
+    db_path = Path(db_path).resolve()
+    names = [name for name in _selected(tables)
+             if tables or source_path(name).exists()]
+    base = _pool.get(str(db_path))
+    if base is None:
+        base = _pool[str(db_path)] = duckdb.connect(':memory:')
+        if db_path.exists():
+            _attach(base, db_path)
+
+    entries = _entries(base, CACHE_ALIAS) if _attached(base) else {}
+    states = {name: check_freshness(name, entries.get(name)) for name in names}
+    stale = [name for name in names if states[name] == 'stale'
+             or (name in entries and states[name] == 'missing')]
+    # Same content, new mtime: record the mtime so the file is not hashed again
+    touched = [name for name in names if states[name] == 'touched']
+    missing = [name for name in names if name not in entries and not source_path(name).exists()]
+    if missing:
+        raise FileNotFoundError(f"no source file for: "
+                                + ', '.join(f"{name} ({TABLES[name]['source']})" for name in missing))
+
+    in_memory = _memory_tables.setdefault(str(db_path), set())
+    for name in in_memory.intersection(name for name in names if states[name] in ('fresh', 'touched')):
+        # The cache matches the source again: stop shadowing it
+        base.execute(f"DROP TABLE IF EXISTS memory.main.{name}")
+        in_memory.discard(name)
+
+    if stale or touched:
+        # Reload through the pooled connection: opening the file a second
+        # time in this process would clash with the attached copy
+        if _attached(base):
+            base.execute(f"DETACH {CACHE_ALIAS}")
+        try:
+            db_path.parent.mkdir(parents=True, exist_ok=True)
+            _attach(base, db_path, read_only=False)
+        except (duckdb.IOException, duckdb.BinderException) as e:
+            # IOException: another process (e.g. a second notebook) has the
+            # cache open. BinderException: a cursor from an earlier connect()
+            # still holds a result from the cache, which keeps the file open
+            # read-only in this process
+            # (touched tables are correct in the cache; their mtime can wait)
+            reason = ("in use by another process" if isinstance(e, duckdb.IOException)
+                      else "still read by an earlier connection")
+            if stale:
+                print(f"⚠️  {db_path.name} is {reason} - loading "
+                      f"{', '.join(stale)} into memory without caching")
+            for name in stale:
+                if source_path(name).exists():
+                    _load_table(base, name, f"memory.main.{name}")
+                    in_memory.add(name)
+        else:
+            try:
+                _refresh(base, CACHE_ALIAS, stale + touched)
+            finally:
+                base.execute(f"DETACH {CACHE_ALIAS}")
+            for name in in_memory.intersection(stale):
+                # The cache is current again: stop shadowing it
+                base.execute(f"DROP TABLE IF EXISTS memory.main.{name}")
+                in_memory.discard(name)
+        if db_path.exists():
+            _attach(base, db_path)
+
+    con = base.cursor()
+    if _attached(base):
+        con.execute(f"SET search_path = 'memory.main,{CACHE_ALIAS}.main'")
+    return con
+
+
+def status(db_path=DEFAULT_DB) -> List[Dict[str, Any]]:
+    """One row per table: state, rows and when it was loaded."""
+    import duckdb
+
+    db_path = Path(db_path)
+    entries = {}
+    if db_path.exists():
+        con = duckdb.connect(':memory:')
+        _attach(con, db_path)
+        entries = _entries(con, CACHE_ALIAS)
+        con.close()
+    rows = []
+    for name in TABLES:
+        entry = entries.get(name)
+        state = check_freshness(name, entry)
+        if state == 'missing' and entry is not None:
+            state = 'orphaned'
+        rows.append({
+            'name': name,
+            'source': TABLES[name]['source'],
+            'state': 'fresh' if state == 'touched' else state,
+            'rows': entry['rows'] if entry else None,
+            'loaded_at': entry['loaded_at'] if entry else None,
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Show or refresh the shared DuckDB cache of course tables',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument('--db', default=str(DEFAULT_DB),
+                        help=f'Cache database (default: {DEFAULT_DB.relative_to(REPO_ROOT)})')
+    parser.add_argument('--refresh', nargs='*', metavar='TABLE',
+                        help='Load new or changed sources (all tables if none given)')
+    parser.add_argument('--force', action='store_true',
+                        help='With --refresh: reload even unchanged tables')
+    args = parser.parse_args()
+
+    try:
+        import duckdb
+    except ImportError:
+        print("❌ Error: the course data cache needs duckdb: pip install duckdb")
+        sys.exit(1)
+
+    if args.refresh is not None:
+        print(f"🔄 Refreshing {args.db}...")
+        try:
+            results = refresh(args.refresh, args.db, force=args.force)
+        except KeyError as e:
+            print(f"❌ Error: {e.args[0]}")
+            sys.exit(1)
+        except duckdb.IOException:
+            print(f"❌ Error: {args.db} is open in another process (close running notebooks first)")
+            sys.exit(1)
+        for name, result in results.items():
+            if result in ('loaded', 'dropped'):
+                print(f"   {'✓' if result == 'loaded' else '-'} {name}: {result}")
+        print(f"✅ {sum(result == 'loaded' for result in results.values())} loaded, "
+              f"{sum(result == 'fresh' for result in results.values())} unchanged")
+
+    print(f"\n📊 {args.db}")
+    icons = {'fresh': '✅', 'stale': '🔄', 'missing': '➖', 'orphaned': '⚠️ '}
+    for row in status(args.db):
+        rows = f"{row['rows']:,} rows" if row['rows'] is not None else ''
+        print(f"   {icons[row['state']]} {row['name']:26s} {row['state']:8s} {rows:>14s}  {row['source']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -258,20 +258,20 @@ add_code_cell("""# BRONZE: Load raw data
 print("=== BRONZE LAYER: Raw Ingestion ===\\n")
 
 # Load orders as-is
-bronze_orders = con.execute("""\"
+bronze_orders = con.execute(\"\"\"
     CREATE TABLE bronze_orders AS
     SELECT * FROM 'data/day3/teaching/olist_orders_subset.csv'
-\"\""").df()
+\"\"\").df()
 
-bronze_customers = con.execute("""\"
+bronze_customers = con.execute(\"\"\"
     CREATE TABLE bronze_customers AS
     SELECT * FROM 'data/day3/teaching/olist_customers_subset.csv'
-\"\""").df()
+\"\"\").df()
 
-bronze_items = con.execute("""\"
+bronze_items = con.execute(\"\"\"
     CREATE TABLE bronze_order_items AS
     SELECT * FROM 'data/day3/teaching/olist_order_items_subset.csv'
-\"\""").df()
+\"\"\").df()
 
 # Check what we loaded
 print("Loaded bronze tables:")
@@ -302,7 +302,7 @@ add_code_cell("""# SILVER: Clean and validate
 print("=== SILVER LAYER: Clean & Validate ===\\n")
 
 # Transform orders: Fix types, validate
-con.execute("""\"
+con.execute(\"\"\"
     CREATE TABLE silver_orders AS
     SELECT
         order_id,
@@ -312,10 +312,10 @@ con.execute("""\"
         TRY_CAST(order_delivered_customer_date AS TIMESTAMP) as delivery_date
     FROM bronze_orders
     WHERE order_id IS NOT NULL  -- Remove any rows without ID
-\"\""")
+\"\"\")
 
 # Transform customers: Clean types
-con.execute("""\"
+con.execute(\"\"\"
     CREATE TABLE silver_customers AS
     SELECT
         customer_id,
@@ -324,10 +324,10 @@ con.execute("""\"
         customer_state as state
     FROM bronze_customers
     WHERE customer_id IS NOT NULL
-\"\""")
+\"\"\")
 
 # Transform order items: Clean and calculate
-con.execute("""\"
+con.execute(\"\"\"
     CREATE TABLE silver_order_items AS
     SELECT
         order_id,
@@ -339,7 +339,7 @@ con.execute("""\"
     FROM bronze_order_items
     WHERE order_id IS NOT NULL
         AND product_id IS NOT NULL
-\"\""")
+\"\"\")
 
 print("Created silver tables with clean types")
 print(f"  - silver_orders: {con.execute('SELECT COUNT(*) FROM silver_orders').fetchone()[0]} rows")
@@ -387,12 +387,12 @@ order_ids_in_orders = con.execute("SELECT COUNT(DISTINCT order_id) FROM silver_o
 order_ids_in_items = con.execute("SELECT COUNT(DISTINCT order_id) FROM silver_order_items").fetchone()[0]
 
 # Check: All items belong to valid orders
-orphaned_items = con.execute("""\"
+orphaned_items = con.execute(\"\"\"
     SELECT COUNT(*)
     FROM silver_order_items i
     LEFT JOIN silver_orders o ON i.order_id = o.order_id
     WHERE o.order_id IS NULL
-\"\""").fetchone()[0]
+\"\"\").fetchone()[0]
 
 print(f"✓ Check 3: Foreign key integrity?")
 print(f"  Orders with items: {order_ids_in_items}")
@@ -436,7 +436,7 @@ add_code_cell("""# GOLD: Business metrics
 print("=== GOLD LAYER: Business Metrics ===\\n")
 
 # Gold table 1: Daily sales summary
-con.execute("""\"
+con.execute(\"\"\"
     CREATE TABLE gold_daily_sales AS
     SELECT
         CAST(o.order_date AS DATE) as date,
@@ -449,7 +449,7 @@ con.execute("""\"
     WHERE o.order_date IS NOT NULL
     GROUP BY CAST(o.order_date AS DATE)
     ORDER BY date
-\"\""")
+\"\"\")
 
 print("Created gold_daily_sales table")
 print("\\nSample data:")
@@ -457,7 +457,7 @@ result = con.execute("SELECT * FROM gold_daily_sales LIMIT 5").df()
 display(result)
 
 # Gold table 2: Customer summary
-con.execute("""\"
+con.execute(\"\"\"
     CREATE TABLE gold_customer_summary AS
     SELECT
         c.customer_id,
@@ -470,7 +470,7 @@ con.execute("""\"
     INNER JOIN silver_orders o ON c.customer_id = o.customer_id
     INNER JOIN silver_order_items i ON o.order_id = i.order_id
     GROUP BY c.customer_id, c.state
-\"\""")
+\"\"\")
 
 print("\\nCreated gold_customer_summary table")
 print("Sample data:")
@@ -625,7 +625,7 @@ print("\\nBetter approach: Check what format you have")
 print("For Olist data, we have ISO 8601 (YYYY-MM-DD HH:MM:SS)")
 print("DuckDB's TRY_CAST handles this gracefully:")
 
-result = con.execute("""\"
+result = con.execute(\"\"\"
     SELECT
         order_purchase_timestamp as original,
         TRY_CAST(order_purchase_timestamp AS TIMESTAMP) as parsed,
@@ -636,7 +636,7 @@ result = con.execute("""\"
         END as parse_status
     FROM bronze_orders
     LIMIT 5
-\"\""").df()
+\"\"\").df()
 display(result)
 
 print("\\n💡 Tips for dates:")
@@ -654,13 +654,13 @@ print("=== TYPE CHECKING ===\\n")
 
 # Check types in silver layer
 print("Silver layer column types:")
-result = con.execute("""\"
+result = con.execute(\"\"\"
     SELECT
         column_name,
         data_type
     FROM information_schema.columns
     WHERE table_name = 'silver_order_items'
-\"\""").df()
+\"\"\").df()
 display(result)
 
 print("\\nValidate types match expectations:")
@@ -692,7 +692,7 @@ add_code_cell("""# NULL handling
 print("=== NULL HANDLING ===\\n")
 
 # Check NULL counts in silver
-result = con.execute("""\"
+result = con.execute(\"\"\"
     SELECT
         COUNT(*) as total_rows,
         COUNT(order_id) as non_null_order_id,
@@ -700,7 +700,7 @@ result = con.execute("""\"
         COUNT(order_date) as non_null_order_date,
         COUNT(delivery_date) as non_null_delivery_date
     FROM silver_orders
-\"\""").df()
+\"\"\").df()
 
 print("NULL counts in silver_orders:")
 display(result)
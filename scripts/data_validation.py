@@ -0,0 +1,597 @@
+#!/usr/bin/env python3
+"""
+Data Validation - Declarative data-quality rules checked in one scan per table
+
+The Day 3 notebook validates the silver layer with one query per assertion
+(COUNT(*), then COUNT(DISTINCT order_id), then COUNT(*) WHERE ... IS NULL,
+and so on), and every query reads the table again. Here the rules are
+declared once and all the rules for a table are compiled into a single
+aggregate query: each rule becomes a COUNT(*) FILTER (WHERE <violation>)
+column, and foreign keys become LEFT JOINs against the distinct keys of the
+referenced table. A table with 100M rows is read once whatever the number of
+rules, and nothing is pulled into Python except the counts.
+
+Rules:
+    unique('order_id')                    no duplicate keys (NULLs ignored)
+    unique('order_id', 'order_item_id')   composite key
+    not_null('order_id', 'customer_id')   one result per column
+    fk('order_id', 'silver_orders')       every non-NULL key exists there
+    fk('seller_id', 'sellers', 'id')      referenced column named differently
+    in_range('price', min=0)              min / max inclusive, NULLs ignored
+
+Only for rules that fail, a second small query fetches a few offending rows
+(LIMIT --sample), so a clean table costs exactly one scan.
+
+Every rule takes a tolerance (fraction of rows allowed to fail, default 0).
+
+Approximate mode (--approximate) is for tables of hundreds of millions of
+rows, where the exact COUNT(DISTINCT) and key joins dominate a run:
+
+    unique     HyperLogLog distinct count (2^16 registers, 0.4% error)
+    fk         Bloom filter of the referenced keys (~10 bits per key, 1%
+               false positives) probed in one scan; no hash table of keys.
+               Orphans it finds are certain, but a missed orphan key hides
+               all of its rows, so it only proves failures: a rule that may
+               pass is confirmed exactly
+    not_null,  reservoir sample of --sample-rows rows, Wilson interval
+    in_range
+
+Each approximate result reports low / high bounds on the offending rows
+(3 standard errors). When the bounds straddle the rule's threshold the rule
+is checked exactly instead, all such rules together in one scan.
+
+Bounds never reach 0, so a rule with tolerance 0 can be approximately
+failed but never passed; on a clean table that would be a wasted scan
+before the exact one. Such rules, and fk rules whose key types differ from
+the referenced columns (their hashes would not match), therefore go
+straight to the exact scan. Give rules a tolerance to use approximate mode. Tables no
+larger than the sample are always checked exactly.
+
+Usage:
+    python scripts/data_validation.py                       # Day 3 silver checks
+    python scripts/data_validation.py --db warehouse.duckdb --sample 10
+    python scripts/data_validation.py --db warehouse.duckdb --approximate --sample-rows 200000
+
+    from data_validation import validate, unique, not_null, fk, in_range
+    report = validate(con, 'silver_order_items', [
+        not_null('order_id', 'product_id'),
+        fk('order_id', 'silver_orders'),
+        in_range('price', min=0),
+    ])
+    print_report(report)
+    assert report['passed'], "Data quality checks failed!"
+
+    report = validate(con, 'permits', [unique('permit_id', tolerance=0.02)], approximate=True)
+"""
+
+import argparse
+import math
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_DB = REPO_ROOT / 'data' / 'day3' / 'olist_pipeline.duckdb'
+DEFAULT_SAMPLE = 5
+
+
+def unique(*columns: str, tolerance: float = 0.0) -> Dict[str, Any]:
+    """The column (or combination of columns) identifies a row."""
+    return {'check': 'unique', 'columns': list(columns), 'tolerance': tolerance}
+
+
+def not_null(*columns: str, tolerance: float = 0.0) -> Dict[str, Any]:
+    """None of the columns may be NULL (reported per column)."""
+    return {'check': 'not_null', 'columns': list(columns), 'tolerance': tolerance}
+
+
+def fk(columns, ref_table: str, ref_columns=None, tolerance: float = 0.0) -> Dict[str, Any]:
+    """Every non-NULL key in columns exists in ref_table (same column names by default)."""
+    columns = [columns] if isinstance(columns, str) else list(columns)
+    if ref_columns is None:
+        ref_columns = columns
+    ref_columns = [ref_columns] if isinstance(ref_columns, str) else list(ref_columns)
+    if len(ref_columns) != len(columns):
+        raise ValueError(f"fk {columns} -> {ref_table}{ref_columns}: column counts differ")
+    return {'check': 'fk', 'columns': columns, 'ref_table': ref_table, 'ref_columns': ref_columns,
+            'tolerance': tolerance}
+
+
+def in_range(column: str, min=None, max=None, tolerance: float = 0.0) -> Dict[str, Any]:
+    """Non-NULL values lie within [min, max] (either bound may be omitted)."""
+    if min is None and max is None:
+        raise ValueError(f"in_range('{column}') needs min or max")
+    return {'check': 'in_range', 'columns': [column], 'min': min, 'max': max,
+            'tolerance': tolerance}
+
+
+def _ident(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _literal(value) -> str:
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, (int, float)):
+        return repr(value)
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def rule_name(rule: Dict[str, Any]) -> str:
+    """Short description of a (compiled, single-column for not_null) rule."""
+    arguments = ', '.join(rule['columns'])
+    if rule['check'] == 'fk':
+        arguments += f" -> {rule['ref_table']}.{', '.join(rule['ref_columns'])}"
+    if rule['check'] == 'in_range':
+        arguments += ''.join(f", {key}={rule[key]!r}" for key in ('min', 'max')
+                             if rule[key] is not None)
+    if rule.get('tolerance'):
+        arguments += f", tolerance={rule['tolerance']:g}"
+    return f"{rule['check']}({arguments})"
+
+
+def compile_rules(table: str, rules: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Compile rules into one aggregate query over table.
+
+    Returns {'sql': query, 'rules': [rule with 'aggregate' (its failure
+    count), 'violation' (row predicate over alias t), 'join' (the LEFT JOIN
+    a fk rule needs) and 'result' (column alias)]}.
+    not_null rules are split into one rule per column.
+    """
+    compiled, aggregates, joins = [], ['count(*) AS "_rows"'], []
+
+    def add(rule, aggregate, violation=None, join=None):
+        alias = f'r{len(compiled)}'
+        compiled.append({**rule, 'violation': violation, 'join': join, 'aggregate': aggregate,
+                         'result': alias})
+        aggregates.append(f'{aggregate} AS {alias}')
+
+    for rule in rules:
+        columns = [f't.{_ident(column)}' for column in rule['columns']]
+        present = ' AND '.join(f'{column} IS NOT NULL' for column in columns)
+        check = rule['check']
+
+        if check == 'not_null':
+            for name, column in zip(rule['columns'], columns):
+                violation = f'{column} IS NULL'
+                add({**rule, 'columns': [name]}, f'count(*) FILTER (WHERE {violation})', violation)
+        elif check == 'unique':
+            key = columns[0] if len(columns) == 1 else f"row({', '.join(columns)})"
+            # Rows beyond the first for each key; the sample query finds them by key
+            add(rule, f'count(*) FILTER (WHERE {present}) '
+                      f'- count(DISTINCT {key}) FILTER (WHERE {present})')
+        elif check == 'fk':
+            ref = f'fk{len(joins)}'
+            keys = ', '.join(f'{_ident(column)} AS k{i}' for i, column in enumerate(rule['ref_columns']))
+            condition = ' AND '.join(f'{column} = {ref}.k{i}' for i, column in enumerate(columns))
+            join = f"LEFT JOIN (SELECT DISTINCT {keys} FROM {rule['ref_table']}) {ref} ON {condition}"
+            joins.append(join)
+            violation = f'{present} AND {ref}.k0 IS NULL'
+            add(rule, f'count(*) FILTER (WHERE {violation})', violation, join)
+        elif check == 'in_range':
+            bounds = []
+            if rule['min'] is not None:
+                bounds.append(f"{columns[0]} < {_literal(rule['min'])}")
+            if rule['max'] is not None:
+                bounds.append(f"{columns[0]} > {_literal(rule['max'])}")
+            violation = ' OR '.join(bounds)
+            add(rule, f'count(*) FILTER (WHERE {violation})', f'({violation})')
+        else:
+            raise ValueError(f"unknown check: {check}")
+
+    sql = f"SELECT {', '.join(aggregates)} FROM {table} t {' '.join(joins)}"
+    return {'sql': sql, 'rules': compiled}
+
+
+def _sample_rows(con, table: str, rule: Dict[str, Any], limit: int):
+    """A few rows violating one rule (as dicts)."""
+    if rule['check'] == 'unique':
+        columns = ', '.join(_ident(column) for column in rule['columns'])
+        present = ' AND '.join(f'{_ident(column)} IS NOT NULL' for column in rule['columns'])
+        query = (f"SELECT t.* FROM {table} t WHERE ({columns}) IN ("
+                 f"SELECT ({columns}) FROM {table} WHERE {present} "
+                 f"GROUP BY ALL HAVING count(*) > 1 LIMIT {limit}) "
+                 f"ORDER BY {columns} LIMIT {limit}")
+    else:
+        query = f"SELECT t.* FROM {table} t {rule['join'] or ''} WHERE {rule['violation']} LIMIT {limit}"
+    cursor = con.execute(query)
+    names = [column[0] for column in cursor.description]
+    return [dict(zip(names, row)) for row in cursor.fetchall()]
+
+
+def _result(rule: Dict[str, Any], failures: int, rows: int, method: str = 'exact',
+            low: Optional[float] = None, high: Optional[float] = None) -> Dict[str, Any]:
+    """One rule's report entry; low / high bound the failure count (equal for exact checks)."""
+    return {
+        'rule': rule_name(rule),
+        'check': rule['check'],
+        'columns': rule['columns'],
+        'failures': failures,
+        'passed': failures <= rule.get('tolerance', 0.0) * rows,
+        'method': method,
+        'low': failures if low is None else low,
+        'high': failures if high is None else high,
+        'fallback': False,
+        'sample': [],
+    }
+
+
+def _exact(con, table: str, compiled: List[Dict[str, Any]], sample: int):
+    """Row count and exact results of compiled rules (or a subset of them), in one query."""
+    aggregates = ['count(*)'] + [f"{rule['aggregate']} AS {rule['result']}" for rule in compiled]
+    joins = ' '.join(rule['join'] for rule in compiled if rule['join'])
+    counts = con.execute(f"SELECT {', '.join(aggregates)} FROM {table} t {joins}").fetchone()
+    results = []
+    for rule, failures in zip(compiled, counts[1:]):
+        result = _result(rule, int(failures or 0), counts[0])
+        if result['failures'] and sample:
+            result['sample'] = _sample_rows(con, table, rule, sample)
+        results.append(result)
+    return counts[0], results
+
+
+# Approximate tier: HyperLogLog registers (2^HLL_PRECISION, standard error
+# 1.04 / sqrt(registers) = 0.4%), Bloom filters sized for BLOOM_FPR, and
+# reservoir samples of DEFAULT_SAMPLE_ROWS rows. Bounds are estimate +- z
+# standard errors (z = 3 by default).
+HLL_PRECISION = 16
+BLOOM_FPR = 0.01
+DEFAULT_SAMPLE_ROWS = 100_000
+DEFAULT_Z = 3.0
+FETCH_VECTORS = 512  # DuckDB vectors (2048 rows) per chunk pulled into numpy
+
+
+def _key_hash(columns: List[str], alias: str = 't') -> str:
+    return f"hash({', '.join(f'{alias}.{_ident(column)}' for column in columns)})"
+
+
+def _present(columns: List[str], alias: str = 't') -> str:
+    return ' AND '.join(f'{alias}.{_ident(column)} IS NOT NULL' for column in columns)
+
+
+def _hll_unique(con, table: str, rules: List[Dict[str, Any]], z: float):
+    """
+    Estimated duplicate rows per unique rule from one scan: the high bits of
+    each key hash pick a register, the leading zeros of the rest give its
+    rank, and the registers give a distinct-count estimate (HyperLogLog).
+    DuckDB's approx_count_distinct is not used: its few registers give
+    errors of 10% and more.
+    """
+    registers = 1 << HLL_PRECISION
+    low_bits = 64 - HLL_PRECISION
+    mask = f"{(1 << low_bits) - 1}::UBIGINT"
+    hashes = ', '.join(
+        f"CASE WHEN {_present(rule['columns'])} THEN {_key_hash(rule['columns'])} END AS h{i}"
+        for i, rule in enumerate(rules))
+    registers_of = ', '.join(f"h{i} >> {low_bits} AS g{i}" for i in range(len(rules)))
+    # One grouping set per rule: rows of set i have grouping(g{i}) = 0
+    columns = ', '.join(
+        f"grouping(g{i}), g{i}, count(h{i}), max(CASE WHEN (h{i} & {mask}) = 0 THEN {low_bits + 1} "
+        f"ELSE {low_bits} - floor(log2(h{i} & {mask}))::INTEGER END)"
+        for i in range(len(rules)))
+    groups = ', '.join(f"(g{i})" for i in range(len(rules)))
+    ranks, present = [{} for _ in rules], [0] * len(rules)
+    for row in con.execute(f"""
+            SELECT {columns}
+            FROM (SELECT *, {registers_of} FROM (SELECT {hashes} FROM {table} t))
+            GROUP BY GROUPING SETS ({groups})
+        """).fetchall():
+        i = row[::4].index(0)
+        _, register, count, rank = row[4 * i:4 * i + 4]
+        if register is not None:
+            ranks[i][register] = rank
+            present[i] += count
+
+    alpha = 0.7213 / (1 + 1.079 / registers)
+    error = 1.04 / math.sqrt(registers)
+    estimates = []
+    for filled, rows in zip(ranks, present):
+        empty = registers - len(filled)
+        distinct = alpha * registers * registers / (sum(2.0 ** -rank for rank in filled.values()) + empty)
+        if distinct <= 2.5 * registers and empty:
+            distinct = registers * math.log(registers / empty)  # linear counting
+        distinct = min(distinct, rows)
+        low = max(0.0, rows - distinct * (1 + z * error))
+        high = max(0.0, min(rows - 1.0, rows - distinct * (1 - z * error)))
+        estimates.append((rows - distinct, low, high))
+    return estimates
+
+
+def _chunks(con, query: str):
+    """Result of query as numpy column arrays, about a million rows at a time."""
+    result = con.execute(query)
+    while True:
+        chunk = result.fetch_df_chunk(FETCH_VECTORS)
+        if not len(chunk):
+            return
+        yield [chunk[column].to_numpy() for column in chunk.columns]
+
+
+def _bloom_positions(hashes, bits: int, probes: int):
+    """Bit positions of 64-bit key hashes (double hashing: h1 + i * h2)."""
+    import numpy as np
+
+    h1 = hashes & np.uint64(0xFFFFFFFF)
+    h2 = (hashes >> np.uint64(32)) | np.uint64(1)
+    return [(h1 + np.uint64(i) * h2) % np.uint64(bits) for i in range(probes)]
+
+
+def _bloom_fk(con, table: str, rules: List[Dict[str, Any]]):
+    """
+    Orphan rows per fk rule: the referenced keys go into a Bloom filter
+    (about 10 bits per key instead of a hash table of the keys), and one
+    scan of the table probes it. This bounds memory rather than time: while
+    the keys fit in memory DuckDB's hash join is about as fast.
+
+    A key the filter does not contain is certainly an orphan, so the rows
+    found are a lower bound. The filter misses an orphan key with its false
+    positive rate, and then misses every row of that key together, so
+    nothing better than "every row with a key" bounds the orphans from
+    above; a rule that is not proven to fail goes to the exact check.
+    """
+    import numpy as np
+
+    filters = []
+    for rule in rules:
+        ref = rule['ref_columns']
+        keys = con.execute(f"SELECT count(*) FROM {rule['ref_table']} r "
+                           f"WHERE {_present(ref, 'r')}").fetchone()[0]
+        bits = max(64, math.ceil(-max(keys, 1) * math.log(BLOOM_FPR) / math.log(2) ** 2))
+        probes = max(1, round(bits / max(keys, 1) * math.log(2)))
+        bloom = np.zeros((bits + 7) // 8, dtype=np.uint8)
+        for hashes, in _chunks(con, f"SELECT {_key_hash(ref, 'r')} FROM {rule['ref_table']} r "
+                                    f"WHERE {_present(ref, 'r')}"):
+            for position in _bloom_positions(hashes.astype(np.uint64), bits, probes):
+                np.bitwise_or.at(bloom, (position >> np.uint64(3)).astype(np.int64),
+                                 np.left_shift(1, position & np.uint64(7)).astype(np.uint8))
+        fill = np.unpackbits(bloom)[:bits].mean()
+        filters.append((bloom, bits, probes, float(fill) ** probes))
+
+    columns = ', '.join(f"{_key_hash(rule['columns'])} AS h{i}, "
+                        f"({_present(rule['columns'])}) AS p{i}" for i, rule in enumerate(rules))
+    orphans = [0] * len(rules)
+    keyed = [0] * len(rules)
+    for arrays in _chunks(con, f"SELECT {columns} FROM {table} t"):
+        for i, (bloom, bits, probes, _) in enumerate(filters):
+            hashes, present = arrays[2 * i].astype(np.uint64), arrays[2 * i + 1].astype(bool)
+            found = np.ones(len(hashes), dtype=bool)
+            for position in _bloom_positions(hashes, bits, probes):
+                found &= ((bloom[(position >> np.uint64(3)).astype(np.int64)]
+                           >> (position & np.uint64(7)).astype(np.uint8)) & 1).astype(bool)
+            orphans[i] += int((present & ~found).sum())
+            keyed[i] += int(present.sum())
+
+    return [(float(found), float(found), float(with_key), fpr)
+            for found, with_key, (_, _, _, fpr) in zip(orphans, keyed, filters)]
+
+
+def _sampled(con, table: str, rules: List[Dict[str, Any]], rows: int, sample_rows: int,
+             z: float, sample: int):
+    """
+    Estimated failures per row-level rule (not_null, in_range) from a
+    reservoir sample; bounds are the Wilson score interval scaled to the
+    table. Offending sample rows come from the sample itself. (DuckDB's
+    faster system sampling takes whole vectors of adjacent rows, so defects
+    that arrive together, e.g. one bad load, would make its bounds wrong.)
+    """
+    con.execute(f"CREATE OR REPLACE TEMP TABLE _validation_sample AS "
+                f"SELECT * FROM {table} USING SAMPLE reservoir({sample_rows} ROWS) REPEATABLE (42)")
+    counts = con.execute(
+        "SELECT count(*), " + ', '.join(f"count(*) FILTER (WHERE {rule['violation']})"
+                                        for rule in rules)
+        + " FROM _validation_sample t").fetchone()
+    sampled = counts[0]
+
+    estimates = []
+    for rule, failing in zip(rules, counts[1:]):
+        fraction = failing / sampled
+        scale = 1 + z * z / sampled
+        center = (fraction + z * z / (2 * sampled)) / scale
+        spread = z * math.sqrt(fraction * (1 - fraction) / sampled
+                               + z * z / (4 * sampled * sampled)) / scale
+        offending = (_sample_rows(con, '_validation_sample', rule, sample)
+                     if failing and sample else [])
+        estimates.append((fraction * rows, max(0.0, center - spread) * rows,
+                          min(1.0, center + spread) * rows, offending))
+    con.execute("DROP TABLE _validation_sample")
+    return estimates
+
+
+def _column_types(con, table: str, columns: List[str], alias: str = 't') -> List[str]:
+    return [row[1] for row in con.execute(
+        f"DESCRIBE SELECT {', '.join(f'{alias}.{_ident(column)}' for column in columns)} "
+        f"FROM {table} {alias}").fetchall()]
+
+
+def _exact_only(con, table: str, rule: Dict[str, Any]) -> bool:
+    """Rules the approximate tier cannot decide usefully (see the module docstring)."""
+    if not rule.get('tolerance'):
+        return True
+    return rule['check'] == 'fk' and (_column_types(con, table, rule['columns'])
+                                      != _column_types(con, rule['ref_table'], rule['ref_columns'], 'r'))
+
+
+def _approximate(con, table: str, compiled: List[Dict[str, Any]], rows: int,
+                 sample_rows: int, z: float, sample: int):
+    """Approximate results; rules whose bounds straddle their threshold are returned for an exact check."""
+    results, undecided = {}, []
+    by_check = {check: [rule for rule in compiled if rule['check'] in checks]
+                for check, checks in [('hll', ('unique',)), ('bloom', ('fk',)),
+                                      ('sample', ('not_null', 'in_range'))]}
+
+    estimates = {}
+    if by_check['hll']:
+        estimates.update(zip((rule['result'] for rule in by_check['hll']),
+                             ((*estimate, None, []) for estimate in
+                              _hll_unique(con, table, by_check['hll'], z))))
+    if by_check['bloom']:
+        estimates.update(zip((rule['result'] for rule in by_check['bloom']),
+                             ((*estimate, []) for estimate in
+                              _bloom_fk(con, table, by_check['bloom']))))
+    if by_check['sample']:
+        estimates.update(zip((rule['result'] for rule in by_check['sample']),
+                             ((estimate, low, high, None, offending)
+                              for estimate, low, high, offending in
+                              _sampled(con, table, by_check['sample'], rows, sample_rows, z, sample))))
+
+    for method, rules in by_check.items():
+        for rule in rules:
+            estimate, low, high, fpr, offending = estimates[rule['result']]
+            allowed = rule.get('tolerance', 0.0) * rows
+            if allowed < low or high <= allowed:
+                result = _result(rule, round(estimate), rows, method, low, high)
+                result['passed'] = high <= allowed
+                result['sample'] = offending
+                if fpr is not None:
+                    result['fpr'] = fpr
+                results[rule['result']] = result
+            else:
+                undecided.append(rule)
+    return results, undecided
+
+
+def validate(con, table: str, rules: Sequence[Dict[str, Any]],
+             sample: int = DEFAULT_SAMPLE, approximate: bool = False,
+             sample_rows: int = DEFAULT_SAMPLE_ROWS, z: float = DEFAULT_Z) -> Dict[str, Any]:
+    """
+    Check all rules against table (a table name or any FROM expression).
+
+    Exact (default): one aggregate query. failures counts offending rows
+    (for unique: rows beyond the first of each key); a rule passes when
+    failures <= tolerance * rows; sample holds up to `sample` offending rows.
+
+    approximate=True, for tables larger than sample_rows: rules with a
+    tolerance (others are checked exactly, see the module docstring) are
+    estimated. Unique keys are counted with HyperLogLog, foreign keys probed through a Bloom filter and
+    NULL / range checks estimated from a reservoir sample of sample_rows
+    rows. Each result carries low / high bounds (z standard errors; for fk
+    the orphans found and the rows with a key) and its method; a rule is
+    decided approximately only if both bounds fall on the same side of its
+    threshold (tolerance * rows), otherwise it is checked exactly (one scan
+    for all such rules, 'fallback': True). An fk rule is thus decided
+    approximately only when it fails.
+
+    Returns {'table', 'rows', 'passed', 'seconds', 'approximate', 'results':
+    [{'rule', 'check', 'columns', 'failures', 'passed', 'method', 'low',
+    'high', 'fallback', 'sample'}]} (fk results from a Bloom filter also
+    have its false positive rate, 'fpr').
+    """
+    started = time.perf_counter()
+    compiled = compile_rules(table, rules)['rules']
+
+    if approximate:
+        rows = con.execute(f"SELECT count(*) FROM {table}").fetchone()[0]
+        approximate = rows > sample_rows
+
+    if not approximate:
+        rows, results = _exact(con, table, compiled, sample)
+    else:
+        direct = [rule for rule in compiled if _exact_only(con, table, rule)]
+        decided, undecided = _approximate(con, table, [rule for rule in compiled if rule not in direct],
+                                          rows, sample_rows, z, sample)
+        if direct or undecided:
+            _, exact = _exact(con, table, direct + undecided, sample)
+            for rule, result in zip(direct + undecided, exact):
+                result['fallback'] = rule in undecided
+                decided[rule['result']] = result
+        results = [decided[rule['result']] for rule in compiled]
+
+    return {
+        'table': table,
+        'rows': rows,
+        'passed': all(result['passed'] for result in results),
+        'seconds': time.perf_counter() - started,
+        'approximate': approximate,
+        'results': results,
+    }
+
+
+def validate_all(con, rules_by_table: Dict[str, Sequence[Dict[str, Any]]],
+                 sample: int = DEFAULT_SAMPLE, **options) -> List[Dict[str, Any]]:
+    """validate() each table in turn (one scan per table in exact mode)."""
+    return [validate(con, table, rules, sample, **options) for table, rules in rules_by_table.items()]
+
+
+def print_report(report: Dict[str, Any]):
+    """Print one table's report in the notebook's PASS / FAIL style."""
+    print(f"\n✓ {report['table']}: {report['rows']:,} rows, "
+          f"{len(report['results'])} checks{' (approximate)' if report['approximate'] else ''} "
+          f"({report['seconds'] * 1000:.0f} ms)")
+    for result in report['results']:
+        if result['method'] != 'exact':
+            detail = (f" ~{result['failures']:,} offending rows "
+                      f"({result['low']:,.0f} - {result['high']:,.0f}, {result['method']})")
+        elif result['fallback']:
+            detail = f" {result['failures']:,} offending rows (exact fallback)"
+        else:
+            detail = f" {result['failures']:,} offending rows" if result['failures'] else ''
+        print(f"  {'✅ PASS' if result['passed'] else '❌ FAIL'}: {result['rule']}"
+              f"{' -' if detail else ''}{detail}")
+        for row in result['sample']:
+            print(f"     {row}")
+
+
+# The Day 3 silver-layer validations (see create_day3_teaching_notebook.py)
+DAY3_RULES = {
+    'silver_orders': [
+        unique('order_id'),
+        not_null('order_id', 'customer_id'),
+    ],
+    'silver_order_items': [
+        not_null('order_id', 'product_id'),
+        fk('order_id', 'silver_orders'),
+        in_range('price', min=0),
+    ],
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Run the Day 3 data-quality checks against a DuckDB database',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument('--db', default=str(DEFAULT_DB),
+                        help=f'DuckDB database with the silver tables '
+                             f'(default: {DEFAULT_DB.relative_to(REPO_ROOT)}, see olist_pipeline.py)')
+    parser.add_argument('--sample', type=int, default=DEFAULT_SAMPLE,
+                        help=f'Offending rows to show per failed check (default: {DEFAULT_SAMPLE})')
+    parser.add_argument('--approximate', action='store_true',
+                        help='Estimate large tables (HyperLogLog, Bloom filter, sampling) '
+                             'with exact fallback near thresholds')
+    parser.add_argument('--sample-rows', type=int, default=DEFAULT_SAMPLE_ROWS,
+                        help=f'Reservoir sample size for --approximate (default: {DEFAULT_SAMPLE_ROWS:,})')
+    args = parser.parse_args()
+
+    try:
+        import duckdb
+    except ImportError:
+        print("❌ Error: validation needs duckdb: pip install duckdb")
+        sys.exit(1)
+
+    if not Path(args.db).exists():
+        print(f"❌ Error: {args.db} not found (run scripts/olist_pipeline.py first)")
+        sys.exit(1)
+
+    con = duckdb.connect(args.db, read_only=True)
+    print("=== VALIDATION: Checking Data Quality ===")
+    reports = validate_all(con, DAY3_RULES, sample=args.sample,
+                           approximate=args.approximate, sample_rows=args.sample_rows)
+    for report in reports:
+        print_report(report)
+    con.close()
+
+    print("\n" + "=" * 60)
+    if all(report['passed'] for report in reports):
+        print("✅ ALL VALIDATIONS PASSED")
+    else:
+        failed = sum(not result['passed'] for report in reports for result in report['results'])
+        print(f"❌ {failed} VALIDATION(S) FAILED")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
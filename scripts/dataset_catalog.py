@@ -0,0 +1,524 @@
+#!/usr/bin/env python3
+"""
+Dataset Catalog - Typed Parquet mirrors of the CSV datasets in data/
+
+Reading a course CSV means parsing text and inferring types on every use,
+and inference gets some columns wrong for analysis: zip code prefixes and
+postal codes become integers (leading zeros lost), Superstore's M/D/YYYY
+dates stay text, and Superstore cannot be read by DuckDB at all without
+transcoding (latin-1). This tool converts every CSV under data/ into a
+zstd-compressed Parquet file with an explicit schema and keeps a manifest
+of what it built:
+
+    .data_cache/parquet/<name>.parquet
+    .data_cache/parquet/manifest.json   source, size, mtime, SHA-256,
+                                        rows, schema, mirror hash
+
+The course tables (course_data.TABLES) are the declared datasets; their
+schemas come from SCHEMAS (IDs and codes as strings, dates and timestamps
+parsed, numbers typed). A declared schema is strict: a CSV whose header
+differs, or a value that does not cast, stops the conversion with an error
+instead of producing a silently different table. CSVs that are not course
+tables are still mirrored: their schema is DuckDB's inference with ID,
+zip and postal code columns forced to text, and is recorded in the manifest.
+dirty_cafe_sales stays all text on purpose; cleaning it is the Day 1
+exercise.
+
+A mirror is rebuilt only when its source changes (size and mtime, confirmed
+by SHA-256 when only the mtime moved) or its schema definition does.
+
+Usage:
+    python scripts/dataset_catalog.py                   # list datasets and mirror state
+    python scripts/dataset_catalog.py --refresh         # build missing / outdated mirrors
+    python scripts/dataset_catalog.py --refresh superstore --force
+    python scripts/dataset_catalog.py --schema orders
+
+    from dataset_catalog import load, parquet_path
+    superstore = load('superstore')                     # DataFrame, from Parquet
+    con.execute(f"SELECT * FROM '{parquet_path('orders')}'")
+"""
+
+import argparse
+import codecs
+import datetime
+import hashlib
+import json
+import os
+import re
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from course_data import TABLES, sql_string
+from notebook_cache import file_sha256
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DATA_DIR = REPO_ROOT / 'data'
+MIRROR_DIR = REPO_ROOT / '.data_cache' / 'parquet'
+MANIFEST_PATH = MIRROR_DIR / 'manifest.json'
+CATALOG_FORMAT = 1
+
+# Columns of inferred schemas that are identifiers or codes, not numbers
+ID_COLUMN = re.compile(r'((^|[ _])id|zip_code_prefix|postal code)$', re.IGNORECASE)
+
+# Olist tables (Day 2 full files and the Day 3 subsets share them)
+ORDERS_SCHEMA = {
+    'order_id': 'VARCHAR',
+    'customer_id': 'VARCHAR',
+    'order_status': 'VARCHAR',
+    'order_purchase_timestamp': 'TIMESTAMP',
+    'order_approved_at': 'TIMESTAMP',
+    'order_delivered_carrier_date': 'TIMESTAMP',
+    'order_delivered_customer_date': 'TIMESTAMP',
+    'order_estimated_delivery_date': 'TIMESTAMP',
+}
+CUSTOMERS_SCHEMA = {
+    'customer_id': 'VARCHAR',
+    'customer_unique_id': 'VARCHAR',
+    'customer_zip_code_prefix': 'VARCHAR',
+    'customer_city': 'VARCHAR',
+    'customer_state': 'VARCHAR',
+}
+ORDER_ITEMS_SCHEMA = {
+    'order_id': 'VARCHAR',
+    'order_item_id': 'INTEGER',
+    'product_id': 'VARCHAR',
+    'seller_id': 'VARCHAR',
+    'shipping_limit_date': 'TIMESTAMP',
+    'price': 'DOUBLE',
+    'freight_value': 'DOUBLE',
+}
+
+# name (as in course_data.TABLES) -> schema (column -> DuckDB type, in file
+# order), optional formats (column -> strptime format) and encoding
+SCHEMAS: Dict[str, Dict[str, Any]] = {
+    'superstore': {
+        'encoding': 'latin-1',
+        'schema': {
+            'Row ID': 'INTEGER', 'Order ID': 'VARCHAR', 'Order Date': 'DATE',
+            'Ship Date': 'DATE', 'Ship Mode': 'VARCHAR', 'Customer ID': 'VARCHAR',
+            'Customer Name': 'VARCHAR', 'Segment': 'VARCHAR', 'Country': 'VARCHAR',
+            'City': 'VARCHAR', 'State': 'VARCHAR', 'Postal Code': 'VARCHAR',
+            'Region': 'VARCHAR', 'Product ID': 'VARCHAR', 'Category': 'VARCHAR',
+            'Sub-Category': 'VARCHAR', 'Product Name': 'VARCHAR', 'Sales': 'DOUBLE',
+            'Quantity': 'INTEGER', 'Discount': 'DOUBLE', 'Profit': 'DOUBLE',
+        },
+        'formats': {'Order Date': '%m/%d/%Y', 'Ship Date': '%m/%d/%Y'},
+    },
+    'dirty_cafe_sales': {
+        'schema': {column: 'VARCHAR' for column in (
+            'Transaction ID', 'Item', 'Quantity', 'Price Per Unit', 'Total Spent',
+            'Payment Method', 'Location', 'Transaction Date')},
+    },
+    'orders': {'schema': ORDERS_SCHEMA},
+    'customers': {'schema': CUSTOMERS_SCHEMA},
+    'order_items': {'schema': ORDER_ITEMS_SCHEMA},
+    'products': {
+        'schema': {
+            'product_id': 'VARCHAR', 'product_category_name': 'VARCHAR',
+            'product_name_lenght': 'INTEGER', 'product_description_lenght': 'INTEGER',
+            'product_photos_qty': 'INTEGER', 'product_weight_g': 'INTEGER',
+            'product_length_cm': 'INTEGER', 'product_height_cm': 'INTEGER',
+            'product_width_cm': 'INTEGER',
+        },
+    },
+    'sellers': {
+        'schema': {'seller_id': 'VARCHAR', 'seller_zip_code_prefix': 'VARCHAR',
+                   'seller_city': 'VARCHAR', 'seller_state': 'VARCHAR'},
+    },
+    'order_payments': {
+        'schema': {'order_id': 'VARCHAR', 'payment_sequential': 'INTEGER',
+                   'payment_type': 'VARCHAR', 'payment_installments': 'INTEGER',
+                   'payment_value': 'DOUBLE'},
+    },
+    'order_reviews': {
+        'schema': {'review_id': 'VARCHAR', 'order_id': 'VARCHAR', 'review_score': 'INTEGER',
+                   'review_comment_title': 'VARCHAR', 'review_comment_message': 'VARCHAR',
+                   'review_creation_date': 'TIMESTAMP', 'review_answer_timestamp': 'TIMESTAMP'},
+    },
+    'category_translation': {
+        'schema': {'product_category_name': 'VARCHAR', 'product_category_name_english': 'VARCHAR'},
+    },
+    'geolocation': {
+        'schema': {'geolocation_zip_code_prefix': 'VARCHAR', 'geolocation_lat': 'DOUBLE',
+                   'geolocation_lng': 'DOUBLE', 'geolocation_city': 'VARCHAR',
+                   'geolocation_state': 'VARCHAR'},
+    },
+    'olist_orders_subset': {'schema': ORDERS_SCHEMA},
+    'olist_customers_subset': {'schema': CUSTOMERS_SCHEMA},
+    'olist_order_items_subset': {'schema': ORDER_ITEMS_SCHEMA},
+    'mini_orders': {'schema': ORDERS_SCHEMA},
+    'mini_customers': {'schema': CUSTOMERS_SCHEMA},
+    'mini_items': {'schema': ORDER_ITEMS_SCHEMA},
+}
+
+# The course tables (sources from course_data.TABLES) with their schemas;
+# a table without an entry in SCHEMAS gets an inferred one
+DATASETS: Dict[str, Dict[str, Any]] = {
+    name: {'source': table['source'], **SCHEMAS.get(name, {})}
+    for name, table in TABLES.items()
+}
+
+
+def _ident(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def dataset_name(path: Path) -> str:
+    """Catalog name of an undeclared CSV: its file name, lower case, as an identifier."""
+    return re.sub(r'[^a-z0-9]+', '_', path.stem.lower()).strip('_')
+
+
+def discover() -> Dict[str, Dict[str, Any]]:
+    """DATASETS plus every other CSV under data/ (schema to be inferred)."""
+    datasets = dict(DATASETS)
+    declared = {spec['source'] for spec in DATASETS.values()}
+    for path in sorted(DATA_DIR.rglob('*.csv')):
+        source = path.relative_to(REPO_ROOT).as_posix()
+        if source in declared:
+            continue
+        name = dataset_name(path)
+        if name in datasets:
+            name = dataset_name(path.parent) + '_' + name
+        datasets[name] = {'source': source}
+    return datasets
+
+
+def definition_hash(spec: Dict[str, Any]) -> str:
+    """Hash of how a mirror is built, so a schema change rebuilds it."""
+    definition = {key: spec.get(key) for key in ('schema', 'formats', 'encoding')}
+    definition['format'] = CATALOG_FORMAT
+    return hashlib.sha256(json.dumps(definition, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+
+def parquet_file(name: str) -> Path:
+    return MIRROR_DIR / f'{name}.parquet'
+
+
+# ----------------------------------------------------------------------
+# Manifest
+# ----------------------------------------------------------------------
+
+def read_manifest() -> Dict[str, Dict[str, Any]]:
+    try:
+        with open(MANIFEST_PATH, encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if manifest.get('format') != CATALOG_FORMAT:
+        return {}
+    return manifest.get('datasets', {})
+
+
+def _write_manifest(updates: Dict[str, Optional[Dict[str, Any]]]):
+    """Merge entries (None removes one) into the manifest on disk, atomically."""
+    datasets = read_manifest()
+    for name, entry in updates.items():
+        if entry is None:
+            datasets.pop(name, None)
+        else:
+            datasets[name] = entry
+    MIRROR_DIR.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=MIRROR_DIR, prefix='.manifest-', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            # Datasets sorted by name; schemas keep their column order
+            json.dump({'format': CATALOG_FORMAT, 'datasets': dict(sorted(datasets.items()))},
+                      f, indent=2)
+            f.write('\n')
+        os.replace(tmp_path, MANIFEST_PATH)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def mirror_state(name: str, spec: Dict[str, Any], entry: Optional[Dict[str, Any]]) -> str:
+    """'fresh', 'touched' (fresh, source mtime moved), 'stale', 'missing' (no source) or 'new'."""
+    source = REPO_ROOT / spec['source']
+    try:
+        stat = os.stat(source)
+    except OSError:
+        return 'missing'
+    if entry is None or not parquet_file(name).exists():
+        return 'new'
+    if entry['definition'] != definition_hash(spec):
+        return 'stale'
+    if entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+        return 'fresh'
+    if entry['size'] == stat.st_size and file_sha256(source) == entry['sha256']:
+        return 'touched'
+    return 'stale'
+
+
+# ----------------------------------------------------------------------
+# Conversion
+# ----------------------------------------------------------------------
+
+def _utf8_copy(source: Path, encoding: str, directory: Path) -> Path:
+    """Transcode a CSV to a temporary UTF-8 file (DuckDB's reader wants UTF-8)."""
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.utf8-', suffix='.csv')
+    decoder = codecs.getincrementaldecoder(encoding)()
+    with open(source, 'rb') as src, os.fdopen(fd, 'wb') as dst:
+        for chunk in iter(lambda: src.read(1024 * 1024), b''):
+            dst.write(decoder.decode(chunk).encode('utf-8'))
+        dst.write(decoder.decode(b'', final=True).encode('utf-8'))
+    return Path(tmp_path)
+
+
+def _csv_reader(path: Path) -> str:
+    return f"read_csv({sql_string(path)}, header = true, all_varchar = true)"
+
+
+def resolve_schema(con, path: Path, spec: Dict[str, Any]) -> Dict[str, str]:
+    """The declared schema (checked against the header) or an inferred one."""
+    header = [row[0] for row in con.execute(f"DESCRIBE SELECT * FROM {_csv_reader(path)}").fetchall()]
+    if 'schema' in spec:
+        declared = list(spec['schema'])
+        if header != declared:
+            raise ValueError(f"{spec['source']}: columns {header} do not match the schema "
+                             f"declared in SCHEMAS {declared}")
+        return dict(spec['schema'])
+    inferred = con.execute(f"DESCRIBE SELECT * FROM read_csv({sql_string(path)})").fetchall()
+    return {column: 'VARCHAR' if ID_COLUMN.search(column) else column_type
+            for column, column_type, *_ in inferred}
+
+
+def typed_select(path: Path, schema: Dict[str, str], formats: Dict[str, str]) -> str:
+    """SELECT casting every (text) column of the CSV to its schema type."""
+    columns = []
+    for column, column_type in schema.items():
+        value = _ident(column)
+        if column in formats:
+            value = f"strptime({value}, {sql_string(formats[column])})"
+        columns.append(f"CAST({value} AS {column_type}) AS {_ident(column)}")
+    return f"SELECT {', '.join(columns)} FROM {_csv_reader(path)}"
+
+
+def build_mirror(name: str, spec: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert one CSV to Parquet (temp file + rename); returns its manifest entry."""
+    import duckdb
+
+    source = REPO_ROOT / spec['source']
+    stat = os.stat(source)
+    MIRROR_DIR.mkdir(parents=True, exist_ok=True)
+    readable = _utf8_copy(source, spec['encoding'], MIRROR_DIR) if spec.get('encoding') else source
+    fd, tmp_path = tempfile.mkstemp(dir=MIRROR_DIR, prefix=f'.{name}-', suffix='.parquet')
+    os.close(fd)
+    con = duckdb.connect()
+    try:
+        schema = resolve_schema(con, readable, spec)
+        con.execute(f"COPY ({typed_select(readable, schema, spec.get('formats', {}))}) "
+                    f"TO {sql_string(tmp_path)} (FORMAT parquet, COMPRESSION zstd)")
+        rows = con.execute(f"SELECT count(*) FROM read_parquet({sql_string(tmp_path)})").fetchone()[0]
+        os.replace(tmp_path, parquet_file(name))
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    finally:
+        con.close()
+        if readable != source:
+            os.unlink(readable)
+
+    return {
+        'source': spec['source'],
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'sha256': file_sha256(source),
+        'definition': definition_hash(spec),
+        'schema': schema,
+        'inferred': 'schema' not in spec,
+        'rows': rows,
+        'parquet': parquet_file(name).relative_to(REPO_ROOT).as_posix(),
+        'parquet_bytes': parquet_file(name).stat().st_size,
+        'parquet_sha256': file_sha256(parquet_file(name)),
+        'built': datetime.datetime.now().isoformat(timespec='seconds'),
+    }
+
+
+def refresh(names=None, force: bool = False) -> Dict[str, str]:
+    """
+    Build mirrors that are missing or outdated (default: every dataset).
+
+    Returns {name: 'built' | 'fresh' | 'missing' | 'removed' | 'failed: <why>'};
+    a mirror whose source disappeared is removed. A dataset that does not
+    match its schema fails without stopping the others (its old mirror is
+    kept, still marked stale).
+    """
+    import duckdb
+
+    datasets = discover()
+    unknown = [name for name in names or () if name not in datasets]
+    if unknown:
+        raise KeyError(f"unknown dataset(s): {', '.join(unknown)}")
+    manifest = read_manifest()
+    results, updates = {}, {}
+    # Mirrors of CSVs that are no longer found under data/ are removed too
+    gone = [name for name in manifest if name not in datasets]
+    for name in names or [*datasets, *gone]:
+        entry = manifest.get(name)
+        state = mirror_state(name, datasets[name], entry) if name in datasets else 'missing'
+        if state == 'missing':
+            if entry is not None:
+                parquet_file(name).unlink(missing_ok=True)
+                updates[name] = None
+            results[name] = 'removed' if entry is not None else 'missing'
+        elif state in ('fresh', 'touched') and not force:
+            if state == 'touched':
+                updates[name] = {**entry, 'mtime_ns': os.stat(REPO_ROOT / entry['source']).st_mtime_ns}
+            results[name] = 'fresh'
+        else:
+            try:
+                updates[name] = build_mirror(name, datasets[name])
+                results[name] = 'built'
+            except (ValueError, duckdb.Error) as error:
+                results[name] = f"failed: {str(error).splitlines()[0]}"
+    if updates:
+        _write_manifest(updates)
+    return results
+
+
+# ----------------------------------------------------------------------
+# Loading
+# ----------------------------------------------------------------------
+
+def parquet_path(name: str, refresh_mirror: bool = True) -> Path:
+    """Path of a dataset's up-to-date Parquet mirror (built first if needed)."""
+    datasets = discover()
+    if name not in datasets:
+        raise KeyError(f"unknown dataset: {name} (see python scripts/dataset_catalog.py)")
+    state = mirror_state(name, datasets[name], read_manifest().get(name))
+    if state == 'missing':
+        raise FileNotFoundError(f"{datasets[name]['source']} not found")
+    if state not in ('fresh', 'touched'):
+        if not refresh_mirror:
+            raise FileNotFoundError(f"mirror of {name} is {state} (run --refresh)")
+        result = refresh([name])[name]
+        if result.startswith('failed'):
+            raise ValueError(f"{datasets[name]['source']}: {result}")
+    return parquet_file(name)
+
+
+def load(name: str, refresh_mirror: bool = True):
+    """
+    A dataset as a pandas DataFrame, read from its Parquet mirror (rebuilt
+    first if the CSV changed). If the mirror cannot be written, the CSV is
+    read with the same schema instead.
+    """
+    import duckdb
+
+    try:
+        path = parquet_path(name, refresh_mirror)
+    except (FileNotFoundError, OSError) as error:
+        datasets = discover()
+        if name not in datasets or not (REPO_ROOT / datasets[name]['source']).exists():
+            raise
+        print(f"⚠️  Reading {datasets[name]['source']} directly ({error})")
+        return _load_csv(name, datasets[name])
+    return duckdb.read_parquet(str(path)).df()
+
+
+def _load_csv(name: str, spec: Dict[str, Any]):
+    """The typed SELECT of build_mirror(), straight into a DataFrame."""
+    import duckdb
+
+    source = REPO_ROOT / spec['source']
+    directory = Path(tempfile.gettempdir())
+    readable = _utf8_copy(source, spec['encoding'], directory) if spec.get('encoding') else source
+    con = duckdb.connect()
+    try:
+        schema = resolve_schema(con, readable, spec)
+        return con.execute(typed_select(readable, schema, spec.get('formats', {}))).df()
+    finally:
+        con.close()
+        if readable != source:
+            os.unlink(readable)
+
+
+def catalog() -> List[Dict[str, Any]]:
+    """One row per dataset: name, source, mirror state, rows."""
+    manifest = read_manifest()
+    rows = []
+    for name, spec in discover().items():
+        entry = manifest.get(name)
+        state = mirror_state(name, spec, entry)
+        rows.append({
+            'name': name,
+            'source': spec['source'],
+            'state': 'fresh' if state == 'touched' else state,
+            'rows': entry['rows'] if entry else None,
+            'inferred': 'schema' not in spec,
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Typed Parquet mirrors of the CSV datasets in data/',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument('--refresh', nargs='*', metavar='NAME',
+                        help='Build missing or outdated mirrors (all datasets if none given)')
+    parser.add_argument('--force', action='store_true',
+                        help='With --refresh: rebuild even up-to-date mirrors')
+    parser.add_argument('--schema', metavar='NAME', help='Show the schema of one dataset')
+    args = parser.parse_args()
+
+    try:
+        import duckdb  # noqa: F401
+    except ImportError:
+        print("❌ Error: the dataset catalog needs duckdb: pip install duckdb")
+        sys.exit(1)
+
+    if args.schema:
+        datasets = discover()
+        if args.schema not in datasets:
+            print(f"❌ Error: unknown dataset: {args.schema}")
+            sys.exit(1)
+        entry = read_manifest().get(args.schema)
+        schema = datasets[args.schema].get('schema') or (entry or {}).get('schema')
+        if not schema:
+            print(f"❌ {args.schema}: schema is inferred when the mirror is built (run --refresh)")
+            sys.exit(1)
+        print(f"📋 {args.schema} ({datasets[args.schema]['source']})")
+        formats = datasets[args.schema].get('formats', {})
+        for column, column_type in schema.items():
+            extra = f"  (parsed with {formats[column]})" if column in formats else ''
+            print(f"   {column:32s} {column_type}{extra}")
+        return
+
+    failed = {}
+    if args.refresh is not None:
+        print(f"🔄 Refreshing Parquet mirrors in {MIRROR_DIR.relative_to(REPO_ROOT)}/...")
+        try:
+            results = refresh(args.refresh, force=args.force)
+        except KeyError as e:
+            print(f"❌ Error: {e.args[0]}")
+            sys.exit(1)
+        failed = {name: result for name, result in results.items() if result.startswith('failed')}
+        for name, result in results.items():
+            if result in ('built', 'removed'):
+                print(f"   {'✓' if result == 'built' else '-'} {name}: {result}")
+            elif name in failed:
+                print(f"   ❌ {name}: {result}")
+        print(f"{'❌' if failed else '✅'} {sum(result == 'built' for result in results.values())} built, "
+              f"{sum(result == 'fresh' for result in results.values())} unchanged"
+              + (f", {len(failed)} failed" if failed else ''))
+
+    print(f"\n📊 Dataset catalog ({MANIFEST_PATH.relative_to(REPO_ROOT)})")
+    icons = {'fresh': '✅', 'stale': '🔄', 'new': '🆕', 'missing': '➖'}
+    for row in catalog():
+        rows = f"{row['rows']:,} rows" if row['rows'] is not None else ''
+        inferred = ' (inferred schema)' if row['inferred'] else ''
+        print(f"   {icons[row['state']]} {row['name']:26s} {row['state']:7s} {rows:>14s}  "
+              f"{row['source']}{inferred}")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -22,21 +22,33 @@ Or encrypt all scenarios at once:
 
 The script will:
 1. Create password-protected ZIP with all files
-2. Auto-document password in solutions/PASSWORDS.md
-3. Auto-backup password in solutions/.password_backup.json
-4. Log encryption event
-5. **REMIND YOU TO EMAIL YOURSELF THE PASSWORD**
+2. Auto-document password in solutions/.password_manifest.sqlite, which
+   regenerates solutions/PASSWORDS.md and solutions/.password_backup.json
+3. Log the encryption in the manifest
+4. **REMIND YOU TO EMAIL YOURSELF THE PASSWORD**
+
+The ZIP is built by zip_archiver.py, which hands the file list to `zip` on
+stdin, so directories of any size work. --aes switches from ZipCrypto to
+AES-256 (needs the optional pycryptodomex package; opens with
+7-Zip/Keka/WinZip, not with unzip or Finder).
+
+The manifest keeps the SHA-256 of every file: a rerun with nothing changed
+does nothing, and when some files changed only those are re-encrypted - the
+rest are copied from the existing archive still encrypted (--force rebuilds
+everything).
 """
 
 import argparse
 import os
 import sys
 import zipfile
-import datetime
-import subprocess
-import json
 from pathlib import Path
 
+from password_manifest import BACKUP_JSON, PASSWORDS_MD, REPO_ROOT, PasswordManifest, same_details
+from zip_archiver import (
+    DEFAULT_WORKERS, ArchiveError, require_method, verify_password, write_encrypted_zip,
+)
+
 
 def should_exclude(file_path, exclude_patterns):
     """Check if file matches any exclude pattern."""
@@ -50,203 +62,78 @@ def should_exclude(file_path, exclude_patterns):
     return False
 
 
-def create_encrypted_zip_from_directory(directory, output_path, password, exclude_patterns=None):
-    """Create a password-protected ZIP file from an entire directory."""
-    try:
-        # Ensure output directory exists
-        output_dir = os.path.dirname(output_path)
-        if output_dir and not os.path.exists(output_dir):
-            os.makedirs(output_dir)
-
-        # Remove output file if it exists
-        if os.path.exists(output_path):
-            os.remove(output_path)
-
-        # Build list of files to include
-        files_to_zip = []
+def collect_members(directory, exclude_patterns=None):
+    """(path, name in archive) for every file to include; names keep their path (like `zip -r`)."""
+    members = []
 
-        for root, dirs, files in os.walk(directory):
-            for file in files:
-                file_path = os.path.join(root, file)
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for file in sorted(files):
+            file_path = os.path.join(root, file)
 
-                # Skip excluded files
-                if should_exclude(file_path, exclude_patterns):
-                    print(f"  ⏭️  Skipping: {file_path}")
-                    continue
+            # Skip excluded files
+            if should_exclude(file_path, exclude_patterns):
+                print(f"  ⏭️  Skipping: {file_path}")
+                continue
 
-                files_to_zip.append(file_path)
+            members.append((file_path, os.path.normpath(file_path)))
 
-        if not files_to_zip:
-            print(f"❌ Error: No files found in {directory}")
-            return False
+    return members
 
-        print(f"\n📦 Creating encrypted ZIP with {len(files_to_zip)} files...")
 
-        # Create encrypted ZIP using system zip command
-        # We'll add files maintaining directory structure
-        cmd = ['zip', '-r', '-P', password, output_path] + files_to_zip
+def create_encrypted_zip_from_directory(members, output_path, password, method='zipcrypto',
+                                        workers=DEFAULT_WORKERS, reuse=()):
+    """
+    Create a password-protected ZIP file from a directory's members.
 
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            cwd='.'
-        )
+    Members named in `reuse` are unchanged since the existing archive was
+    written and are copied from it still encrypted.
+    """
+    try:
+        if reuse:
+            print(f"\n📦 Updating encrypted ZIP: {len(members) - len(reuse)} of "
+                  f"{len(members)} files changed, {len(reuse)} copied as is...")
+        else:
+            print(f"\n📦 Creating encrypted ZIP with {len(members)} files...")
 
-        if result.returncode != 0:
-            print(f"❌ Error creating ZIP: {result.stderr}")
-            return False
+        # Replaces any existing output
+        write_encrypted_zip(output_path, members, password, method=method, workers=workers,
+                            reuse_from=output_path, reuse=reuse)
 
         print(f"✅ Created: {output_path}")
         return True
 
-    except Exception as e:
-        print(f"❌ Error: {e}")
+    except (ArchiveError, OSError) as e:
+        print(f"❌ Error creating ZIP: {e}")
         return False
 
 
 def verify_password_works(zip_path, password):
     """Verify that the password actually works by trying to decrypt."""
     try:
-        with zipfile.ZipFile(zip_path, 'r') as zf:
-            namelist = zf.namelist()
-            if not namelist:
-                return False
-
-            # Try to read with the password
-            zf.read(namelist[0], pwd=password.encode())
+        if verify_password(zip_path, password):
             return True
+        print("❌ Password verification failed: bad password")
+        return False
     except Exception as e:
         print(f"❌ Password verification failed: {e}")
         return False
 
 
-def update_passwords_md(output_path, password, description):
-    """AUTOMATICALLY update PASSWORDS.md with the new password."""
-    passwords_file = 'solutions/PASSWORDS.md'
-
-    # Create PASSWORDS.md if it doesn't exist
-    if not os.path.exists(passwords_file):
-        create_passwords_template()
-
-    # Read current content
-    with open(passwords_file, 'r') as f:
-        content = f.read()
-
-    # Prepare the new entry
-    timestamp = datetime.datetime.now().strftime('%Y-%m-%d')
-    zip_name = os.path.basename(output_path)
-
-    # Interview materials section
-    section_marker = "## Interview Materials"
-    new_entry = f"""
-### {zip_name}
-- File: `{zip_name}`
-- Password: `{password}`
-- Created: {timestamp}
-- Description: {description}
-- **⚠️ EMAIL THIS PASSWORD TO YOURSELF NOW!**
-"""
-
-    # Insert the entry in Interview Materials section
-    if section_marker in content:
-        # Find the position after the section header
-        pos = content.find(section_marker)
-        # Find the next line
-        next_line = content.find('\n', pos) + 1
-        # Insert the new entry
-        content = content[:next_line] + new_entry + content[next_line:]
-    else:
-        # Add section if it doesn't exist
-        content += f"\n{section_marker}\n" + new_entry
-
-    # Write back
-    with open(passwords_file, 'w') as f:
-        f.write(content)
-
-    print(f"✅ Password documented in {passwords_file}")
-
-
-def create_passwords_template():
-    """Create PASSWORDS.md if it doesn't exist."""
-    template = """# Solution Passwords
-
-**⚠️ DO NOT COMMIT THIS FILE TO GIT**
-
-This file is AUTO-UPDATED by encryption scripts.
-Passwords are documented immediately when solutions are encrypted.
-
----
-
-## Homework Solutions
-
-## In-Class Exercise Solutions
-
-## Interview Materials
-
----
-
-## Password Release Schedule
-
-- Release passwords on Moodle only after assignment deadlines
-- Never share passwords via email or Slack
-- Always test decryption before distributing
-
----
-
-## Backup
-
-This file is backed up to: solutions/.password_backup.json
-**ALSO: Email all interview/critical passwords to yourself!**
-"""
-    os.makedirs('solutions', exist_ok=True)
-    with open('solutions/PASSWORDS.md', 'w') as f:
-        f.write(template)
-
-
-def backup_password_to_json(output_path, password, description):
-    """Create a machine-readable backup of passwords."""
-    backup_file = 'solutions/.password_backup.json'
-
-    # Load existing backup
-    if os.path.exists(backup_file):
-        with open(backup_file, 'r') as f:
-            backup = json.load(f)
-    else:
-        backup = {}
-
-    # Add this password
-    zip_name = os.path.basename(output_path)
-    backup[zip_name] = {
-        'password': password,
-        'description': description,
-        'created': datetime.datetime.now().isoformat(),
-        'type': 'interview_materials',
-        'source_file': output_path
-    }
-
-    # Save backup
-    with open(backup_file, 'w') as f:
-        json.dump(backup, f, indent=2)
-
-    print(f"✅ Password backed up to {backup_file}")
-
-
-def log_encryption(directory, output_path, password):
-    """Log the encryption event WITH PASSWORD."""
-    log_file = 'solutions/.encryption_log.txt'
-
-    timestamp = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    output_name = os.path.basename(output_path)
-
-    log_entry = f"{timestamp} | {directory} -> {output_name} | PASSWORD: {password} | TYPE: interview_materials\n"
-
-    try:
-        with open(log_file, 'a') as f:
-            f.write(log_entry)
-        print(f"✅ Encryption logged to {log_file}")
-    except Exception as e:
-        print(f"⚠️  Could not write to log: {e}")
+def document_password(manifest, directory, output_path, password, description, method=None,
+                      inputs=None, action=None, detail=None):
+    """
+    Record the password in the manifest (regenerating PASSWORDS.md and the
+    JSON backup) and, if an action is given, log it - in one transaction.
+    """
+    with manifest.transaction():
+        manifest.record(output_path, password, description, type='interview_materials',
+                        source_file=directory, method=method, inputs=inputs)
+        if action:
+            manifest.log(output_path, action, source=directory, password=password,
+                         type='interview_materials', method=method, detail=detail)
+    print(f"✅ Password documented in {PASSWORDS_MD.relative_to(REPO_ROOT)} "
+          f"and {BACKUP_JSON.relative_to(REPO_ROOT)}{'; encryption logged' if action else ''}")
 
 
 def print_email_reminder(password, output_path):
@@ -290,9 +177,23 @@ def main():
                         help='Description of what this is for')
     parser.add_argument('--exclude-patterns', '-e',
                         help='Comma-separated patterns to exclude (e.g., "README.md,*.txt")')
+    parser.add_argument('--aes', action='store_true',
+                        help='Use AES-256 instead of ZipCrypto (needs pycryptodomex; '
+                             'open with 7-Zip/Keka/WinZip)')
+    parser.add_argument('--workers', '-j', type=int, default=DEFAULT_WORKERS,
+                        help=f'Files compressed in parallel (default: {DEFAULT_WORKERS})')
+    parser.add_argument('--force', action='store_true',
+                        help='Re-encrypt every file even if nothing changed')
 
     args = parser.parse_args()
 
+    method = 'aes' if args.aes else 'zipcrypto'
+    try:
+        require_method(method)
+    except ArchiveError as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
+
     # Validate directory exists
     if not os.path.exists(args.directory):
         print(f"❌ Error: Directory not found: {args.directory}")
@@ -308,8 +209,27 @@ def main():
         exclude_patterns = [p.strip() for p in args.exclude_patterns.split(',')]
         print(f"📋 Exclude patterns: {exclude_patterns}")
 
-    # Check if output already exists
-    if os.path.exists(args.output):
+    members = collect_members(args.directory, exclude_patterns)
+    if not members:
+        print(f"❌ Error: No files found in {args.directory}")
+        sys.exit(1)
+
+    # Compare file hashes with the manifest: skip or update only changed members
+    with PasswordManifest() as manifest:
+        plan = manifest.plan(args.output, members, args.password, method)
+        if args.force and plan['status'] != 'build':
+            plan.update(status='build', reason='--force', reuse=set())
+        if plan['status'] == 'unchanged':
+            if not same_details(manifest.lookup(args.output), args.description,
+                                type='interview_materials', source_file=args.directory):
+                document_password(manifest, args.directory, args.output, args.password,
+                                  args.description)
+            print(f"⏭️  {args.output} is up to date ({len(members)} files unchanged)")
+            return
+    print(f"🔄 Encrypting {args.output}: {plan['reason']}")
+
+    # Check if output already exists (an update of our own archive needs no confirmation)
+    if plan['status'] == 'build' and os.path.exists(args.output):
         print(f"⚠️  Output file already exists: {args.output}")
         response = input("Overwrite? (y/n): ")
         if response.lower() != 'y':
@@ -321,9 +241,11 @@ def main():
     print(f"📦 Output: {args.output}")
     print(f"🔑 Password: {args.password}")
     print(f"📝 Description: {args.description}")
+    print(f"🔐 Encryption: {'AES-256' if args.aes else 'ZipCrypto'}")
 
     if not create_encrypted_zip_from_directory(
-        args.directory, args.output, args.password, exclude_patterns
+        members, args.output, args.password,
+        method=method, workers=args.workers, reuse=plan['reuse']
     ):
         sys.exit(1)
 
@@ -338,9 +260,10 @@ def main():
 
     # AUTOMATICALLY document the password (NEVER FORGET AGAIN!)
     print("\n📝 Auto-documenting password...")
-    update_passwords_md(args.output, args.password, args.description)
-    backup_password_to_json(args.output, args.password, args.description)
-    log_encryption(args.directory, args.output, args.password)
+    with PasswordManifest() as manifest:
+        document_password(manifest, args.directory, args.output, args.password, args.description,
+                          method, plan['inputs'],
+                          'updated' if plan['status'] == 'update' else 'encrypted', plan['reason'])
 
     # Success!
     file_size = os.path.getsize(args.output)
@@ -350,9 +273,9 @@ def main():
     print(f"   File: {args.output}")
     print(f"   Size: {file_size:,} bytes ({file_size/1024:.1f} KB)")
     print(f"\n📋 Password documented in 3 places:")
-    print(f"   1. solutions/PASSWORDS.md (human-readable)")
-    print(f"   2. solutions/.password_backup.json (machine-readable)")
-    print(f"   3. solutions/.encryption_log.txt (full history)")
+    print(f"   1. solutions/.password_manifest.sqlite (indexed manifest + encryption log)")
+    print(f"   2. solutions/PASSWORDS.md (human-readable, generated)")
+    print(f"   3. solutions/.password_backup.json (machine-readable, generated)")
 
     # BIG REMINDER
     print_email_reminder(args.password, args.output)
@@ -363,7 +286,10 @@ def main():
     print(f"   3. git commit -m \"Add encrypted interview materials\"")
     print(f"   4. git push")
     print(f"\n✅ To decrypt later:")
-    print(f"   unzip -P \"{args.password}\" {args.output}")
+    if args.aes:
+        print(f"   7z x -p\"{args.password}\" {args.output}")
+    else:
+        print(f"   unzip -P \"{args.password}\" {args.output}")
     print(f"\n⚠️  Remember: NEVER commit unencrypted interview materials!")
 
 
@@ -19,17 +19,44 @@ Examples:
         --password "SQL2024DuckDB!" \\
         --output solutions/solutions-hw1.zip \\
         --description "Homework 1: SQL Foundations with DuckDB"
+
+Batch mode - encrypt every solution in one run (archives are built in
+parallel, then all passwords are documented):
+    python scripts/encrypt_solutions_v2.py --batch solutions/batch.json
+
+    solutions/batch.json (keep it out of git - it holds passwords):
+    [
+      {"source": "notebooks/day1_exercise_tidy_solution.ipynb", "password": "TidyData2024!",
+       "day": 1, "block": "A", "description": "Day 1 in-class exercise: Tidy data principles"},
+      {"source": "notebooks/hw1_solution.ipynb", "password": "SQL2024DuckDB!",
+       "output": "solutions/solutions-hw1.zip", "description": "Homework 1: SQL Foundations with DuckDB"}
+    ]
+
+Archives are built by zip_archiver.py. The default ZipCrypto encryption
+opens everywhere (unzip, Finder, Explorer) and needs the `zip` command; --aes
+uses AES-256 instead, which needs the optional pycryptodomex package and
+which students need 7-Zip, Keka or WinZip to open.
+
+Passwords are recorded in solutions/.password_manifest.sqlite (see
+password_manifest.py); PASSWORDS.md and .password_backup.json are generated
+from it, so concurrent runs cannot corrupt them. The manifest also keeps the
+SHA-256 of each source, so an archive whose source, password and encryption
+are unchanged is skipped (rerunning a whole batch is nearly free); --force
+re-encrypts anyway.
 """
 
 import argparse
 import os
 import sys
-import zipfile
-import datetime
-import subprocess
 import json
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+from password_manifest import BACKUP_JSON, PASSWORDS_MD, REPO_ROOT, PasswordManifest, same_details
+from zip_archiver import (
+    DEFAULT_WORKERS, ArchiveError, require_method, verify_password, write_encrypted_zip,
+)
+
 
 def validate_solution_file(file_path):
     """Validate that the file exists and is a solution file."""
@@ -46,207 +73,189 @@ def validate_solution_file(file_path):
     return True
 
 
-def create_encrypted_zip(source_file, output_path, password):
-    """Create a password-protected ZIP file."""
-    try:
-        # Ensure output directory exists
-        output_dir = os.path.dirname(output_path)
-        if output_dir and not os.path.exists(output_dir):
-            os.makedirs(output_dir)
-
-        # Get just the filename for inside the zip
-        filename = os.path.basename(source_file)
-
-        # Create zip with password using system command (better encryption)
-        result = subprocess.run(
-            ['zip', '-j', '-P', password, output_path, source_file],
-            capture_output=True,
-            text=True
-        )
-
-        if result.returncode != 0:
-            print(f"❌ Error creating ZIP: {result.stderr}")
-            return False
+def archive_members(source_file):
+    """(path, name in archive) members: just the filename inside the zip (like `zip -j`)."""
+    return [(source_file, os.path.basename(source_file))]
 
+
+def create_encrypted_zip(source_file, output_path, password, method='zipcrypto'):
+    """Create a password-protected ZIP file (see zip_archiver.py)."""
+    try:
+        write_encrypted_zip(output_path, archive_members(source_file), password, method=method)
         return True
 
-    except Exception as e:
-        print(f"❌ Error: {e}")
+    except (ArchiveError, OSError) as e:
+        print(f"❌ Error creating ZIP: {e}")
         return False
 
 
 def verify_password_works(zip_path, password):
     """Verify that the password actually works by trying to decrypt."""
     try:
-        with zipfile.ZipFile(zip_path, 'r') as zf:
-            namelist = zf.namelist()
-            if not namelist:
-                return False
-
-            # Try to read with the password
-            zf.read(namelist[0], pwd=password.encode())
+        if verify_password(zip_path, password):
             return True
+        print("❌ Password verification failed: bad password")
+        return False
     except Exception as e:
         print(f"❌ Password verification failed: {e}")
         return False
 
 
-def update_passwords_md(output_path, password, description, day=None, block=None):
-    """AUTOMATICALLY update PASSWORDS.md with the new password."""
-    passwords_file = 'solutions/PASSWORDS.md'
-
-    # Create PASSWORDS.md if it doesn't exist
-    if not os.path.exists(passwords_file):
-        create_passwords_template()
-
-    # Read current content
-    with open(passwords_file, 'r') as f:
-        content = f.read()
-
-    # Prepare the new entry
-    timestamp = datetime.datetime.now().strftime('%Y-%m-%d')
-    zip_name = os.path.basename(output_path)
-
-    # Determine the section to add to
-    if 'hw' in zip_name.lower():
-        # It's a homework
-        hw_num = ''.join(filter(str.isdigit, zip_name))
-        section_marker = f"### HW{hw_num}:"
-        new_entry = f"""
-### HW{hw_num}: {description}
-- File: `{zip_name}`
-- Password: `{password}`
-- Created: {timestamp}
-- Description: {description}
-"""
-    elif day and block:
-        # It's a day/block exercise
-        section_marker = f"### Day {day} Block {block}:"
-        new_entry = f"""
-### Day {day} Block {block}: {description}
-- File: `{zip_name}`
-- Password: `{password}`
-- Created: {timestamp}
-- Description: {description}
-"""
-    else:
-        # Generic entry
-        section_marker = f"### {zip_name}:"
-        new_entry = f"""
-### {zip_name}
-- File: `{zip_name}`
-- Password: `{password}`
-- Created: {timestamp}
-- Description: {description}
-"""
-
-    # Find where to insert (in the Homework or Exercise section)
-    if 'hw' in zip_name.lower():
-        insert_marker = "## Homework Solutions"
-    else:
-        insert_marker = "## In-Class Exercise Solutions"
-
-    # Insert the entry
-    if insert_marker in content:
-        # Find the position after the section header
-        pos = content.find(insert_marker)
-        # Find the next line
-        next_line = content.find('\n', pos) + 1
-        # Insert the new entry
-        content = content[:next_line] + new_entry + content[next_line:]
-    else:
-        # Just append at the end
-        content += "\n" + new_entry
-
-    # Write back
-    with open(passwords_file, 'w') as f:
-        f.write(content)
-
-    print(f"✅ Password documented in {passwords_file}")
-
-
-def create_passwords_template():
-    """Create PASSWORDS.md if it doesn't exist."""
-    template = """# Solution Passwords
-
-**⚠️ DO NOT COMMIT THIS FILE TO GIT**
-
-This file is AUTO-UPDATED by encrypt_solutions_v2.py
-Passwords are documented immediately when solutions are encrypted.
-
----
-
-## Homework Solutions
-
-## In-Class Exercise Solutions
-
----
-
-## Password Release Schedule
-
-- Release passwords on Moodle only after assignment deadlines
-- Never share passwords via email or Slack
-- Always test decryption before distributing
-
----
-
-## Backup
-
-This file is backed up to: solutions/.password_backup.json
-"""
-    os.makedirs('solutions', exist_ok=True)
-    with open('solutions/PASSWORDS.md', 'w') as f:
-        f.write(template)
-
-
-def backup_password_to_json(output_path, password, description, day=None, block=None):
-    """Create a machine-readable backup of passwords."""
-    backup_file = 'solutions/.password_backup.json'
-
-    # Load existing backup
-    if os.path.exists(backup_file):
-        with open(backup_file, 'r') as f:
-            backup = json.load(f)
-    else:
-        backup = {}
-
-    # Add this password
-    zip_name = os.path.basename(output_path)
-    backup[zip_name] = {
-        'password': password,
-        'description': description,
-        'created': datetime.datetime.now().isoformat(),
-        'day': day,
-        'block': block,
-        'source_file': output_path
-    }
-
-    # Save backup
-    with open(backup_file, 'w') as f:
-        json.dump(backup, f, indent=2)
-
-    print(f"✅ Password backed up to {backup_file}")
-
-
-def log_encryption(source_file, output_path, password, day=None, block=None):
-    """Log the encryption event WITH PASSWORD."""
-    log_file = 'solutions/.encryption_log.txt'
-
-    timestamp = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    source_name = os.path.basename(source_file)
-    output_name = os.path.basename(output_path)
-
-    log_entry = f"{timestamp} | {source_name} -> {output_name} | PASSWORD: {password}"
+def resolve_output(output=None, day=None, block=None):
+    """Output ZIP path from --output or --day/--block (None if neither is given)."""
+    if output:
+        return output
     if day and block:
-        log_entry += f" (Day {day} Block {block})"
-    log_entry += "\n"
-
+        return f"solutions/solutions-day{day}-block{block}.zip"
+    return None
+
+
+def plan_encryption(manifest, source, output_path, password, method, force=False):
+    """manifest.plan() for one solution archive; --force always rebuilds."""
+    plan = manifest.plan(output_path, archive_members(source), password, method)
+    if force and plan['status'] != 'build':
+        plan.update(status='build', reason='--force', reuse=set())
+    return plan
+
+
+def skip_unchanged(manifest, source, output_path, password, description, day=None, block=None):
+    """Nothing to re-encrypt: only refresh the manifest entry if its details changed."""
+    if same_details(manifest.lookup(output_path), description, day, block, source_file=source):
+        print(f"⏭️  {output_path} is up to date (source unchanged)")
+        return
+    manifest.record(output_path, password, description, day=day, block=block, source_file=source)
+    print(f"⏭️  {output_path} is up to date (source unchanged) - description updated")
+
+
+def document_password(manifest, source, output_path, password, description, day=None, block=None,
+                      method=None, inputs=None, action='encrypted', detail=None, quiet=False):
+    """
+    Record the password in the manifest (regenerating PASSWORDS.md and the
+    JSON backup) and log the encryption, in one transaction.
+    """
+    with manifest.transaction():
+        manifest.record(output_path, password, description, day=day, block=block,
+                        source_file=source, method=method, inputs=inputs)
+        manifest.log(output_path, action, source=source, password=password, day=day, block=block,
+                     method=method, detail=detail)
+    if not quiet:
+        print_documented()
+
+
+def print_documented(count=None):
+    """Where passwords were documented (once per run, also for a batch)."""
+    what = "Password" if count is None else f"{count} password{'s' if count != 1 else ''}"
+    print(f"✅ {what} documented in {PASSWORDS_MD.relative_to(REPO_ROOT)} "
+          f"and {BACKUP_JSON.relative_to(REPO_ROOT)}; encryption logged")
+
+
+def load_batch(batch_file):
+    """Read and check a batch spec; exits on errors."""
     try:
-        with open(log_file, 'a') as f:
-            f.write(log_entry)
-        print(f"✅ Encryption logged to {log_file}")
-    except Exception as e:
-        print(f"⚠️  Could not write to log: {e}")
+        with open(batch_file, 'r') as f:
+            entries = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"❌ Error reading batch file {batch_file}: {e}")
+        sys.exit(1)
+    if not isinstance(entries, list) or not entries:
+        print(f"❌ Error: {batch_file} must contain a non-empty JSON list")
+        sys.exit(1)
+
+    problems = []
+    outputs = set()
+    for i, entry in enumerate(entries, 1):
+        missing = [key for key in ('source', 'password', 'description') if not entry.get(key)]
+        entry['output'] = resolve_output(entry.get('output'), entry.get('day'), entry.get('block'))
+        if missing:
+            problems.append(f"entry {i}: missing {', '.join(missing)}")
+        if not entry['output']:
+            problems.append(f"entry {i}: needs 'output' or both 'day' and 'block'")
+        elif entry['output'] in outputs:
+            problems.append(f"entry {i}: output {entry['output']} is used twice")
+        outputs.add(entry['output'])
+    if problems:
+        print(f"❌ Error: invalid batch file {batch_file}:")
+        for problem in problems:
+            print(f"   - {problem}")
+        sys.exit(1)
+    return entries
+
+
+def run_batch(entries, method, workers, assume_yes=False, force=False):
+    """
+    Encrypt all entries whose sources changed (archives in parallel), verify,
+    then document passwords. Unchanged archives are left alone.
+    """
+    for entry in entries:
+        if not validate_solution_file(entry['source']):
+            sys.exit(1)
+
+    with PasswordManifest() as manifest:
+        for entry in entries:
+            entry['plan'] = plan_encryption(manifest, entry['source'], entry['output'],
+                                            entry['password'], method, force)
+        unchanged = [entry for entry in entries if entry['plan']['status'] == 'unchanged']
+        if unchanged:
+            with manifest.transaction():
+                for entry in unchanged:
+                    skip_unchanged(manifest, entry['source'], entry['output'], entry['password'],
+                                   entry['description'], entry.get('day'), entry.get('block'))
+    entries = [entry for entry in entries if entry['plan']['status'] != 'unchanged']
+    if not entries:
+        print(f"\n✅ All {len(unchanged)} archives are up to date - nothing to encrypt")
+        return
+
+    existing = [entry['output'] for entry in entries if os.path.exists(entry['output'])]
+    if existing and not assume_yes:
+        print(f"⚠️  {len(existing)} output file(s) already exist:")
+        for path in existing:
+            print(f"   - {path}")
+        response = input("Overwrite all? (y/n): ")
+        if response.lower() != 'y':
+            print("Aborted.")
+            sys.exit(0)
+
+    print(f"\n🔒 Encrypting {len(entries)} solutions ({method}, {workers} at a time, "
+          f"{len(unchanged)} unchanged)...")
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        results = list(executor.map(
+            lambda e: create_encrypted_zip(e['source'], e['output'], e['password'], method),
+            entries))
+
+    failed = []
+    for entry, created in zip(entries, results):
+        if created and verify_password_works(entry['output'], entry['password']):
+            print(f"   ✅ {entry['source']} -> {entry['output']} ({entry['plan']['reason']})")
+            continue
+        print(f"   ❌ {entry['source']} -> {entry['output']}")
+        if created:
+            os.remove(entry['output'])
+        failed.append(entry)
+
+    done = [entry for entry in entries if entry not in failed]
+    if done:
+        print(f"\n📝 Auto-documenting {len(done)} passwords...")
+        # One transaction: PASSWORDS.md and the JSON backup are written once
+        with PasswordManifest() as manifest, manifest.transaction():
+            for entry in done:
+                document_password(manifest, entry['source'], entry['output'], entry['password'],
+                                  entry['description'], entry.get('day'), entry.get('block'),
+                                  method, entry['plan']['inputs'],
+                                  'updated' if entry['plan']['status'] == 'update' else 'encrypted',
+                                  entry['plan']['reason'], quiet=True)
+        print_documented(len(done))
+
+    print(f"\n{'✅' if not failed else '⚠️ '} {len(done)} of {len(entries)} solutions encrypted "
+          f"and documented")
+    if failed:
+        print("❌ Failed (nothing documented for these):")
+        for entry in failed:
+            print(f"   - {entry['source']}")
+        sys.exit(1)
+    print(f"\n📝 Next steps:")
+    print(f"   1. git add {' '.join(entry['output'] for entry in done)}")
+    print(f"   2. git commit -m \"Add encrypted solutions\"")
+    print(f"⚠️  Remember: NEVER commit the unencrypted source files or the batch file!")
 
 
 def main():
@@ -256,28 +265,62 @@ def main():
         epilog=__doc__
     )
 
-    parser.add_argument('source', help='Source solution file (e.g., notebook.ipynb)')
-    parser.add_argument('--password', '-p', required=True, help='Password for the ZIP file')
-    parser.add_argument('--description', required=True, help='Description of what this solution is for')
+    parser.add_argument('source', nargs='?', help='Source solution file (e.g., notebook.ipynb)')
+    parser.add_argument('--password', '-p', help='Password for the ZIP file')
+    parser.add_argument('--description', help='Description of what this solution is for')
     parser.add_argument('--output', '-o', help='Output ZIP file path (optional if using --day/--block)')
     parser.add_argument('--day', '-d', type=int, help='Day number (for auto-naming)')
     parser.add_argument('--block', '-b', help='Block letter (A, B, etc.) (for auto-naming)')
+    parser.add_argument('--batch', metavar='SPEC.json',
+                        help='Encrypt every solution listed in a JSON batch file (see above)')
+    parser.add_argument('--aes', action='store_true',
+                        help='Use AES-256 instead of ZipCrypto (needs pycryptodomex; '
+                             'students need 7-Zip/Keka/WinZip to open it)')
+    parser.add_argument('--workers', '-j', type=int, default=DEFAULT_WORKERS,
+                        help=f'Archives built in parallel in batch mode (default: {DEFAULT_WORKERS})')
+    parser.add_argument('--yes', '-y', action='store_true',
+                        help='Overwrite existing archives without asking (batch mode)')
+    parser.add_argument('--force', action='store_true',
+                        help='Re-encrypt even if the source has not changed')
 
     args = parser.parse_args()
 
+    method = 'aes' if args.aes else 'zipcrypto'
+    try:
+        require_method(method)
+    except ArchiveError as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
+
+    if args.batch:
+        if args.source:
+            parser.error("give either a source file or --batch, not both")
+        run_batch(load_batch(args.batch), method, args.workers, assume_yes=args.yes,
+                  force=args.force)
+        return
+
+    if not args.source or not args.password or not args.description:
+        parser.error("source, --password and --description are required (or use --batch)")
+
     # Validate source file
     if not validate_solution_file(args.source):
         sys.exit(1)
 
     # Determine output path
-    if args.output:
-        output_path = args.output
-    elif args.day and args.block:
-        output_path = f"solutions/solutions-day{args.day}-block{args.block}.zip"
-    else:
+    output_path = resolve_output(args.output, args.day, args.block)
+    if output_path is None:
         print("❌ Error: Must provide either --output or both --day and --block")
         sys.exit(1)
 
+    # Skip the archive if its source has not changed since it was encrypted
+    with PasswordManifest() as manifest:
+        plan = plan_encryption(manifest, args.source, output_path, args.password, method, args.force)
+        if plan['status'] == 'unchanged':
+            skip_unchanged(manifest, args.source, output_path, args.password, args.description,
+                           args.day, args.block)
+            return
+    print(f"🔄 Encrypting {output_path}: {plan['reason']}")
+
     # Check if output already exists
     if os.path.exists(output_path):
         print(f"⚠️  Output file already exists: {output_path}")
@@ -291,8 +334,9 @@ def main():
     print(f"📦 Output: {output_path}")
     print(f"🔑 Password: {args.password}")
     print(f"📝 Description: {args.description}")
+    print(f"🔐 Encryption: {'AES-256' if args.aes else 'ZipCrypto'}")
 
-    if not create_encrypted_zip(args.source, output_path, args.password):
+    if not create_encrypted_zip(args.source, output_path, args.password, method):
         sys.exit(1)
 
     # CRITICAL: Verify the password actually works
@@ -306,9 +350,10 @@ def main():
 
     # AUTOMATICALLY document the password (NEVER FORGET AGAIN!)
     print("\n📝 Auto-documenting password...")
-    update_passwords_md(output_path, args.password, args.description, args.day, args.block)
-    backup_password_to_json(output_path, args.password, args.description, args.day, args.block)
-    log_encryption(args.source, output_path, args.password, args.day, args.block)
+    with PasswordManifest() as manifest:
+        document_password(manifest, args.source, output_path, args.password, args.description,
+                          args.day, args.block, method, plan['inputs'],
+                          'updated' if plan['status'] == 'update' else 'encrypted', plan['reason'])
 
     # Success!
     file_size = os.path.getsize(output_path)
@@ -316,9 +361,9 @@ def main():
     print(f"   File: {output_path}")
     print(f"   Size: {file_size:,} bytes ({file_size/1024:.1f} KB)")
     print(f"\n📋 Password documented in 3 places:")
-    print(f"   1. solutions/PASSWORDS.md (human-readable)")
-    print(f"   2. solutions/.password_backup.json (machine-readable)")
-    print(f"   3. solutions/.encryption_log.txt (full history)")
+    print(f"   1. solutions/.password_manifest.sqlite (indexed manifest + encryption log)")
+    print(f"   2. solutions/PASSWORDS.md (human-readable, generated)")
+    print(f"   3. solutions/.password_backup.json (machine-readable, generated)")
     print(f"\n📝 Next steps:")
     print(f"   1. git add {output_path}")
     print(f"   2. git commit -m \"Add encrypted solutions\"")
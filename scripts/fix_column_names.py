@@ -4,9 +4,10 @@ Fix column names in teaching notebooks to match actual cafe sales dataset.
 The dataset has columns with spaces, not underscores.
 """
 
-import json
 import sys
 
+from notebook_stream import iter_cells, rewrite_notebook
+
 def fix_column_names_in_sql(text):
     """Replace column names with underscores to quoted names with spaces."""
     replacements = {
@@ -39,30 +40,34 @@ def fix_column_names_in_sql(text):
 
     return result
 
+def fix_cell(cell):
+    """Fix SQL in a single code cell; returns the (possibly updated) cell."""
+    if cell['cell_type'] == 'code':
+        # Check if cell contains SQL code
+        source = ''.join(cell['source'])
+        if 'con.execute' in source or 'FROM cafe' in source:
+            new_source = fix_column_names_in_sql(source)
+            if new_source != source:
+                # Convert back to list of lines
+                cell['source'] = new_source.split('\n')
+                # Ensure each line ends with \n except the last
+                cell['source'] = [line + '\n' for line in cell['source'][:-1]] + [cell['source'][-1]]
+    return cell
+
 def fix_notebook(notebook_path):
     """Fix all SQL code cells in a notebook."""
     print(f"Processing {notebook_path}...")
 
-    with open(notebook_path, 'r') as f:
-        nb = json.load(f)
-
+    # Count cells needing changes while streaming, so unchanged notebooks
+    # are never rewritten
     changes = 0
-    for cell in nb['cells']:
-        if cell['cell_type'] == 'code':
-            # Check if cell contains SQL code
-            source = ''.join(cell['source'])
-            if 'con.execute' in source or 'FROM cafe' in source:
-                new_source = fix_column_names_in_sql(source)
-                if new_source != source:
-                    # Convert back to list of lines
-                    cell['source'] = new_source.split('\n')
-                    # Ensure each line ends with \n except the last
-                    cell['source'] = [line + '\n' for line in cell['source'][:-1]] + [cell['source'][-1]]
-                    changes += 1
+    for _, cell in iter_cells(notebook_path):
+        source = cell['source']
+        if fix_cell(cell)['source'] != source:
+            changes += 1
 
     if changes > 0:
-        with open(notebook_path, 'w') as f:
-            json.dump(nb, f, indent=1)
+        rewrite_notebook(notebook_path, fix_cell, ensure_ascii=True, trailing_newline=False)
         print(f"  ✅ Fixed {changes} cells")
     else:
         print(f"  ℹ️  No changes needed")
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+HTTP Cache - On-disk, validator-aware HTTP response cache
+
+Used by socrata_fetch.py so dataset downloads survive interruptions and
+reruns. Each cached response is stored as a body file plus an index entry
+with its ETag / Last-Modified validators:
+
+- a later request for the same URL + params is sent as a conditional GET
+  (If-None-Match / If-Modified-Since); a 304 answer is served from disk
+- pages recorded in a download checkpoint are served from disk without any
+  request at all (see socrata_fetch.SourceCheckpoint)
+
+The cache is bounded in size; least-recently-used responses are evicted
+first when it grows past the limit.
+
+Usage:
+    cache = HTTPCache()
+    entry = cache.lookup(url, params)
+    headers = cache.validators(entry)
+    ...
+    cache.store(url, params, response)
+    cache.save()
+    print(cache.stats_line())
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_CACHE_DIR = REPO_ROOT / '.http_cache'
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024
+CACHE_FORMAT = 1
+
+
+def request_key(url: str, params: Optional[Dict[str, Any]] = None) -> str:
+    """Stable key for a URL + query parameters."""
+    canonical = json.dumps([url, sorted((params or {}).items())], default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def write_json_atomic(path: Path, data: Any):
+    """Write JSON via temp file + rename."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=f'.{path.stem}.', suffix='.tmp', dir=path.parent)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+class HTTPCache:
+    """Thread-safe response cache keyed by URL + params."""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR,
+                 max_bytes: int = DEFAULT_MAX_BYTES,
+                 enabled: bool = True):
+        self.cache_dir = Path(cache_dir)
+        self.index_path = self.cache_dir / 'index.json'
+        self.body_dir = self.cache_dir / 'bodies'
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self.evictions = 0
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Any]] = self._load() if enabled else {}
+
+    # ------------------------------------------------------------------
+    # Lookup / store
+    # ------------------------------------------------------------------
+
+    def _body_path(self, key: str) -> Path:
+        return self.body_dir / key[:2] / key
+
+    def lookup(self, url: str, params: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """Index entry for a cached response (body may still be missing)."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            return self._entries.get(request_key(url, params))
+
+    def validators(self, entry: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        """Conditional request headers for a cached entry."""
+        headers = {}
+        if entry is not None:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def read(self, entry: Dict[str, Any], revalidated: bool = False) -> Optional[bytes]:
+        """Cached body for entry, or None if it was evicted or is unreadable."""
+        try:
+            body = self._body_path(entry['key']).read_bytes()
+        except OSError:
+            return None
+        with self._lock:
+            entry['last_used'] = time.time()
+            self._dirty = True
+            if revalidated:
+                self.revalidated += 1
+            else:
+                self.hits += 1
+        return body
+
+    def store(self, url: str, params: Optional[Dict[str, Any]], body: bytes,
+              headers: Dict[str, str]):
+        """Save a 200 response body with its validators."""
+        if not self.enabled:
+            return
+        key = request_key(url, params)
+        path = self._body_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix='.body.', suffix='.tmp', dir=path.parent)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(body)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+        with self._lock:
+            self.misses += 1
+            self._dirty = True
+            self._entries[key] = {
+                'key': key,
+                'url': url,
+                'size': len(body),
+                'etag': headers.get('ETag'),
+                'last_modified': headers.get('Last-Modified'),
+                'content_type': headers.get('Content-Type'),
+                'stored_at': time.time(),
+                'last_used': time.time(),
+            }
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if data.get('format') != CACHE_FORMAT:
+            return {}
+        return data.get('entries', {})
+
+    def save(self):
+        """
+        Evict down to max_bytes and write the index atomically.
+
+        Nothing is written if the cache was not used, so a run that only
+        opens the cache cannot overwrite the index of one running alongside.
+        """
+        if not self.enabled or not self._dirty:
+            return
+        with self._lock:
+            self._evict()
+            write_json_atomic(self.index_path, {'format': CACHE_FORMAT, 'entries': self._entries})
+            self._dirty = False
+
+    def _evict(self):
+        """Drop least-recently-used responses until the cache fits max_bytes."""
+        total = sum(entry['size'] for entry in self._entries.values())
+        if total <= self.max_bytes:
+            return
+        for key in sorted(self._entries, key=lambda k: self._entries[k].get('last_used', 0)):
+            if total <= self.max_bytes:
+                break
+            total -= self._entries[key]['size']
+            del self._entries[key]
+            try:
+                self._body_path(key).unlink()
+            except OSError:
+                pass
+            self.evictions += 1
+
+    def stats_line(self) -> str:
+        """One-line summary for script output."""
+        if not self.enabled:
+            return "HTTP cache: disabled (--no-cache)"
+        line = (f"HTTP cache: {self.hits} served from disk, {self.revalidated} revalidated (304), "
+                f"{self.misses} downloaded")
+        if self.evictions:
+            line += f", {self.evictions} evicted"
+        return line
@@ -4,51 +4,112 @@ List Solutions Status
 
 This script shows the status of all solutions in the repository:
 - Which solutions exist as encrypted ZIPs
-- Which solutions exist as unencrypted files (WARNING!)
-- Encryption log history
+- Which solutions exist as unencrypted files (WARNING!), and for each one
+  whether it was never encrypted or changed since it was (stale archive)
+- Encryption log history, filtered and paged
+
+The log and the content hashes of every encrypted file come from the
+password manifest (solutions/.password_manifest.sqlite, see
+password_manifest.py). The repository is walked once; the unencrypted /
+stale report is set arithmetic between the solution files found and the
+files recorded in the manifest, and only files whose size or mtime changed
+are hashed again. The manifest is opened read-only; before it exists, the
+history is read from the old solutions/.encryption_log.txt.
 
 Usage:
     python scripts/list_solutions.py
+    python scripts/list_solutions.py --day 1 --block A
+    python scripts/list_solutions.py --archive solutions-hw1.zip --since 2025-01-01 --until 2025-03-31
+    python scripts/list_solutions.py --limit 50 --page 2
+    python scripts/list_solutions.py --stale     # only the plaintext report (exit 1 if any)
 """
 
-import os
+import argparse
+import fnmatch
 import glob
+import os
+import sys
 from pathlib import Path
 
+from password_manifest import REPO_ROOT, PasswordManifest, hash_inputs
 
-def find_solution_files():
-    """Find all solution files in the repository."""
-    solution_files = []
-
-    # Search for *_solution.ipynb files
-    patterns = [
-        '**/*_solution.ipynb',
-        '**/*_solution.py',
-        'assignments/**/*solution*',
-    ]
-
-    for pattern in patterns:
-        matches = glob.glob(pattern, recursive=True)
-        solution_files.extend(matches)
 
-    return sorted(set(solution_files))
+# Solution files anywhere in the repo; anything named *solution* under assignments/
+SOLUTION_PATTERNS = ['*_solution.ipynb', '*_solution.py']
+ASSIGNMENTS_DIR = 'assignments'
 
 
-def find_encrypted_zips():
-    """Find all encrypted ZIP files."""
-    zip_files = glob.glob('solutions/solutions-*.zip')
-    return sorted(zip_files)
+def find_solution_files():
+    """Find all solution files in the repository (one walk, repo-relative paths)."""
+    solution_files = set()
 
+    for root, dirs, files in os.walk(REPO_ROOT):
+        # Like glob's **: hidden directories are not searched
+        dirs[:] = [d for d in dirs if not d.startswith('.')]
+        rel_root = Path(root).relative_to(REPO_ROOT)
+        in_assignments = rel_root.parts[:1] == (ASSIGNMENTS_DIR,)
+        for file in files:
+            if any(fnmatch.fnmatch(file, pattern) for pattern in SOLUTION_PATTERNS) \
+                    or (in_assignments and 'solution' in file):
+                solution_files.add((rel_root / file).as_posix())
 
-def read_encryption_log():
-    """Read the encryption log."""
-    log_file = 'solutions/.encryption_log.txt'
+    return solution_files
 
-    if not os.path.exists(log_file):
-        return []
 
-    with open(log_file, 'r') as f:
-        return f.readlines()
+def find_encrypted_zips():
+    """Find all encrypted ZIP files."""
+    zip_files = glob.glob(str(REPO_ROOT / 'solutions' / 'solutions-*.zip'))
+    return sorted(os.path.relpath(path, REPO_ROOT) for path in zip_files)
+
+
+def open_manifest():
+    """
+    The password manifest, read-only (imported in memory from the legacy
+    PASSWORDS.md, JSON backup and .encryption_log.txt if it does not exist yet).
+    """
+    return PasswordManifest(read_only=True)
+
+
+def solution_report(solution_files, manifest):
+    """
+    Split plaintext solution files into
+        unencrypted: never went into an archive
+        stale:       encrypted, but changed since (archive is out of date)
+        encrypted:   archive is up to date (plaintext copy still present)
+    """
+    recorded = manifest.sources()
+    unencrypted = solution_files - recorded.keys()
+    covered = solution_files & recorded.keys()
+
+    current = hash_inputs([(REPO_ROOT / path, path) for path in sorted(covered)],
+                          {path: recorded[path] for path in covered})
+    stale = {path for path, item in current.items()
+             if item['sha256'] != recorded[path]['sha256']}
+
+    return {
+        'unencrypted': sorted(unencrypted),
+        'stale': sorted(stale),
+        'encrypted': sorted(covered - stale),
+        'archive_of': {path: recorded[path]['archive'] for path in covered},
+    }
+
+
+def read_encryption_log(manifest, archive=None, day=None, block=None, since=None, until=None,
+                        limit=10, page=1):
+    """One page of the encryption log (newest first) and the number of matching entries."""
+    return manifest.history(archive=archive, day=day, block=block, since=since, until=until,
+                            limit=limit, offset=(page - 1) * limit)
+
+
+def format_log_entry(entry):
+    """One log entry as a line, like the old text log."""
+    line = (f"{entry['logged_at'].replace('T', ' ')} | {entry['source'] or '?'} -> "
+            f"{entry['archive']} | {entry['action']} | PASSWORD: {entry['password']}")
+    if entry['day'] and entry['block']:
+        line += f" (Day {entry['day']} Block {entry['block']})"
+    if entry['detail']:
+        line += f" [{entry['detail']}]"
+    return line
 
 
 def format_file_size(size_bytes):
@@ -61,7 +122,64 @@ def format_file_size(size_bytes):
         return f"{size_bytes/(1024*1024):.1f} MB"
 
 
+def print_solution_report(report):
+    """
+    Print the plaintext solution files; returns True if there are any.
+
+    Every plaintext copy is action required, even when its archive is up to
+    date; unencrypted / stale only says what to do about it.
+    """
+    plaintext = len(report['unencrypted']) + len(report['stale']) + len(report['encrypted'])
+
+    print(f"\n⚠️  Unencrypted Solutions (DO NOT COMMIT): {plaintext}")
+    print("-" * 70)
+
+    if not plaintext:
+        print("  ✅ None found (good!)")
+        return False
+
+    for solution_file in report['unencrypted']:
+        size = os.path.getsize(REPO_ROOT / solution_file)
+        print(f"  ❌ {solution_file} ({format_file_size(size)}) - not encrypted yet")
+    for solution_file in report['stale']:
+        print(f"  🔄 {solution_file} - changed since it was encrypted into "
+              f"{report['archive_of'][solution_file]} (stale)")
+    for solution_file in report['encrypted']:
+        print(f"  ⚠️  {solution_file} - encrypted in {report['archive_of'][solution_file]}, "
+              f"plaintext still present")
+    print(f"\n  ⚠️  WARNING: These files should NOT be committed!")
+    if report['unencrypted'] or report['stale']:
+        print(f"  Run encrypt_solutions_v2.py to create or refresh encrypted versions.")
+    return True
+
+
 def main():
+    parser = argparse.ArgumentParser(
+        description='Show encrypted / unencrypted solutions and the encryption log',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument('--day', help='Only log entries for this day')
+    parser.add_argument('--block', help='Only log entries for this block')
+    parser.add_argument('--archive', help='Only log entries for this archive (e.g. solutions-hw1.zip)')
+    parser.add_argument('--since', help='Only log entries on or after this date (YYYY-MM-DD)')
+    parser.add_argument('--until', help='Only log entries on or before this date (YYYY-MM-DD)')
+    parser.add_argument('--limit', type=int, default=10, help='Log entries per page (default: 10)')
+    parser.add_argument('--page', type=int, default=1, help='Log page to show (default: 1)')
+    parser.add_argument('--stale', action='store_true',
+                        help='Only report plaintext solution files, unencrypted or stale '
+                             '(exit 1 if there are any)')
+    args = parser.parse_args()
+    if args.limit < 1 or args.page < 1:
+        parser.error("--limit and --page must be at least 1")
+
+    manifest = open_manifest()
+    report = solution_report(find_solution_files(), manifest)
+
+    if args.stale:
+        action_required = print_solution_report(report)
+        sys.exit(1 if action_required else 0)
+
     print("="*70)
     print("SOLUTIONS STATUS CHECK")
     print("="*70)
@@ -74,55 +192,55 @@ def main():
 
     if encrypted:
         for zip_file in encrypted:
-            size = os.path.getsize(zip_file)
+            size = os.path.getsize(REPO_ROOT / zip_file)
             print(f"  ✅ {zip_file} ({format_file_size(size)})")
     else:
         print("  (none found)")
 
-    # Find unencrypted solutions
-    unencrypted = find_solution_files()
-
-    print(f"\n⚠️  Unencrypted Solutions (DO NOT COMMIT): {len(unencrypted)}")
-    print("-" * 70)
-
-    if unencrypted:
-        for solution_file in unencrypted:
-            size = os.path.getsize(solution_file)
-            print(f"  ❌ {solution_file} ({format_file_size(size)})")
-        print(f"\n  ⚠️  WARNING: These files should NOT be committed!")
-        print(f"  Run encrypt_solutions.py to create encrypted versions.")
-    else:
-        print("  ✅ None found (good!)")
+    # Find unencrypted / stale solutions
+    action_required = print_solution_report(report)
 
     # Show encryption log
-    log_entries = read_encryption_log()
+    filters = {key: getattr(args, key) for key in ('archive', 'day', 'block', 'since', 'until')
+               if getattr(args, key)}
+    log_entries, total = read_encryption_log(manifest, limit=args.limit, page=args.page, **filters)
 
-    print(f"\n📝 Encryption Log: {len(log_entries)} entries")
+    filter_text = ', '.join(f"{key}={value}" for key, value in filters.items())
+    print(f"\n📝 Encryption Log: {total} entries{f' matching {filter_text}' if filters else ''}")
     print("-" * 70)
 
     if log_entries:
-        # Show last 10 entries
-        for entry in log_entries[-10:]:
-            print(f"  {entry.strip()}")
-        if len(log_entries) > 10:
-            print(f"  ... ({len(log_entries)-10} earlier entries)")
+        first = (args.page - 1) * args.limit
+        for entry in log_entries:
+            print(f"  {format_log_entry(entry)}")
+        if total > first + len(log_entries):
+            print(f"  ... ({total - first - len(log_entries)} earlier entries, "
+                  f"see --page {args.page + 1})")
+    elif total:
+        print(f"  (page {args.page} is past the last entry)")
     else:
         print("  (no encryption history)")
 
     # Summary
     print("\n" + "="*70)
 
-    if unencrypted:
+    if action_required:
         print("⚠️  ACTION REQUIRED:")
-        print("   - Encrypt unencrypted solutions before committing")
+        if report['unencrypted'] or report['stale']:
+            print("   - Encrypt unencrypted or stale solutions before committing")
+        if report['encrypted']:
+            print("   - Delete plaintext copies whose archives are up to date")
         print("   - Or move them outside the repository")
         print(f"\n   Command:")
-        print(f"   python scripts/encrypt_solutions.py <file> --password <pwd> --day X --block Y")
+        print(f"   python scripts/encrypt_solutions_v2.py <file> --password <pwd> --day X --block Y "
+              f"--description \"...\"")
     else:
         print("✅ All solutions are encrypted or outside repository")
 
     print("="*70)
 
+    manifest.close()
+
 
 if __name__ == '__main__':
     main()
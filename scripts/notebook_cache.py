@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Notebook Cache - On-disk result cache for notebook checks
+
+The pre-commit hook runs validate_notebook_format.py and
+check_notebook_outputs.py on notebooks that usually have not changed. This
+module stores each script's per-notebook result so unchanged notebooks are
+not parsed again.
+
+An entry is keyed by namespace + absolute notebook path and records the
+file's size, mtime and SHA-256 content hash:
+- size and mtime match      -> hit (no read needed)
+- size matches, mtime moved -> hash the file; same hash is still a hit
+                               (e.g. after `git checkout` touched it)
+- anything else             -> miss, the caller recomputes
+
+Each namespace also stores a version (normally a hash of the checking
+code), so editing a checker invalidates its old results automatically.
+
+The cache file is bounded in size; least-recently-used entries are evicted
+first when it grows past the limit.
+
+Usage:
+    cache = ResultCache('validate', version=source_version(__file__))
+    result = cache.get(path)
+    if result is None:
+        result = validate_notebook(path)
+        cache.put(path, result)
+    cache.save()
+    print(cache.stats_line())
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_CACHE_PATH = REPO_ROOT / '.notebook_cache' / 'results.json'
+DEFAULT_MAX_BYTES = 8 * 1024 * 1024
+CACHE_FORMAT = 1
+
+
+def file_sha256(path, chunk_size: int = 1024 * 1024) -> str:
+    """Hash a file in chunks (never loads it whole)."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def source_version(*paths) -> str:
+    """Short hash of the given source files, used as a cache version."""
+    digest = hashlib.sha256()
+    for path in paths:
+        digest.update(Path(path).read_bytes())
+    return digest.hexdigest()[:16]
+
+
+class ResultCache:
+    """Per-notebook result cache for one checker (namespace)."""
+
+    def __init__(self, namespace: str, version: str = '',
+                 cache_path=DEFAULT_CACHE_PATH,
+                 max_bytes: int = DEFAULT_MAX_BYTES,
+                 enabled: bool = True):
+        self.namespace = namespace
+        self.version = version
+        self.cache_path = Path(cache_path)
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: Dict[str, Dict[str, Any]] = self._load() if enabled else {}
+        self._dirty: Dict[str, Optional[Dict[str, Any]]] = {}
+
+    # ------------------------------------------------------------------
+    # Lookup / store
+    # ------------------------------------------------------------------
+
+    def _key(self, notebook_path) -> str:
+        return f"{self.namespace}:{Path(notebook_path).resolve()}"
+
+    def get(self, notebook_path) -> Optional[Any]:
+        """Return the cached result for an unchanged notebook, else None."""
+        if not self.enabled:
+            return None
+
+        key = self._key(notebook_path)
+        entry = self._entries.get(key)
+
+        try:
+            stat = os.stat(notebook_path)
+        except OSError:
+            entry = None
+
+        if entry is not None and entry.get('version') == self.version:
+            same_stat = (entry['size'] == stat.st_size and
+                         entry['mtime_ns'] == stat.st_mtime_ns)
+            if not same_stat and entry['size'] == stat.st_size:
+                # Touched but possibly unchanged: confirm by content hash
+                if file_sha256(notebook_path) == entry['sha256']:
+                    entry['mtime_ns'] = stat.st_mtime_ns
+                    same_stat = True
+            if same_stat:
+                entry['last_used'] = time.time()
+                self._dirty[key] = entry
+                self.hits += 1
+                return entry['result']
+
+        self.misses += 1
+        return None
+
+    def put(self, notebook_path, result: Any):
+        """Store a freshly computed result for a notebook."""
+        if not self.enabled:
+            return
+
+        stat = os.stat(notebook_path)
+        key = self._key(notebook_path)
+        entry = {
+            'version': self.version,
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'sha256': file_sha256(notebook_path),
+            'last_used': time.time(),
+            'result': result,
+        }
+        self._entries[key] = entry
+        self._dirty[key] = entry
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if data.get('format') != CACHE_FORMAT:
+            return {}
+        return data.get('entries', {})
+
+    def save(self):
+        """
+        Merge this run's entries into the cache file and write it atomically.
+
+        The file is re-read first so entries written by another checker
+        since we loaded are kept.
+        """
+        if not self.enabled or not self._dirty:
+            return
+
+        entries = self._load()
+        entries.update(self._dirty)
+        entries = self._evict(entries)
+
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix='.results.', suffix='.tmp',
+                                        dir=self.cache_path.parent)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({'format': CACHE_FORMAT, 'entries': entries}, f)
+            os.replace(tmp_path, self.cache_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+        self._entries = entries
+        self._dirty = {}
+
+    def _evict(self, entries: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """Drop least-recently-used entries until the cache fits max_bytes."""
+        sizes = {key: len(json.dumps(entry)) for key, entry in entries.items()}
+        total = sum(sizes.values())
+        if total <= self.max_bytes:
+            return entries
+
+        for key in sorted(entries, key=lambda k: entries[k].get('last_used', 0)):
+            if total <= self.max_bytes:
+                break
+            total -= sizes[key]
+            del entries[key]
+            self.evictions += 1
+        return entries
+
+    def stats_line(self) -> str:
+        """One-line summary for script output."""
+        if not self.enabled:
+            return "Cache: disabled (--no-cache)"
+        line = f"Cache: {self.hits} hits, {self.misses} misses"
+        if self.evictions:
+            line += f", {self.evictions} evicted"
+        return line
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Notebook Discovery - Find the notebooks a script should look at
+
+Shared by validate_notebook_format.py, check_notebook_outputs.py and
+clear_notebook_outputs.py.
+
+Three ways to select notebooks:
+- Full walk of notebooks/ and assignments/. Checkpoint, hidden and
+  git-ignored directories are pruned while walking, so they are never
+  descended into.
+- Changed since a git ref (--changed-since REF): asks git which .ipynb files
+  differ from REF in the working tree, plus untracked ones. Nothing is walked,
+  so cost grows with the size of the change, not the size of the repo.
+- Changed since the last run (--changed): notebooks modified after the
+  previous successful run of the same script, recorded in
+  .notebook_cache/last_runs.json.
+
+Usage:
+    from notebook_discovery import find_notebooks, record_run
+
+    notebooks = find_notebooks(since_ref='origin/main')
+    notebooks = find_notebooks(since_last_run='validate')
+    ...
+    record_run('validate')
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import time
+from pathlib import Path
+from typing import Iterable, List, Optional, Set
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_ROOTS = [REPO_ROOT / 'notebooks', REPO_ROOT / 'assignments']
+STATE_PATH = REPO_ROOT / '.notebook_cache' / 'last_runs.json'
+
+# Directories never worth descending into
+PRUNE_DIRS = {'.ipynb_checkpoints', '__pycache__', 'node_modules'}
+
+
+def is_solution_notebook(file_path):
+    """Check if this is a solution notebook (which we should skip)."""
+    path_str = str(file_path).lower()
+    return (
+        '_solution' in path_str or
+        '/solution' in path_str or
+        'solutions/' in path_str
+    )
+
+
+def _git(*args) -> Optional[str]:
+    """Run a git command in the repo root; None if git is unavailable."""
+    try:
+        result = subprocess.run(
+            ['git', *args],
+            cwd=REPO_ROOT,
+            capture_output=True,
+            text=True,
+        )
+    except OSError:
+        return None
+    if result.returncode != 0:
+        return None
+    return result.stdout
+
+
+def _git_paths(command, *args) -> Optional[List[Path]]:
+    """Run a NUL-separated git listing and return absolute paths."""
+    output = _git(command, '-z', *args)
+    if output is None:
+        return None
+    return [REPO_ROOT / name for name in output.split('\0') if name]
+
+
+def ignored_directories() -> Set[Path]:
+    """Git-ignored directories (one git call; empty outside a repo)."""
+    paths = _git_paths('ls-files', '--others', '--ignored', '--exclude-standard', '--directory')
+    if not paths:
+        return set()
+    # --directory lists ignored directories with a trailing slash; Path()
+    # drops it, so keep only entries that are directories on disk
+    return {path for path in paths if path.is_dir()}
+
+
+def walk_notebooks(roots: Iterable[Path]) -> List[Path]:
+    """
+    Walk roots for *.ipynb, pruning checkpoint, hidden and ignored dirs.
+
+    Pruning happens in os.walk's dirnames list, so skipped directories are
+    never listed at all.
+    """
+    ignored = ignored_directories()
+    notebooks = []
+
+    for root in roots:
+        root = Path(root).resolve()
+        if root.is_file():
+            if root.suffix == '.ipynb':
+                notebooks.append(root)
+            continue
+        if not root.exists():
+            continue
+
+        for dirpath, dirnames, filenames in os.walk(root):
+            current = Path(dirpath)
+            dirnames[:] = [
+                d for d in dirnames
+                if d not in PRUNE_DIRS
+                and not d.startswith('.')
+                and current / d not in ignored
+            ]
+            for filename in filenames:
+                if filename.endswith('.ipynb'):
+                    notebooks.append(current / filename)
+
+    return notebooks
+
+
+def changed_since_ref(ref: str, roots: Iterable[Path]) -> List[Path]:
+    """
+    Notebooks under roots that differ from ref (committed, staged or not)
+    plus untracked ones. Deleted notebooks are not returned.
+    """
+    roots = [Path(r).resolve() for r in roots]
+    pathspecs = [str(r.relative_to(REPO_ROOT)) if r.is_relative_to(REPO_ROOT) else str(r)
+                 for r in roots]
+
+    changed = _git_paths('diff', '--name-only', '--diff-filter=ACMR', ref, '--', *pathspecs)
+    if changed is None:
+        raise ValueError(f"git diff against '{ref}' failed (unknown ref or not a git repo?)")
+    untracked = _git_paths('ls-files', '--others', '--exclude-standard', '--', *pathspecs) or []
+
+    return [
+        path for path in changed + untracked
+        if path.suffix == '.ipynb'
+        and '.ipynb_checkpoints' not in path.parts
+        and path.exists()
+    ]
+
+
+def _load_state() -> dict:
+    try:
+        with open(STATE_PATH, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def last_run_time(tool: str) -> Optional[float]:
+    """Start time of the last recorded run of tool, if any."""
+    return _load_state().get(tool)
+
+
+def record_run(tool: str, started: Optional[float] = None):
+    """Remember that tool ran successfully (used by --changed)."""
+    state = _load_state()
+    state[tool] = started if started is not None else time.time()
+    STATE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = STATE_PATH.with_suffix('.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, STATE_PATH)
+
+
+def find_notebooks(roots: Optional[Iterable[Path]] = None,
+                   exclude_solutions: bool = True,
+                   since_ref: Optional[str] = None,
+                   since_last_run: Optional[str] = None) -> List[Path]:
+    """
+    Find notebooks to process.
+
+    Args:
+        roots: Directories (or notebook files) to search; default
+            notebooks/ and assignments/
+        exclude_solutions: If True, skip solution notebooks
+        since_ref: Only notebooks changed relative to this git ref
+        since_last_run: Tool name; only notebooks modified since that
+            tool's last recorded run (all notebooks if it never ran)
+
+    Returns:
+        Sorted list of Path objects for notebooks
+    """
+    roots = list(roots) if roots is not None else DEFAULT_ROOTS
+
+    if since_ref is not None:
+        notebooks = changed_since_ref(since_ref, roots)
+    else:
+        notebooks = walk_notebooks(roots)
+
+    if since_last_run is not None:
+        last_run = last_run_time(since_last_run)
+        if last_run is not None:
+            notebooks = [nb for nb in notebooks if nb.stat().st_mtime > last_run]
+
+    if exclude_solutions:
+        notebooks = [nb for nb in notebooks if not is_solution_notebook(nb)]
+
+    return sorted(set(notebooks))
+
+
+def add_selection_arguments(parser: argparse.ArgumentParser, include_all: bool = True):
+    """Add the shared --all / --changed-since / --changed options."""
+    if include_all:
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Process all notebooks in notebooks/ and assignments/'
+        )
+    parser.add_argument(
+        '--changed-since',
+        metavar='REF',
+        help='Only notebooks changed relative to git REF (e.g. HEAD, origin/main)'
+    )
+    parser.add_argument(
+        '--changed',
+        action='store_true',
+        help='Only notebooks modified since the last successful run of this script'
+    )
+
+
+def wants_discovery(args) -> bool:
+    """True if the selection options ask for discovery instead of explicit files."""
+    return bool(getattr(args, 'all', False) or args.changed_since or args.changed)
+
+
+def select_notebooks(args, tool: str, paths: Optional[Iterable] = None,
+                     exclude_solutions: bool = True) -> List[Path]:
+    """
+    Resolve the selection options to a list of notebooks.
+
+    Explicit paths (files or directories) narrow the search roots; otherwise
+    notebooks/ and assignments/ are searched.
+    """
+    roots = [Path(p) for p in paths] if paths else None
+    return find_notebooks(
+        roots=roots,
+        exclude_solutions=exclude_solutions,
+        since_ref=args.changed_since,
+        since_last_run=tool if args.changed else None,
+    )
@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Notebook Lint - Single-pass rule engine for notebook checks
+
+validate_notebook_format.py (nbformat / cell IDs), check_notebook_outputs.py
+(missing outputs, errors, empty results) and clear_notebook_outputs.py
+(output counts) all need to look at every cell of the same notebook. This
+module streams each notebook once and runs a set of rule objects over every
+cell; the three scripts are thin front-ends that pick the result they need.
+
+Results for all default rules are computed together and cached per file
+(see notebook_cache.py), so when the pre-commit hook runs the three scripts
+back to back each notebook is parsed and walked only once.
+
+Writing a rule:
+    class MyRule(Rule):
+        name = 'my_rule'
+
+        def visit_cell(self, index, cell):
+            ...
+
+        def finish(self, reader):
+            return <JSON-serializable result>
+
+Usage:
+    results = lint_notebook('notebooks/day1/day1_setup_check.ipynb')
+    results['format']        # list of format errors (empty if valid)
+    results['outputs']       # output quality report
+    results['output_count']  # counts used when clearing outputs
+"""
+
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Type
+
+from notebook_cache import ResultCache, source_version
+from notebook_stream import NotebookReader
+
+
+class Rule:
+    """Base class for a lint rule. A fresh instance is used per notebook."""
+
+    name = ''
+
+    def visit_cell(self, index: int, cell: Dict[str, Any]):
+        """Called once for every cell, in notebook order."""
+        pass
+
+    def finish(self, reader: NotebookReader) -> Any:
+        """Called after the last cell; reader.fields holds top-level values."""
+        raise NotImplementedError
+
+
+class NotebookFormatRule(Rule):
+    """
+    nbformat 4.5 with unique 8-character lowercase hex cell IDs.
+
+    Result: list of error messages (empty if the notebook is valid).
+    """
+
+    name = 'format'
+    cell_id_pattern = re.compile(r'^[0-9a-f]{8}$')
+
+    def __init__(self):
+        self.cell_count = 0
+        self.cell_errors = []
+        self.seen_ids = {}
+
+    def visit_cell(self, index, cell):
+        self.cell_count += 1
+
+        # Check cell has ID
+        cell_id = cell.get('id')
+
+        if cell_id is None:
+            self.cell_errors.append(f"Cell at index {index} missing 'id' field")
+            return
+
+        # Check ID format (8 lowercase hex characters)
+        if not isinstance(cell_id, str):
+            self.cell_errors.append(f"Cell {index} has non-string ID: {cell_id}")
+        elif not self.cell_id_pattern.match(cell_id):
+            if len(cell_id) != 8:
+                self.cell_errors.append(f"Cell {index} ID '{cell_id}' must be exactly 8 characters (got {len(cell_id)})")
+            elif not all(c in '0123456789abcdef' for c in cell_id):
+                self.cell_errors.append(f"Cell {index} ID '{cell_id}' must be lowercase hexadecimal (0-9, a-f)")
+            else:
+                self.cell_errors.append(f"Cell {index} ID '{cell_id}' has invalid format")
+
+        # Track for duplicate check (reported after all format errors)
+        self.seen_ids.setdefault(cell_id, []).append(index)
+
+    def finish(self, reader):
+        errors = []
+
+        # Check nbformat version
+        nbformat = reader.fields.get('nbformat')
+        nbformat_minor = reader.fields.get('nbformat_minor')
+
+        if nbformat != 4:
+            errors.append(f"nbformat must be 4, got {nbformat}")
+
+        if nbformat_minor is None or nbformat_minor < 5:
+            errors.append(f"nbformat_minor must be >= 5, got {nbformat_minor}")
+
+        # Check cells
+        if not self.cell_count:
+            errors.append("Notebook has no cells")
+            return errors
+
+        errors.extend(self.cell_errors)
+
+        # Check for duplicate IDs (in order of the later occurrence)
+        duplicates = []
+        for cell_id, indices in self.seen_ids.items():
+            for idx in indices[1:]:
+                duplicates.append((idx, f"Duplicate cell ID '{cell_id}' found at indices {indices[0]} and {idx}"))
+        errors.extend(message for _, message in sorted(duplicates))
+
+        return errors
+
+
+class OutputQualityRule(Rule):
+    """
+    Teaching-quality checks on an executed notebook.
+
+    Result: report dict with code cell counts and lists of cells without
+    output, cells showing empty DataFrames and cells with errors.
+    """
+
+    name = 'outputs'
+
+    def __init__(self):
+        self.code_cell_count = 0
+        self.cells_with_outputs = 0
+        self.cells_without_outputs = []
+        self.empty_result_cells = []
+        self.error_cells = []
+
+    def visit_cell(self, index, cell):
+        if cell.get('cell_type') != 'code':
+            return
+
+        self.code_cell_count += 1
+
+        cell_id = cell.get('id', f'cell-{index}')
+        outputs = cell.get('outputs', [])
+        source = ''.join(cell.get('source', []))
+
+        # Check for outputs
+        if not outputs:
+            # Skip if cell is just a comment or whitespace
+            if source.strip() and not source.strip().startswith('#'):
+                self.cells_without_outputs.append({
+                    'index': index,
+                    'id': cell_id,
+                    'source_preview': source[:100].strip()
+                })
+            return
+
+        self.cells_with_outputs += 1
+
+        # Check for errors
+        for output in outputs:
+            if output.get('output_type') == 'error':
+                self.error_cells.append({
+                    'index': index,
+                    'id': cell_id,
+                    'error_name': output.get('ename', 'Unknown'),
+                    'error_value': output.get('evalue', 'No message'),
+                    'source_preview': source[:100].strip()
+                })
+
+        # Check for empty DataFrames
+        for output in outputs:
+            if output.get('output_type') in ['execute_result', 'display_data']:
+                data = output.get('data', {})
+                text_plain = data.get('text/plain', '')
+
+                # Convert list to string if needed
+                if isinstance(text_plain, list):
+                    text_plain = ''.join(text_plain)
+
+                # Check for empty results
+                if ('Empty DataFrame' in text_plain or
+                    '[0 rows' in text_plain or
+                    'shape: (0,' in text_plain):
+                    self.empty_result_cells.append({
+                        'index': index,
+                        'id': cell_id,
+                        'output_preview': text_plain[:200],
+                        'source_preview': source[:100].strip()
+                    })
+
+    def finish(self, reader):
+        return {
+            'total_code_cells': self.code_cell_count,
+            'cells_with_outputs': self.cells_with_outputs,
+            'cells_without_outputs': len(self.cells_without_outputs),
+            'empty_result_cells': len(self.empty_result_cells),
+            'error_cells': len(self.error_cells),
+            'issues': {
+                'no_output': self.cells_without_outputs,
+                'empty_results': self.empty_result_cells,
+                'errors': self.error_cells
+            }
+        }
+
+
+class OutputCountRule(Rule):
+    """
+    What clearing outputs would remove.
+
+    Result: {'has_cells', 'output_count', 'execution_count_found'}.
+    """
+
+    name = 'output_count'
+
+    def __init__(self):
+        self.output_count = 0
+        self.execution_count_found = False
+
+    def visit_cell(self, index, cell):
+        # Code cells have outputs and execution_count
+        if cell.get('cell_type') == 'code':
+            if cell.get('outputs'):
+                self.output_count += len(cell['outputs'])
+            if cell.get('execution_count') is not None:
+                self.execution_count_found = True
+
+    def finish(self, reader):
+        return {
+            'has_cells': reader.has_cells,
+            'output_count': self.output_count,
+            'execution_count_found': self.execution_count_found,
+        }
+
+
+DEFAULT_RULES: List[Type[Rule]] = [NotebookFormatRule, OutputQualityRule, OutputCountRule]
+
+
+def lint_notebook(notebook_path, rules: Optional[Sequence[Type[Rule]]] = None) -> Dict[str, Any]:
+    """
+    Stream a notebook once and run every rule over each cell.
+
+    Args:
+        notebook_path: Path to the notebook file
+        rules: Rule classes to run (default: DEFAULT_RULES)
+
+    Returns:
+        Dict mapping rule name -> rule result
+
+    Raises:
+        NotebookStreamError / OSError if the file cannot be parsed or read
+    """
+    active = [rule() for rule in (rules or DEFAULT_RULES)]
+
+    with NotebookReader(notebook_path) as reader:
+        for index, cell in reader.cells():
+            for rule in active:
+                rule.visit_cell(index, cell)
+
+        return {rule.name: rule.finish(reader) for rule in active}
+
+
+class NotebookDocument:
+    """
+    An already-loaded notebook (dict or nbformat NotebookNode) exposing the
+    same `fields` / `has_cells` interface rules get from NotebookReader.
+    """
+
+    def __init__(self, notebook: Dict[str, Any]):
+        self.fields = {key: value for key, value in notebook.items() if key != 'cells'}
+        self.has_cells = 'cells' in notebook
+        self.cell_list = notebook.get('cells', [])
+
+
+def lint_document(notebook: Dict[str, Any], rules: Optional[Sequence[Type[Rule]]] = None) -> Dict[str, Any]:
+    """Run rules over an in-memory notebook (e.g. one just executed)."""
+    document = NotebookDocument(notebook)
+    active = [rule() for rule in (rules or DEFAULT_RULES)]
+
+    for index, cell in enumerate(document.cell_list):
+        for rule in active:
+            rule.visit_cell(index, cell)
+
+    return {rule.name: rule.finish(document) for rule in active}
+
+
+def lint_cache(enabled: bool = True) -> ResultCache:
+    """Result cache shared by every notebook front-end."""
+    here = Path(__file__).resolve().parent
+    return ResultCache(
+        'lint',
+        version=source_version(here / 'notebook_lint.py', here / 'notebook_stream.py'),
+        enabled=enabled,
+    )
+
+
+def lint_with_cache(notebook_path, cache: Optional[ResultCache] = None) -> Dict[str, Any]:
+    """Run all default rules, reusing and filling the cache when given."""
+    if cache is not None:
+        results = cache.get(notebook_path)
+        if results is not None:
+            return results
+
+    results = lint_notebook(notebook_path)
+
+    if cache is not None:
+        cache.put(notebook_path, results)
+    return results
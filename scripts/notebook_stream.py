@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Notebook Stream - Incremental reader/writer for Jupyter notebooks
+
+Executed notebooks that embed DataFrame HTML and base64 plots can reach tens
+of MB. json.load() on such a file holds the whole document in memory. This
+module parses the top-level notebook object incrementally and yields cells
+one at a time, so only the current cell is ever held in memory.
+
+Only the standard library is used: values are decoded with
+json.JSONDecoder.raw_decode() from a buffer that is refilled from the file
+as needed.
+
+Usage:
+    from notebook_stream import NotebookReader, rewrite_notebook
+
+    with NotebookReader('notebooks/day1/day1_setup_check.ipynb') as reader:
+        for index, cell in reader.cells():
+            ...
+        print(reader.fields['nbformat'])
+
+    # Stream a notebook through a cell transform and replace it atomically
+    rewrite_notebook(path, lambda cell: cell)
+"""
+
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+
+CHUNK_SIZE = 64 * 1024
+WHITESPACE = ' \t\n\r'
+
+
+class NotebookStreamError(ValueError):
+    """Raised when a notebook file is not a well-formed JSON object."""
+    pass
+
+
+class NotebookReader:
+    """
+    Incremental reader for a notebook's top-level JSON object.
+
+    Top-level values other than 'cells' (metadata, nbformat, ...) are small
+    and decoded whole into `fields`. The 'cells' array is decoded one element
+    at a time by cells(). `keys` records the top-level key order so a writer
+    can reproduce the original layout.
+    """
+
+    def __init__(self, notebook_path):
+        self.path = Path(notebook_path)
+        self.fields: Dict[str, Any] = {}
+        self.keys: List[str] = []
+        self._decoder = json.JSONDecoder()
+        self._file = None
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def open(self):
+        self._file = open(self.path, 'r', encoding='utf-8')
+        self._skip_whitespace()
+        if not self._expect('{'):
+            self.close()
+            raise NotebookStreamError("Expecting '{' at start of notebook")
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    @property
+    def has_cells(self) -> bool:
+        """True once a top-level 'cells' key has been seen."""
+        return 'cells' in self.keys
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def members(self) -> Iterator[Tuple[str, Any]]:
+        """
+        Yield (key, value) for each top-level member in file order.
+
+        For 'cells' the value is an iterator of (index, cell) tuples that
+        must be consumed before the next member is read; anything left
+        unconsumed is skipped automatically.
+        """
+        while True:
+            self._skip_whitespace()
+            if self._expect('}'):
+                self._check_end()
+                return
+
+            key = self._decode_value()
+            if not isinstance(key, str):
+                raise NotebookStreamError('Expecting property name')
+            self._skip_whitespace()
+            if not self._expect(':'):
+                raise NotebookStreamError(f"Expecting ':' after key '{key}'")
+            self.keys.append(key)
+            self._skip_whitespace()
+
+            if key == 'cells':
+                if not self._expect('['):
+                    raise NotebookStreamError("'cells' must be a list")
+                cells = self._iter_array()
+                yield key, cells
+                for _ in cells:
+                    pass
+            else:
+                self.fields[key] = self._decode_value()
+                yield key, self.fields[key]
+
+            self._skip_whitespace()
+            if self._expect(','):
+                continue
+            if self._expect('}'):
+                self._check_end()
+                return
+            raise NotebookStreamError("Expecting ',' or '}' between top-level members")
+
+    def cells(self) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """
+        Yield (index, cell) for every cell, reading all other fields too.
+
+        Once the iterator is exhausted `fields` holds every top-level value
+        except 'cells'. If the document has no 'cells' key nothing is yielded.
+        """
+        for key, value in self.members():
+            if key == 'cells':
+                yield from value
+
+    def finish(self) -> Dict[str, Any]:
+        """Skip any unread cells and return the top-level fields."""
+        for _ in self.cells():
+            pass
+        return self.fields
+
+    # ------------------------------------------------------------------
+    # Parsing helpers
+    # ------------------------------------------------------------------
+
+    def _check_end(self):
+        """Only whitespace may follow the closing brace (like json.load)."""
+        self._skip_whitespace()
+        if self._fill():
+            raise NotebookStreamError('Extra data after end of notebook')
+
+    def _iter_array(self) -> Iterator[Tuple[int, Any]]:
+        """Yield (index, element) for an array whose '[' was consumed."""
+        self._skip_whitespace()
+        if self._expect(']'):
+            return
+        index = 0
+        while True:
+            self._skip_whitespace()
+            yield index, self._decode_value()
+            self._skip_whitespace()
+            if self._expect(','):
+                index += 1
+                continue
+            if self._expect(']'):
+                return
+            raise NotebookStreamError(f"Expecting ',' or ']' after cell {index}")
+
+    def _fill(self, min_chars: int = 1) -> bool:
+        """Make at least min_chars unread characters available if possible."""
+        if len(self._buffer) - self._pos >= min_chars:
+            return True
+        if self._eof:
+            return False
+        self._buffer = self._buffer[self._pos:]
+        self._pos = 0
+        while len(self._buffer) < min_chars and not self._eof:
+            chunk = self._file.read(max(CHUNK_SIZE, min_chars))
+            if not chunk:
+                self._eof = True
+            self._buffer += chunk
+        return len(self._buffer) >= min_chars
+
+    def _skip_whitespace(self):
+        while True:
+            if not self._fill():
+                return
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return
+
+    def _expect(self, char: str) -> bool:
+        if self._fill() and self._buffer[self._pos] == char:
+            self._pos += 1
+            return True
+        return False
+
+    def _decode_value(self) -> Any:
+        """
+        Decode one JSON value at the current position.
+
+        raw_decode() cannot tell a truncated buffer from malformed input, so
+        on failure the buffer is grown (doubling the request each time) and
+        decoding retried until the value parses or the file is exhausted.
+        """
+        want = CHUNK_SIZE
+        while True:
+            self._fill(want)
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError as e:
+                if self._eof:
+                    raise NotebookStreamError(str(e)) from None
+                want = (len(self._buffer) - self._pos) * 2 + CHUNK_SIZE
+                continue
+            # A number at the very end of the buffer may be truncated
+            if end == len(self._buffer) and not self._eof and not isinstance(value, (dict, list, str)):
+                want = (len(self._buffer) - self._pos) + CHUNK_SIZE
+                continue
+            self._pos = end
+            return value
+
+
+def iter_cells(notebook_path) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """Yield (index, cell) for every cell of a notebook file."""
+    with NotebookReader(notebook_path) as reader:
+        yield from reader.cells()
+
+
+def _dump_lines(value: Any, indent_level: int, ensure_ascii: bool) -> str:
+    """Serialize value like json.dump(indent=1) would at the given depth."""
+    text = json.dumps(value, indent=1, ensure_ascii=ensure_ascii)
+    return text.replace('\n', '\n' + ' ' * indent_level)
+
+
+def write_notebook(output, reader: NotebookReader,
+                   transform: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None,
+                   ensure_ascii: bool = False):
+    """
+    Stream reader's notebook to a text file object, transforming each cell.
+
+    Output is byte-for-byte what json.dump(notebook, f, indent=1) would
+    produce, written one cell at a time.
+    """
+    output.write('{')
+    first_key = True
+
+    for key, value in reader.members():
+        output.write('\n ' if first_key else ',\n ')
+        first_key = False
+        output.write(json.dumps(key, ensure_ascii=ensure_ascii) + ': ')
+
+        if key != 'cells':
+            output.write(_dump_lines(value, 1, ensure_ascii))
+            continue
+
+        first_cell = True
+        for _, cell in value:
+            if transform is not None:
+                cell = transform(cell)
+            output.write('[\n  ' if first_cell else ',\n  ')
+            first_cell = False
+            output.write(_dump_lines(cell, 2, ensure_ascii))
+        output.write('[]' if first_cell else '\n ]')
+
+    output.write('}' if first_key else '\n}')
+
+
+class _ByteCounter:
+    """Text sink that only counts the UTF-8 bytes written to it."""
+
+    def __init__(self):
+        self.size = 0
+
+    def write(self, text: str):
+        self.size += len(text.encode('utf-8'))
+
+
+def rewritten_size(notebook_path,
+                   transform: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None,
+                   ensure_ascii: bool = False,
+                   trailing_newline: bool = True) -> int:
+    """Size in bytes rewrite_notebook() would produce, without writing it."""
+    counter = _ByteCounter()
+    with NotebookReader(notebook_path) as reader:
+        write_notebook(counter, reader, transform, ensure_ascii=ensure_ascii)
+    if trailing_newline:
+        counter.write('\n')
+    return counter.size
+
+
+def rewrite_notebook(notebook_path,
+                     transform: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None,
+                     ensure_ascii: bool = False,
+                     trailing_newline: bool = True):
+    """
+    Rewrite a notebook in place, streaming each cell through transform.
+
+    The new content is written to a temporary file in the same directory and
+    moved over the original with os.replace(), so readers never see a
+    half-written notebook and a failure leaves the original untouched.
+    """
+    notebook_path = Path(notebook_path)
+    fd, tmp_path = tempfile.mkstemp(
+        prefix=f'.{notebook_path.name}.', suffix='.tmp', dir=notebook_path.parent
+    )
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as output:
+            with NotebookReader(notebook_path) as reader:
+                write_notebook(output, reader, transform, ensure_ascii=ensure_ascii)
+            if trailing_newline:
+                output.write('\n')
+        mode = os.stat(notebook_path).st_mode & 0o777
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, notebook_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
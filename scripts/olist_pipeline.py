@@ -0,0 +1,456 @@
+#!/usr/bin/env python3
+"""
+Olist Pipeline - Incremental bronze/silver/gold models in DuckDB
+
+The Day 3 teaching notebook (create_day3_teaching_notebook.py) builds its
+pipeline with CREATE TABLE ... AS, so every run reloads and recomputes
+everything. This module declares the same layers once as models with
+dependencies and keeps them in an on-disk DuckDB database:
+
+    bronze_orders, bronze_customers, bronze_order_items   raw CSV rows (text)
+    silver_orders, silver_customers, silver_order_items   typed and filtered
+    gold_daily_sales, gold_customer_summary               business metrics
+
+The size and mtime of every source file are recorded when it is loaded,
+and a run reads only the files that are new or changed since (so a feed
+that grows by adding files - orders_2018-08-02.csv, ... - is read one new
+file at a time). Orders are partitioned by the day of
+order_purchase_timestamp: of the orders in those files, only days that have
+not been loaded yet are processed. Bronze and silver get the new days'
+orders and their items, new customers are added by key, gold_daily_sales
+gets rows for the new days, and gold_customer_summary is recomputed only for
+the customers who ordered on them. A daily run therefore costs the new
+files, not the whole history; a source given as a single growing CSV is
+still read whole whenever it changes. The items of an order are expected in
+files delivered with or after the order (already loaded files are not read
+again). Each run is one transaction, so a failed run leaves the database as
+it was.
+
+The SQL is the notebook's (same columns, casts and filters). Bronze tables
+keep every column as text, exactly as received; order items are loaded with
+the order they belong to. --reprocess-from reads every source file again and
+reloads the days from a date on (late corrections), --full-refresh rebuilds
+everything.
+
+Usage:
+    python scripts/olist_pipeline.py                       # teaching subset
+    python scripts/olist_pipeline.py --orders 'feed/orders_*.csv' \\
+        --customers 'feed/customers_*.csv' --order-items 'feed/items_*.csv'
+    python scripts/olist_pipeline.py --reprocess-from 2018-08-01
+    python scripts/olist_pipeline.py --full-refresh
+    python scripts/olist_pipeline.py --status
+
+    from olist_pipeline import OlistPipeline
+    with OlistPipeline('warehouse.duckdb') as pipeline:
+        result = pipeline.run()
+        daily = pipeline.con.execute("SELECT * FROM gold_daily_sales").df()
+"""
+
+import argparse
+import datetime
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from course_data import sql_string
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_DB = REPO_ROOT / 'data' / 'day3' / 'olist_pipeline.duckdb'
+TEACHING_DIR = REPO_ROOT / 'data' / 'day3' / 'teaching'
+DEFAULT_SOURCES = {
+    'orders': TEACHING_DIR / 'olist_orders_subset.csv',
+    'customers': TEACHING_DIR / 'olist_customers_subset.csv',
+    'order_items': TEACHING_DIR / 'olist_order_items_subset.csv',
+}
+
+# Partition of an order row (bronze text or silver timestamp)
+ORDER_DAY = "CAST(TRY_CAST(order_purchase_timestamp AS TIMESTAMP) AS DATE)"
+
+# Orders of the partitions processed in this run
+NEW_ORDER_IDS = f"SELECT order_id FROM bronze_orders WHERE is_new_day({ORDER_DAY})"
+
+# Each model: the tables it reads, the SELECT producing its rows for this
+# run (from the source files read in this run), and how existing rows are
+# replaced:
+#   delete_where - rows removed before the new ones are inserted
+#   unique_key   - only rows whose key is not in the table yet are inserted
+#   prepare      - statement run first (temp tables the SELECT reads)
+# {orders}, {customers} and {order_items} are the source CSV readers.
+# Listed in dependency order.
+MODELS: Dict[str, Dict[str, Any]] = {
+    'bronze_orders': {
+        'deps': [],
+        'sql': f"SELECT * FROM {{orders}} WHERE is_new_day({ORDER_DAY})",
+        'delete_where': f"is_new_day({ORDER_DAY})",
+    },
+    'bronze_customers': {
+        'deps': [],
+        'sql': "SELECT * FROM {customers}",
+        'unique_key': 'customer_id',
+    },
+    'bronze_order_items': {
+        'deps': ['bronze_orders'],
+        'sql': f"SELECT * FROM {{order_items}} WHERE order_id IN ({NEW_ORDER_IDS})",
+        'delete_where': f"order_id IN ({NEW_ORDER_IDS})",
+    },
+    'silver_orders': {
+        'deps': ['bronze_orders'],
+        'sql': f"""
+            SELECT
+                order_id,
+                customer_id,
+                order_status,
+                TRY_CAST(order_purchase_timestamp AS TIMESTAMP) as order_date,
+                TRY_CAST(order_delivered_customer_date AS TIMESTAMP) as delivery_date
+            FROM bronze_orders
+            WHERE order_id IS NOT NULL  -- Remove any rows without ID
+                AND is_new_day({ORDER_DAY})
+        """,
+        'delete_where': "is_new_day(CAST(order_date AS DATE))",
+    },
+    'silver_customers': {
+        'deps': ['bronze_customers'],
+        'sql': """
+            SELECT
+                customer_id,
+                customer_zip_code_prefix as zip_code,
+                customer_city as city,
+                customer_state as state
+            FROM bronze_customers
+            WHERE customer_id IS NOT NULL
+        """,
+        'unique_key': 'customer_id',
+    },
+    'silver_order_items': {
+        'deps': ['bronze_orders', 'bronze_order_items'],
+        'sql': f"""
+            SELECT
+                order_id,
+                product_id,
+                seller_id,
+                CAST(price AS DOUBLE) as price,
+                CAST(freight_value AS DOUBLE) as freight,
+                CAST(price AS DOUBLE) + CAST(freight_value AS DOUBLE) as total_value
+            FROM bronze_order_items
+            WHERE order_id IS NOT NULL
+                AND product_id IS NOT NULL
+                AND order_id IN ({NEW_ORDER_IDS})
+        """,
+        'delete_where': f"order_id IN ({NEW_ORDER_IDS})",
+    },
+    'gold_daily_sales': {
+        'deps': ['silver_orders', 'silver_order_items'],
+        'sql': """
+            SELECT
+                CAST(o.order_date AS DATE) as date,
+                COUNT(DISTINCT o.order_id) as num_orders,
+                COUNT(DISTINCT o.customer_id) as num_customers,
+                SUM(i.total_value) as total_revenue,
+                AVG(i.total_value) as avg_order_value
+            FROM silver_orders o
+            INNER JOIN silver_order_items i ON o.order_id = i.order_id
+            WHERE o.order_date IS NOT NULL
+                AND is_new_day(CAST(o.order_date AS DATE))
+            GROUP BY CAST(o.order_date AS DATE)
+        """,
+        'delete_where': "is_new_day(date)",
+    },
+    'gold_customer_summary': {
+        'deps': ['silver_customers', 'silver_orders', 'silver_order_items'],
+        'sql': """
+            SELECT
+                c.customer_id,
+                c.state,
+                COUNT(DISTINCT o.order_id) as num_orders,
+                SUM(i.total_value) as lifetime_value,
+                MIN(o.order_date) as first_order_date,
+                MAX(o.order_date) as last_order_date
+            FROM silver_customers c
+            INNER JOIN silver_orders o ON c.customer_id = o.customer_id
+            INNER JOIN silver_order_items i ON o.order_id = i.order_id
+            WHERE c.customer_id IN (SELECT customer_id FROM _affected_customers)
+            GROUP BY c.customer_id, c.state
+        """,
+        # Customers with orders on this run's days (their totals change)
+        'prepare': """
+            CREATE OR REPLACE TEMP TABLE _affected_customers AS
+            SELECT DISTINCT customer_id FROM silver_orders
+            WHERE is_new_day(CAST(order_date AS DATE))
+        """,
+        'delete_where': "customer_id IN (SELECT customer_id FROM _affected_customers)",
+    },
+}
+
+
+def source_reader(path) -> str:
+    """
+    read_csv() of a file, glob or list of files, every column as text
+    (bronze keeps data as received).
+    """
+    if isinstance(path, (list, tuple)):
+        files = f"[{', '.join(sql_string(item) for item in path)}]"
+    else:
+        files = sql_string(path)
+    return f"read_csv({files}, header = true, all_varchar = true, union_by_name = true)"
+
+
+def model_order(models: Dict[str, Dict[str, Any]] = MODELS) -> List[str]:
+    """Model names with every model after the models it depends on."""
+    ordered, visiting = [], set()
+
+    def visit(name):
+        if name in ordered:
+            return
+        if name in visiting:
+            raise ValueError(f"dependency cycle through model {name}")
+        visiting.add(name)
+        for dep in models[name]['deps']:
+            if dep not in models:
+                raise ValueError(f"model {name} depends on unknown model {dep}")
+            visit(dep)
+        visiting.discard(name)
+        ordered.append(name)
+
+    for name in models:
+        visit(name)
+    return ordered
+
+
+class OlistPipeline:
+    """The bronze/silver/gold models in one DuckDB database, refreshed incrementally."""
+
+    def __init__(self, db_path=DEFAULT_DB, sources: Optional[Dict[str, Any]] = None,
+                 models: Dict[str, Dict[str, Any]] = MODELS):
+        import duckdb
+
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.sources = {**DEFAULT_SOURCES, **(sources or {})}
+        self.models = models
+        self.order = model_order(models)
+        self.con = duckdb.connect(str(self.db_path))
+        self.con.execute("""
+            CREATE TABLE IF NOT EXISTS _pipeline_partitions (
+                day       DATE,
+                orders    BIGINT,
+                loaded_at TIMESTAMP
+            )
+        """)
+        self.con.execute("""
+            CREATE TABLE IF NOT EXISTS _pipeline_files (
+                source    VARCHAR,
+                path      VARCHAR,
+                size      BIGINT,
+                mtime_ns  BIGINT,
+                loaded_at TIMESTAMP
+            )
+        """)
+
+    def close(self):
+        self.con.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _table_exists(self, name: str) -> bool:
+        return self.con.execute(
+            "SELECT count(*) FROM information_schema.tables WHERE table_name = ? "
+            "AND table_schema = 'main'", [name]).fetchone()[0] > 0
+
+    def _source_files(self, reread: bool) -> Dict[str, Dict[str, List]]:
+        """
+        {source: {'all': [files], 'read': [(file, size, mtime_ns) to read]}};
+        only new or changed files are read unless `reread`.
+        """
+        loaded = {(source, path): (size, mtime_ns) for source, path, size, mtime_ns in
+                  self.con.execute("SELECT source, path, size, mtime_ns FROM _pipeline_files")
+                  .fetchall()}
+        files = {}
+        for source, pattern in self.sources.items():
+            paths = [row[0] for row in
+                     self.con.execute("SELECT file FROM glob(?) ORDER BY file", [str(pattern)])
+                     .fetchall()]
+            if not paths:
+                raise FileNotFoundError(f"no {source} files match {pattern}")
+            read = []
+            for path in paths:
+                stat = os.stat(path)
+                if reread or loaded.get((source, path)) != (stat.st_size, stat.st_mtime_ns):
+                    read.append((path, stat.st_size, stat.st_mtime_ns))
+            files[source] = {'all': paths, 'read': read}
+        return files
+
+    def _record_files(self, files: Dict[str, Dict[str, List]], sources: List[str]):
+        """Remember the size and mtime of the files of `sources` read in this run."""
+        for source in sources:
+            for path, size, mtime_ns in files[source]['read']:
+                self.con.execute("DELETE FROM _pipeline_files WHERE source = ? AND path = ?",
+                                 [source, path])
+                self.con.execute(
+                    "INSERT INTO _pipeline_files VALUES (?, ?, ?, ?, current_localtimestamp())",
+                    [source, path, size, mtime_ns])
+
+    @staticmethod
+    def _readers(files: Dict[str, Dict[str, List]]) -> Dict[str, str]:
+        """Source readers over this run's files (no rows, same columns, if none changed)."""
+        readers = {}
+        for source, found in files.items():
+            if found['read']:
+                readers[source] = source_reader([path for path, _, _ in found['read']])
+            else:
+                readers[source] = f"(SELECT * FROM {source_reader(found['all'][0])} LIMIT 0)"
+        return readers
+
+    def _plan_partitions(self, orders: str, reprocess_from: Optional[datetime.date]):
+        """Fill _new_partitions with the order days to (re)process; returns them."""
+        self.con.execute(f"""
+            CREATE OR REPLACE TEMP TABLE _source_partitions AS
+            SELECT {ORDER_DAY} AS day, count(*) AS orders FROM {orders} GROUP BY ALL
+        """)
+        self.con.execute("""
+            CREATE OR REPLACE TEMP TABLE _new_partitions AS
+            SELECT day, orders FROM _source_partitions
+            WHERE day NOT IN (SELECT day FROM _pipeline_partitions WHERE day IS NOT NULL)
+                OR (day IS NULL AND NOT EXISTS (SELECT 1 FROM _pipeline_partitions WHERE day IS NULL))
+                OR day >= ?
+        """, [reprocess_from])
+        # NULL = orders without a parseable purchase time (loaded once, like a day)
+        self.con.execute("""
+            CREATE OR REPLACE TEMP MACRO is_new_day(d) AS
+                d IN (SELECT day FROM _new_partitions WHERE day IS NOT NULL)
+                OR (d IS NULL AND EXISTS (SELECT 1 FROM _new_partitions WHERE day IS NULL))
+        """)
+        return [row[0] for row in self.con.execute(
+            "SELECT day FROM _new_partitions ORDER BY day NULLS FIRST").fetchall()]
+
+    def _refresh_model(self, name: str, readers: Dict[str, str]) -> int:
+        """Replace this run's rows of one model; returns the number of rows written."""
+        model = self.models[name]
+        if model.get('prepare'):
+            self.con.execute(model['prepare'])
+        query = model['sql'].format(**readers)
+        if not self._table_exists(name):
+            self.con.execute(f"CREATE TABLE {name} AS {query}")
+            return self.con.execute(f"SELECT count(*) FROM {name}").fetchone()[0]
+
+        if model.get('delete_where'):
+            self.con.execute(f"DELETE FROM {name} WHERE {model['delete_where']}")
+        if model.get('unique_key'):
+            key = model['unique_key']
+            query = (f"SELECT * FROM ({query}) AS new_rows WHERE NOT EXISTS "
+                     f"(SELECT 1 FROM {name} AS old WHERE old.{key} = new_rows.{key})")
+        return self.con.execute(f"INSERT INTO {name} BY NAME {query}").fetchone()[0]
+
+    def run(self, full_refresh: bool = False,
+            reprocess_from: Optional[datetime.date] = None) -> Dict[str, Any]:
+        """
+        Load new order days through every model, in one transaction.
+
+        Returns {'partitions': [days processed], 'models': {name: (rows
+        written, seconds)}, 'seconds': total}.
+        """
+        started = time.perf_counter()
+        self.con.execute("BEGIN TRANSACTION")
+        try:
+            if full_refresh:
+                for name in reversed(self.order):
+                    self.con.execute(f"DROP TABLE IF EXISTS {name}")
+                self.con.execute("DELETE FROM _pipeline_partitions")
+                self.con.execute("DELETE FROM _pipeline_files")
+
+            files = self._source_files(reread=reprocess_from is not None)
+            readers = self._readers(files)
+            partitions = self._plan_partitions(readers['orders'], reprocess_from)
+            timings = {}
+            if partitions:
+                for name in self.order:
+                    model_started = time.perf_counter()
+                    rows = self._refresh_model(name, readers)
+                    timings[name] = (rows, time.perf_counter() - model_started)
+
+                self.con.execute("""
+                    DELETE FROM _pipeline_partitions
+                    WHERE day IN (SELECT day FROM _new_partitions)
+                        OR (day IS NULL AND EXISTS (SELECT 1 FROM _new_partitions WHERE day IS NULL))
+                """)
+                self.con.execute("""
+                    INSERT INTO _pipeline_partitions
+                    SELECT day, orders, current_localtimestamp() FROM _new_partitions
+                """)
+            # Files of the other sources were not read if no day was new
+            self._record_files(files, list(files) if partitions else ['orders'])
+            self.con.execute("COMMIT")
+        except BaseException:
+            self.con.execute("ROLLBACK")
+            raise
+        return {'partitions': partitions, 'models': timings,
+                'seconds': time.perf_counter() - started}
+
+    def status(self) -> Dict[str, Any]:
+        """Row counts per model and the range of loaded order days."""
+        counts = {name: (self.con.execute(f"SELECT count(*) FROM {name}").fetchone()[0]
+                         if self._table_exists(name) else None)
+                  for name in self.order}
+        days, first, last = self.con.execute(
+            "SELECT count(*), min(day), max(day) FROM _pipeline_partitions").fetchone()
+        return {'models': counts, 'partitions': days, 'first_day': first, 'last_day': last}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Refresh the Olist bronze/silver/gold models incrementally',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument('--db', default=str(DEFAULT_DB),
+                        help=f'DuckDB database file (default: {DEFAULT_DB.relative_to(REPO_ROOT)})')
+    for source, path in DEFAULT_SOURCES.items():
+        parser.add_argument(f"--{source.replace('_', '-')}", default=str(path),
+                            help=f'{source} CSV file or glob (default: {path.relative_to(REPO_ROOT)})')
+    parser.add_argument('--reprocess-from', type=datetime.date.fromisoformat, metavar='YYYY-MM-DD',
+                        help='Also reload order days already loaded, from this date on')
+    parser.add_argument('--full-refresh', action='store_true',
+                        help='Drop all models and rebuild them from the sources')
+    parser.add_argument('--status', action='store_true',
+                        help='Show row counts and loaded days without running')
+    args = parser.parse_args()
+
+    try:
+        import duckdb  # noqa: F401
+    except ImportError:
+        print("❌ Error: the pipeline needs duckdb: pip install duckdb")
+        sys.exit(1)
+
+    sources = {source: getattr(args, source) for source in DEFAULT_SOURCES}
+    with OlistPipeline(args.db, sources) as pipeline:
+        if not args.status:
+            print(f"🔄 Refreshing {args.db}"
+                  f"{' (full refresh)' if args.full_refresh else ''}...")
+            result = pipeline.run(full_refresh=args.full_refresh,
+                                  reprocess_from=args.reprocess_from)
+            partitions = result['partitions']
+            if not partitions:
+                print("✅ Up to date - no new order days in the feed")
+            else:
+                dated = [day for day in partitions if day is not None]
+                span = f"{dated[0]} .. {dated[-1]}" if dated else "orders without a date"
+                print(f"   {len(partitions)} order day(s) processed ({span})")
+                for name, (rows, seconds) in result['models'].items():
+                    print(f"   ✓ {name:24s} {rows:>8,} rows  {seconds * 1000:7.0f} ms")
+                print(f"✅ Done in {result['seconds']:.2f}s")
+
+        status = pipeline.status()
+        print(f"\n📊 {status['partitions']} order days loaded"
+              + (f" ({status['first_day']} .. {status['last_day']})" if status['partitions'] else ''))
+        for name, rows in status['models'].items():
+            print(f"   {name:24s} {'-' if rows is None else f'{rows:,}':>8} rows")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,792 @@
+#!/usr/bin/env python3
+"""
+Password Manifest - Indexed store of archive passwords
+
+One SQLite table (solutions/.password_manifest.sqlite) holds every
+encrypted archive: its password, description, day/block, the SHA-256 and
+size of the ZIP, and when it was first documented and last re-encrypted.
+The archive name is the primary key, so recording or looking up an archive
+is a single indexed statement instead of a scan of PASSWORDS.md.
+
+A second table keeps the SHA-256 of every file inside each archive.
+plan() compares them with the files on disk, so the encryption scripts
+skip archives whose sources did not change and re-encrypt only the changed
+members of the others.
+
+PASSWORDS.md and .password_backup.json are generated from the manifest
+inside the same write transaction (temp file + rename), so two encryptions
+running at once are serialized by SQLite and can never interleave their
+edits or leave a half-written file behind. They are regenerated once per
+transaction that changed an archive entry - a whole batch of encryptions
+rewrites them once, and log entries, lookups and skipped (unchanged)
+archives never touch them. Re-encrypting an archive replaces its entry
+rather than adding a duplicate.
+
+The size and mtime of each ZIP are recorded next to its SHA-256, so
+checking whether an archive was modified since it was documented only
+hashes it when its mtime changed (see archive_changed()).
+
+The encryption log is a third, append-only table indexed by time, archive
+and day/block, so list_solutions.py can filter and page through it without
+reading the whole history.
+
+The first time the manifest is opened it imports the existing JSON backup,
+any PASSWORDS.md entries that are missing from it, and the old text log
+(.encryption_log.txt). A hand-written PASSWORDS.md is kept as
+PASSWORDS.pre-manifest.md before the generated one replaces it, so notes
+that are not entries are not lost.
+
+Audits open the manifest with read_only=True: nothing is migrated,
+imported or exported on disk. An outdated manifest is migrated, and a
+missing one imported from the legacy files, in an in-memory copy instead.
+
+Usage:
+    manifest = PasswordManifest()
+    manifest.record('solutions/solutions-day1-blockA.zip', 'TidyData2024!',
+                    'Day 1 in-class exercise', day=1, block='A',
+                    source_file='notebooks/day1_exercise_tidy_solution.ipynb')
+    entry = manifest.lookup('solutions-day1-blockA.zip')
+
+    plan = manifest.plan(output, members, password, method)
+    if plan['status'] != 'unchanged':
+        write_encrypted_zip(output, members, password, method,
+                            reuse_from=output, reuse=plan['reuse'])
+        manifest.record(output, ..., method=method, inputs=plan['inputs'])
+
+    with manifest.transaction():     # batch: files are regenerated once
+        for ...:
+            manifest.record(...)
+
+    manifest.log(output, 'encrypted', source=..., password=..., method=method)
+    entries, total = manifest.history(day=1, since='2025-01-01', limit=20)
+
+    with PasswordManifest(read_only=True) as manifest:   # audits: never writes
+        entry = manifest.lookup('solutions-hw1.zip')
+
+    python scripts/password_manifest.py            # list documented archives
+    python scripts/password_manifest.py --export   # regenerate PASSWORDS.md + JSON
+"""
+
+import argparse
+import datetime
+import json
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from notebook_cache import file_sha256
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+SOLUTIONS_DIR = REPO_ROOT / 'solutions'
+MANIFEST_PATH = SOLUTIONS_DIR / '.password_manifest.sqlite'
+PASSWORDS_MD = SOLUTIONS_DIR / 'PASSWORDS.md'
+# Copy of a hand-written PASSWORDS.md, kept when the manifest first replaces it
+LEGACY_SUFFIX = '.pre-manifest'
+BACKUP_JSON = SOLUTIONS_DIR / '.password_backup.json'
+
+# Seconds a writer waits for another encryption to finish its transaction
+LOCK_TIMEOUT = 60
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS archives (
+    archive     TEXT PRIMARY KEY,
+    password    TEXT NOT NULL,
+    description TEXT NOT NULL DEFAULT '',
+    day         TEXT,
+    block       TEXT,
+    type        TEXT,
+    source_file TEXT,
+    sha256      TEXT,
+    size        INTEGER,
+    mtime_ns    INTEGER,
+    created     TEXT NOT NULL,
+    updated     TEXT NOT NULL,
+    method      TEXT
+);
+
+-- Content hashes of the files inside each archive (see plan())
+CREATE TABLE IF NOT EXISTS members (
+    archive  TEXT NOT NULL,
+    arcname  TEXT NOT NULL,
+    sha256   TEXT NOT NULL,
+    size     INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    path     TEXT,
+    PRIMARY KEY (archive, arcname)
+);
+
+-- Append-only history of every encryption (see log() / history())
+CREATE TABLE IF NOT EXISTS encryption_log (
+    id        INTEGER PRIMARY KEY AUTOINCREMENT,
+    logged_at TEXT NOT NULL,
+    archive   TEXT NOT NULL,
+    source    TEXT,
+    day       TEXT,
+    block     TEXT,
+    type      TEXT,
+    method    TEXT,
+    action    TEXT NOT NULL,
+    detail    TEXT,
+    password  TEXT
+);
+"""
+
+# Created after column migrations, which older manifests may need first
+INDEXES = """
+CREATE INDEX IF NOT EXISTS members_path ON members (path);
+CREATE INDEX IF NOT EXISTS encryption_log_time ON encryption_log (logged_at);
+CREATE INDEX IF NOT EXISTS encryption_log_archive ON encryption_log (archive, logged_at);
+CREATE INDEX IF NOT EXISTS encryption_log_day_block ON encryption_log (day, block, logged_at);
+"""
+
+# Columns added after a manifest format was first released: (table, column, type)
+MIGRATIONS = [
+    ('archives', 'method', 'TEXT'),
+    ('members', 'path', 'TEXT'),
+    ('archives', 'mtime_ns', 'INTEGER'),
+]
+
+# Free-form text log written before the log moved into the manifest
+LEGACY_LOG = SOLUTIONS_DIR / '.encryption_log.txt'
+LEGACY_LOG_LINE = re.compile(
+    r'^(?P<logged_at>\d{4}-\d\d-\d\d \d\d:\d\d:\d\d) \| (?P<source>.*?) -> (?P<archive>\S+) '
+    r'\| PASSWORD: (?P<password>.*?)(?: \(Day (?P<day>\S+) Block (?P<block>\S+)\))?'
+    r'(?: \| TYPE: (?P<type>\S+))?$')
+
+SECTIONS = [
+    ('homework', '## Homework Solutions'),
+    ('exercise', '## In-Class Exercise Solutions'),
+    ('interview', '## Interview Materials'),
+]
+
+PASSWORDS_HEADER = """# Solution Passwords
+
+**⚠️ DO NOT COMMIT THIS FILE TO GIT**
+
+This file is GENERATED from solutions/.password_manifest.sqlite by the
+encryption scripts - edits here are overwritten. Passwords are documented
+immediately when solutions are encrypted.
+
+---
+"""
+
+PASSWORDS_FOOTER = """
+---
+
+## Password Release Schedule
+
+- Release passwords on Moodle only after assignment deadlines
+- Never share passwords via email or Slack
+- Always test decryption before distributing
+
+---
+
+## Backup
+
+This file is backed up to: solutions/.password_backup.json
+**ALSO: Email all interview/critical passwords to yourself!**
+"""
+
+
+def archive_changed(entry: Dict[str, Any], path) -> bool:
+    """
+    Whether the archive at `path` differs from the documented `entry`. A
+    different size decides without reading the file, and an unchanged size
+    and mtime mean the archive was not touched; only otherwise is it hashed.
+    """
+    stat = os.stat(path)
+    if entry.get('size') is not None and entry['size'] != stat.st_size:
+        return True
+    if entry.get('size') == stat.st_size and entry.get('mtime_ns') == stat.st_mtime_ns:
+        return False
+    return entry.get('sha256') != file_sha256(path)
+
+
+def hash_inputs(members: Sequence[Tuple[str, str]],
+                known: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    {name in archive: {sha256, size, mtime_ns, path}} for (file path, name) members.
+    Files whose size and mtime match `known` keep their recorded hash
+    without being read again.
+    """
+    known = known or {}
+    hashes = {}
+    for path, arcname in members:
+        stat = os.stat(path)
+        previous = known.get(arcname)
+        if previous and previous['size'] == stat.st_size and previous['mtime_ns'] == stat.st_mtime_ns:
+            sha256 = previous['sha256']
+        else:
+            sha256 = file_sha256(path)
+        hashes[arcname] = {'sha256': sha256, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns,
+                           'path': path}
+    return hashes
+
+
+def repo_path(path) -> str:
+    """Path relative to the repository root (absolute if outside it), with / separators."""
+    path = Path(path).resolve()
+    try:
+        return path.relative_to(REPO_ROOT).as_posix()
+    except ValueError:
+        return path.as_posix()
+
+
+def same_details(entry: Optional[Dict[str, Any]], description: str, day=None, block=None,
+                 type: Optional[str] = None, source_file: Optional[str] = None) -> bool:
+    """Whether a manifest entry already has these details (so it needs no update)."""
+    return entry is not None and (entry['description'], entry['day'], entry['block'],
+                                  entry['type'], entry['source_file']) == (
+        description or '', None if day is None else str(day), block, type,
+        None if source_file is None else str(source_file))
+
+
+def _now() -> str:
+    return datetime.datetime.now().isoformat(timespec='seconds')
+
+
+def _write_text_atomic(path: Path, text: str):
+    """Write via temp file + rename (permissions like a normal new file)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=f'.{path.stem}.', suffix='.tmp', dir=path.parent)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(tmp_path, 0o666 & ~umask)  # mkstemp creates files as 0600
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def section_of(entry: Dict[str, Any]) -> str:
+    """PASSWORDS.md section an archive belongs in."""
+    if entry.get('type') == 'interview_materials':
+        return 'interview'
+    if 'hw' in entry['archive'].lower():
+        return 'homework'
+    return 'exercise'
+
+
+def render_entry(entry: Dict[str, Any]) -> str:
+    """One PASSWORDS.md entry, in the layout the encryption scripts always used."""
+    zip_name = entry['archive']
+    description = entry['description']
+    if section_of(entry) == 'homework':
+        heading = f"HW{''.join(filter(str.isdigit, zip_name))}: {description}"
+    elif section_of(entry) == 'exercise' and entry.get('day') and entry.get('block'):
+        heading = f"Day {entry['day']} Block {entry['block']}: {description}"
+    else:
+        heading = zip_name
+    lines = [
+        f"### {heading}",
+        f"- File: `{zip_name}`",
+        f"- Password: `{entry['password']}`",
+        f"- Created: {entry['created'][:10]}",
+    ]
+    if entry['updated'][:10] != entry['created'][:10]:
+        lines.append(f"- Updated: {entry['updated'][:10]}")
+    lines.append(f"- Description: {description}")
+    if section_of(entry) == 'interview':
+        lines.append("- **⚠️ EMAIL THIS PASSWORD TO YOURSELF NOW!**")
+    return '\n'.join(lines) + '\n'
+
+
+def render_passwords_md(entries: List[Dict[str, Any]]) -> str:
+    """Whole PASSWORDS.md, newest entries first in each section."""
+    parts = [PASSWORDS_HEADER]
+    for key, title in SECTIONS:
+        parts.append(f"\n{title}\n")
+        for entry in entries:
+            if section_of(entry) == key:
+                parts.append('\n' + render_entry(entry))
+    parts.append(PASSWORDS_FOOTER)
+    return ''.join(parts)
+
+
+def render_backup(entries: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """The .password_backup.json mapping (archive name -> details)."""
+    return {
+        entry['archive']: {
+            'password': entry['password'],
+            'description': entry['description'],
+            'created': entry['created'],
+            'updated': entry['updated'],
+            'day': entry['day'],
+            'block': entry['block'],
+            'type': entry['type'],
+            'source_file': entry['source_file'],
+            'method': entry['method'],
+            'sha256': entry['sha256'],
+            'size': entry['size'],
+        }
+        for entry in sorted(entries, key=lambda e: e['archive'])
+    }
+
+
+def parse_passwords_md(text: str) -> Dict[str, Dict[str, str]]:
+    """Entries of a hand-edited / legacy PASSWORDS.md (first one per file wins)."""
+    found = {}
+    section = None
+    current = None
+    for line in text.splitlines():
+        if line.startswith('## '):
+            section = line[3:].strip().lower()
+            current = None
+        elif line.startswith('### '):
+            current = {'section': section}
+        elif current is not None:
+            match = re.match(r'- (File|Password|Created|Description): (.*)$', line.strip())
+            if not match:
+                continue
+            key, value = match.group(1).lower(), match.group(2).strip()
+            if key in ('file', 'password'):
+                value = value.strip('`')
+            current[key] = value
+            if key == 'file':
+                found.setdefault(value, current)
+    return {name: entry for name, entry in found.items() if entry.get('password')}
+
+
+class PasswordManifest:
+    """SQLite-backed archive -> password manifest; safe to share between processes."""
+
+    def __init__(self, path=MANIFEST_PATH, passwords_md=PASSWORDS_MD, backup_json=BACKUP_JSON,
+                 read_only: bool = False):
+        self.path = Path(path)
+        self.passwords_md = Path(passwords_md)
+        self.backup_json = Path(backup_json)
+        self.read_only = read_only
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._dirty = False
+        if read_only:
+            self._conn = self._open_read_only()
+            if self._conn is not None:
+                return
+            # Outdated or missing manifest: migrate / import in memory only
+            self._conn = sqlite3.connect(':memory:', isolation_level=None,
+                                         check_same_thread=False)
+            if self.path.exists():
+                source = sqlite3.connect(f'{self.path.resolve().as_uri()}?mode=ro', uri=True)
+                try:
+                    source.backup(self._conn)
+                finally:
+                    source.close()
+        else:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, timeout=LOCK_TIMEOUT,
+                                         isolation_level=None, check_same_thread=False)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.row_factory = sqlite3.Row
+        self._conn.executescript(SCHEMA)
+        for table, column, column_type in MIGRATIONS:
+            if column not in self._columns(table):
+                self._conn.execute(f'ALTER TABLE {table} ADD COLUMN {column} {column_type}')
+                if (table, column) == ('members', 'path'):
+                    self._backfill_member_paths()
+        self._conn.executescript(INDEXES)
+        self._import_legacy()
+        self._import_legacy_log()
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @contextmanager
+    def transaction(self):
+        """
+        Write transaction; if an archive entry changed, PASSWORDS.md and the
+        JSON backup are regenerated once, before commit, while the database
+        write lock is still held. Nested calls join the outer transaction.
+        """
+        with self._lock:
+            if self._depth:
+                self._depth += 1
+                try:
+                    yield self
+                finally:
+                    self._depth -= 1
+                return
+            self._conn.execute('BEGIN IMMEDIATE')
+            self._depth = 1
+            self._dirty = False
+            try:
+                yield self
+                if self._dirty and not self.read_only:
+                    self.export()
+                self._conn.execute('COMMIT')
+            except BaseException:
+                self._conn.execute('ROLLBACK')
+                raise
+            finally:
+                self._depth = 0
+                self._dirty = False
+
+    def record(self, archive_path, password: str, description: str, day=None, block=None,
+               type: Optional[str] = None, source_file: Optional[str] = None,
+               method: Optional[str] = None,
+               inputs: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """
+        Document an archive (insert, or replace the entry of a re-encrypted
+        one, keeping its original creation time). `inputs` (from
+        hash_inputs()) replaces the recorded member hashes when given.
+        Returns the stored entry.
+        """
+        self._check_writable()
+        archive_path = Path(archive_path)
+        sha256 = size = mtime_ns = None
+        if archive_path.exists():
+            # Hash outside the transaction so other writers are not kept waiting
+            stat = archive_path.stat()
+            sha256, size, mtime_ns = file_sha256(archive_path), stat.st_size, stat.st_mtime_ns
+        now = _now()
+        with self.transaction():
+            self._dirty = True
+            self._conn.execute(
+                """
+                INSERT INTO archives (archive, password, description, day, block, type,
+                                      source_file, sha256, size, mtime_ns, created, updated,
+                                      method)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(archive) DO UPDATE SET
+                    password = excluded.password, description = excluded.description,
+                    day = excluded.day, block = excluded.block, type = excluded.type,
+                    source_file = excluded.source_file, sha256 = excluded.sha256,
+                    size = excluded.size, mtime_ns = excluded.mtime_ns,
+                    updated = excluded.updated,
+                    method = COALESCE(excluded.method, archives.method)
+                """,
+                (archive_path.name, password, description or '',
+                 None if day is None else str(day), block, type,
+                 None if source_file is None else str(source_file), sha256, size, mtime_ns,
+                 now, now, method))
+            if inputs is not None:
+                self._conn.execute('DELETE FROM members WHERE archive = ?', (archive_path.name,))
+                self._conn.executemany(
+                    'INSERT INTO members (archive, arcname, sha256, size, mtime_ns, path) '
+                    'VALUES (?, ?, ?, ?, ?, ?)',
+                    [(archive_path.name, arcname, item['sha256'], item['size'], item['mtime_ns'],
+                      repo_path(item['path'])) for arcname, item in inputs.items()])
+            return self.lookup(archive_path.name)
+
+    def inputs(self, archive: str) -> Dict[str, Dict[str, Any]]:
+        """Recorded {name in archive: {sha256, size, mtime_ns}} of an archive's files."""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT arcname, sha256, size, mtime_ns FROM members WHERE archive = ?',
+                (os.path.basename(archive),)).fetchall()
+        return {row['arcname']: {key: row[key] for key in ('sha256', 'size', 'mtime_ns')}
+                for row in rows}
+
+    def sources(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Every file that went into an archive, keyed by repo-relative path:
+        {path: {archive, arcname, sha256, size, mtime_ns}}.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT path, archive, arcname, sha256, size, mtime_ns FROM members '
+                'WHERE path IS NOT NULL').fetchall()
+        return {row['path']: {key: row[key] for key in row.keys() if key != 'path'}
+                for row in rows}
+
+    def log(self, archive_path, action: str, source=None, password: Optional[str] = None,
+            day=None, block=None, type: Optional[str] = None, method: Optional[str] = None,
+            detail: Optional[str] = None):
+        """Append one event ('encrypted', 'updated', ...) to the encryption log."""
+        self._check_writable()
+        with self.transaction():
+            self._conn.execute(
+                """
+                INSERT INTO encryption_log (logged_at, archive, source, day, block, type, method,
+                                            action, detail, password)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (_now(), os.path.basename(archive_path),
+                 None if source is None else repo_path(source),
+                 None if day is None else str(day), block, type, method, action, detail,
+                 password))
+
+    def history(self, archive: Optional[str] = None, day=None, block: Optional[str] = None,
+                since: Optional[str] = None, until: Optional[str] = None,
+                limit: Optional[int] = 10, offset: int = 0) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Encryption log entries matching the filters, newest first, and how many
+        match in total. since / until are ISO dates or timestamps (until
+        includes the whole day when given as a date).
+        """
+        where, params = [], []
+        if archive:
+            where.append('archive = ?')
+            params.append(os.path.basename(archive))
+        if day is not None:
+            where.append('day = ?')
+            params.append(str(day))
+        if block:
+            where.append('block = ?')
+            params.append(block)
+        if since:
+            where.append('logged_at >= ?')
+            params.append(since)
+        if until:
+            try:
+                # A date: everything logged before the start of the next day
+                next_day = datetime.date.fromisoformat(until) + datetime.timedelta(days=1)
+                where.append('logged_at < ?')
+                params.append(next_day.isoformat())
+            except ValueError:
+                where.append('logged_at <= ?')
+                params.append(until)
+        clause = f"WHERE {' AND '.join(where)}" if where else ''
+        with self._lock:
+            total = self._conn.execute(f'SELECT count(*) FROM encryption_log {clause}',
+                                       params).fetchone()[0]
+            rows = self._conn.execute(
+                f'SELECT * FROM encryption_log {clause} ORDER BY logged_at DESC, id DESC '
+                f'LIMIT ? OFFSET ?', params + [-1 if limit is None else limit, offset]).fetchall()
+        return [dict(row) for row in rows], total
+
+    def plan(self, archive_path, members: Sequence[Tuple[str, str]], password: str,
+             method: str) -> Dict[str, Any]:
+        """
+        Decide how much of an archive needs rebuilding.
+
+        Compares the content hashes of (file path, name in archive) members
+        with those recorded for the archive. Returns a dict with
+            status:  'unchanged' (nothing to do), 'update' (rewrite, copying
+                     the members in `reuse` from the existing archive) or
+                     'build' (encrypt everything)
+            reason:  why, for printing
+            changed / removed: names of new or modified / dropped members
+            reuse:   names whose encrypted bytes can be copied
+            inputs:  fresh hashes to pass to record()
+        """
+        archive_path = Path(archive_path)
+        entry = self.lookup(archive_path.name)
+        recorded = self.inputs(archive_path.name)
+        inputs = hash_inputs(members, recorded)
+        plan = {'inputs': inputs, 'changed': sorted(inputs), 'removed': [], 'reuse': set()}
+
+        if entry is None:
+            return dict(plan, status='build', reason='not documented yet')
+        if not archive_path.exists():
+            return dict(plan, status='build', reason='archive is missing')
+        if not recorded:
+            return dict(plan, status='build', reason='no input hashes recorded yet')
+        if entry['password'] != password:
+            return dict(plan, status='build', reason='password changed')
+        if entry['method'] != method:
+            return dict(plan, status='build', reason=f"encryption changed to {method}")
+        if archive_changed(entry, archive_path):
+            return dict(plan, status='build', reason='archive was modified outside this script')
+
+        changed = sorted(name for name, item in inputs.items()
+                         if recorded.get(name, {}).get('sha256') != item['sha256'])
+        removed = sorted(set(recorded) - set(inputs))
+        plan.update(changed=changed, removed=removed, reuse=set(inputs) - set(changed))
+        if not changed and not removed:
+            return dict(plan, status='unchanged', reason='no source file changed')
+        return dict(plan, status='update',
+                    reason=f"{len(changed)} changed, {len(removed)} removed, "
+                           f"{len(plan['reuse'])} unchanged")
+
+    def lookup(self, archive: str) -> Optional[Dict[str, Any]]:
+        """Entry for an archive name (e.g. 'solutions-hw1.zip'), or None."""
+        with self._lock:
+            row = self._conn.execute('SELECT * FROM archives WHERE archive = ?',
+                                     (os.path.basename(archive),)).fetchone()
+        return dict(row) if row else None
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """All entries, most recently updated first."""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT * FROM archives ORDER BY updated DESC, archive').fetchall()
+        return [dict(row) for row in rows]
+
+    def passwords(self) -> Dict[str, str]:
+        """{archive name: password}"""
+        with self._lock:
+            return dict(self._conn.execute('SELECT archive, password FROM archives'))
+
+    def export(self):
+        """Regenerate PASSWORDS.md and the JSON backup from the manifest."""
+        self._check_writable()
+        entries = self.entries()
+        _write_text_atomic(self.passwords_md, render_passwords_md(entries))
+        _write_text_atomic(self.backup_json, json.dumps(render_backup(entries), indent=2) + '\n')
+
+    def _open_read_only(self) -> Optional[sqlite3.Connection]:
+        """
+        Read-only connection to an up-to-date manifest file, or None if it is
+        missing or still needs migrating.
+        """
+        if not self.path.exists():
+            return None
+        conn = sqlite3.connect(f'{self.path.resolve().as_uri()}?mode=ro', uri=True,
+                               timeout=LOCK_TIMEOUT, isolation_level=None,
+                               check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        self._conn = conn
+        current = all(self._columns(table) for table in ('archives', 'members', 'encryption_log')) \
+            and all(column in self._columns(table) for table, column, _ in MIGRATIONS)
+        if current:
+            return conn
+        conn.close()
+        return None
+
+    def _columns(self, table: str) -> set:
+        return {row[1] for row in self._conn.execute(f'PRAGMA table_info({table})')}
+
+    def _check_writable(self):
+        if self.read_only:
+            raise sqlite3.OperationalError(f"{self.path.name} was opened read-only")
+
+    def _import_legacy(self):
+        """Seed an empty manifest from the JSON backup and PASSWORDS.md."""
+        with self._lock:
+            if self._conn.execute('SELECT 1 FROM archives LIMIT 1').fetchone():
+                return
+        if not self.backup_json.exists() and not self.passwords_md.exists():
+            return
+
+        rows = {}
+        if self.passwords_md.exists():
+            text = self.passwords_md.read_text(encoding='utf-8')
+            for name, entry in parse_passwords_md(text).items():
+                created = entry.get('created') or _now()
+                rows[name] = {
+                    'password': entry['password'], 'description': entry.get('description', ''),
+                    'day': None, 'block': None, 'source_file': None, 'created': created,
+                    'sha256': None, 'size': None,
+                    'type': 'interview_materials' if 'interview' in (entry['section'] or '') else None,
+                }
+            if not self.read_only and 'GENERATED from solutions/.password_manifest.sqlite' not in text:
+                # The generated file replaces it below: keep the notes that are not entries
+                legacy = self.passwords_md.with_name(
+                    f'{self.passwords_md.stem}{LEGACY_SUFFIX}{self.passwords_md.suffix}')
+                if not legacy.exists():
+                    _write_text_atomic(legacy, text)
+                    print(f"📝 Kept the hand-written {self.passwords_md.name} as {legacy.name}")
+        if self.backup_json.exists():
+            with open(self.backup_json, 'r', encoding='utf-8') as f:
+                for name, entry in json.load(f).items():
+                    rows[name] = {key: entry.get(key) for key in
+                                  ('password', 'description', 'day', 'block', 'type',
+                                   'source_file', 'created', 'sha256', 'size')}
+
+        with self.transaction():
+            if self._conn.execute('SELECT 1 FROM archives LIMIT 1').fetchone():
+                return  # another process imported first
+            self._dirty = bool(rows)
+            for name, row in rows.items():
+                archive_path = self.path.parent / name
+                sha256, size, mtime_ns = row['sha256'], row['size'], None
+                if not self.read_only and archive_path.exists():
+                    stat = archive_path.stat()
+                    sha256, size, mtime_ns = file_sha256(archive_path), stat.st_size, stat.st_mtime_ns
+                created = row['created'] or _now()
+                self._conn.execute(
+                    """
+                    INSERT INTO archives (archive, password, description, day, block, type,
+                                          source_file, sha256, size, mtime_ns, created, updated)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (name, row['password'], row['description'] or '',
+                     None if row['day'] is None else str(row['day']), row['block'], row['type'],
+                     row['source_file'], sha256, size, mtime_ns, created, created))
+
+    def _backfill_member_paths(self):
+        """
+        Source paths for members recorded before they were stored: the
+        encryption scripts run from the repo root, so a directory archive's
+        member names are repo paths and a single-file archive came from its
+        source_file.
+        """
+        rows = self._conn.execute(
+            'SELECT m.archive, m.arcname, a.source_file, a.type FROM members m '
+            'JOIN archives a USING (archive)').fetchall()
+        self._conn.executemany(
+            'UPDATE members SET path = ? WHERE archive = ? AND arcname = ?',
+            [(repo_path(REPO_ROOT / (row['arcname'] if row['type'] == 'interview_materials'
+                                     else row['source_file'])), row['archive'], row['arcname'])
+             for row in rows if row['type'] == 'interview_materials' or row['source_file']])
+
+    def _import_legacy_log(self):
+        """Seed an empty encryption log from the old .encryption_log.txt."""
+        log_path = self.path.parent / LEGACY_LOG.name
+        if not log_path.exists():
+            return
+        with self._lock:
+            if self._conn.execute('SELECT 1 FROM encryption_log LIMIT 1').fetchone():
+                return
+
+        rows = []
+        with open(log_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                match = LEGACY_LOG_LINE.match(line.rstrip('\n'))
+                if match:
+                    rows.append((match['logged_at'].replace(' ', 'T'), match['archive'],
+                                 match['source'], match['day'], match['block'], match['type'],
+                                 match['password']))
+        with self.transaction():
+            if self._conn.execute('SELECT 1 FROM encryption_log LIMIT 1').fetchone():
+                return  # another process imported first
+            self._conn.executemany(
+                """
+                INSERT INTO encryption_log (logged_at, archive, source, day, block, type,
+                                            action, password)
+                VALUES (?, ?, ?, ?, ?, ?, 'encrypted', ?)
+                """, rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Show the password manifest or regenerate PASSWORDS.md from it',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument('archive', nargs='?', help='Show one archive (e.g. solutions-hw1.zip)')
+    parser.add_argument('--export', action='store_true',
+                        help='Regenerate PASSWORDS.md and .password_backup.json')
+    args = parser.parse_args()
+
+    with PasswordManifest() as manifest:
+        if args.export:
+            with manifest.transaction():
+                manifest.export()
+            print(f"✅ Regenerated {PASSWORDS_MD.relative_to(REPO_ROOT)} and "
+                  f"{BACKUP_JSON.relative_to(REPO_ROOT)}")
+            return
+        if args.archive:
+            entry = manifest.lookup(args.archive)
+            if entry is None:
+                print(f"❌ {args.archive} is not documented")
+                sys.exit(1)
+            for key, value in entry.items():
+                print(f"  {key:12s} {value}")
+            return
+        entries = manifest.entries()
+        print(f"🔐 {len(entries)} archives documented in {MANIFEST_PATH.relative_to(REPO_ROOT)}")
+        for entry in entries:
+            print(f"  {entry['archive']:40s} {entry['updated']}  {entry['description']}")
+
+
+if __name__ == '__main__':
+    main()
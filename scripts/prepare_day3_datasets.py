@@ -6,13 +6,45 @@ Prepare Day 3 datasets:
 3. Download NYC DOB Permit Issuance
 
 This script downloads real government data from official open data portals.
+Downloads are paginated ($offset/$limit) and run a few pages concurrently
+with retries (see socrata_fetch.py).
+
+Responses are cached in .http_cache/ with per-page checkpoints: an
+interrupted download resumes where it stopped, and a source that has not
+changed since its last complete download is skipped.
+
+NYC permits are streamed page by page into a typed, compressed Parquet file
+(see socrata_export.py); NDJSON and the pretty-printed JSON file used by the
+HW3 starter notebook are opt-in with --nyc-format.
+
+Usage:
+    python scripts/prepare_day3_datasets.py
+    python scripts/prepare_day3_datasets.py --steps chicago nyc --full
+    python scripts/prepare_day3_datasets.py --workers 8 --page-size 25000
+    python scripts/prepare_day3_datasets.py --refresh     # ignore checkpoints
+    python scripts/prepare_day3_datasets.py --steps nyc --nyc-format parquet json
+    python scripts/prepare_day3_datasets.py --steps olist --olist-engine duckdb
+
+    # Against a local stub server
+    python scripts/prepare_day3_datasets.py --steps nyc \\
+        --nyc-url http://localhost:8000/resource/ipu4-2q9a.json
 """
 
+import argparse
+import io
+import sys
+import time
+
 import pandas as pd
-import json
-import requests
 from pathlib import Path
 
+from course_data import sql_string
+from http_cache import DEFAULT_MAX_BYTES, HTTPCache
+from socrata_export import JSONRecordWriter, NDJSONRecordWriter, ParquetRecordWriter
+from socrata_fetch import (
+    DEFAULT_PAGE_SIZE, DEFAULT_RETRIES, DEFAULT_WORKERS, SocrataFetcher,
+)
+
 # Base paths
 DATA_DIR = Path("data")
 DAY3_DIR = DATA_DIR / "day3"
@@ -20,139 +52,384 @@ TEACHING_DIR = DAY3_DIR / "teaching"
 EXERCISE_DIR = DAY3_DIR / "exercise"
 HW3_DIR = DAY3_DIR / "hw3_data_pack"
 
-# Ensure directories exist
-for dir_path in [TEACHING_DIR, EXERCISE_DIR, HW3_DIR]:
-    dir_path.mkdir(parents=True, exist_ok=True)
+# Chicago Data Portal API endpoint (using Socrata API)
+# https://data.cityofchicago.org/Community-Economic-Development/Business-Licenses/r5kz-chrr
+CHICAGO_URL = "https://data.cityofchicago.org/resource/r5kz-chrr.csv"
+
+# NYC Open Data API endpoint (using Socrata API)
+# https://data.cityofnewyork.us/Housing-Development/DOB-Permit-Issuance/ipu4-2q9a
+NYC_URL = "https://data.cityofnewyork.us/resource/ipu4-2q9a.json"
+
+# Row caps for the HW3 data pack (--full downloads everything)
+CHICAGO_LIMIT = 50000
+NYC_LIMIT = 20000
+
+STEPS = ['olist', 'chicago', 'nyc']
+
+# Olist source tables (Day 2 Block A) and the subsets made from them:
+# (label, output dir, orders, seed, {table: output file})
+OLIST_DIR = DATA_DIR / "day2" / "block_a"
+OLIST_FILES = {
+    'orders': "olist_orders_dataset.csv",
+    'customers': "olist_customers_dataset.csv",
+    'order_items': "olist_order_items_dataset.csv",
+}
+OLIST_SUBSETS = [
+    ('teaching', TEACHING_DIR, 1000, 42, {
+        'orders': "olist_orders_subset.csv",
+        'customers': "olist_customers_subset.csv",
+        'order_items': "olist_order_items_subset.csv",
+    }),
+    ('exercise', EXERCISE_DIR, 500, 123, {
+        'orders': "mini_orders.csv",
+        'customers': "mini_customers.csv",
+        'order_items': "mini_order_items.csv",
+    }),
+]
+OLIST_ENGINES = ['pandas', 'duckdb']
+
+# NYC output formats: file suffix per format (parquet unless asked otherwise)
+NYC_FORMATS = {'parquet': '.parquet', 'ndjson': '.ndjson', 'json': '.json'}
+NYC_DEFAULT_FORMATS = ['parquet']
 
-print("=" * 70)
-print("Day 3 Dataset Preparation")
-print("=" * 70)
 
 # =============================================================================
 # Part 1: Create Olist Subsets for Teaching (Block A) and Exercise
 # =============================================================================
 
-print("\n[1/3] Creating Olist subsets for teaching and exercise...")
-
-# Load Olist orders
-olist_orders = pd.read_csv("data/day2/block_a/olist_orders_dataset.csv")
-olist_customers = pd.read_csv("data/day2/block_a/olist_customers_dataset.csv")
-olist_order_items = pd.read_csv("data/day2/block_a/olist_order_items_dataset.csv")
-
-print(f"   Loaded Olist data: {len(olist_orders)} orders, {len(olist_customers)} customers")
-
-# Create teaching subset (~1000 orders)
-teaching_orders = olist_orders.sample(n=1000, random_state=42).copy()
-teaching_customer_ids = teaching_orders['customer_id'].unique()
-teaching_customers = olist_customers[olist_customers['customer_id'].isin(teaching_customer_ids)].copy()
-teaching_order_ids = teaching_orders['order_id'].unique()
-teaching_items = olist_order_items[olist_order_items['order_id'].isin(teaching_order_ids)].copy()
-
-# Save teaching subset
-teaching_orders.to_csv(TEACHING_DIR / "olist_orders_subset.csv", index=False)
-teaching_customers.to_csv(TEACHING_DIR / "olist_customers_subset.csv", index=False)
-teaching_items.to_csv(TEACHING_DIR / "olist_order_items_subset.csv", index=False)
-
-print(f"   ✓ Created teaching subset: {len(teaching_orders)} orders")
-
-# Create exercise subset (~500 orders)
-exercise_orders = olist_orders.sample(n=500, random_state=123).copy()
-exercise_customer_ids = exercise_orders['customer_id'].unique()
-exercise_customers = olist_customers[olist_customers['customer_id'].isin(exercise_customer_ids)].copy()
-exercise_order_ids = exercise_orders['order_id'].unique()
-exercise_items = olist_order_items[olist_order_items['order_id'].isin(exercise_order_ids)].copy()
+def create_olist_subsets():
+    print("\n[1/3] Creating Olist subsets for teaching and exercise...")
+
+    # Load Olist orders
+    olist_orders = pd.read_csv(OLIST_DIR / OLIST_FILES['orders'])
+    olist_customers = pd.read_csv(OLIST_DIR / OLIST_FILES['customers'])
+    olist_order_items = pd.read_csv(OLIST_DIR / OLIST_FILES['order_items'])
+
+    print(f"   Loaded Olist data: {len(olist_orders)} orders, {len(olist_customers)} customers")
+
+    for label, out_dir, n_orders, seed, outputs in OLIST_SUBSETS:
+        orders = olist_orders.sample(n=n_orders, random_state=seed).copy()
+        customer_ids = orders['customer_id'].unique()
+        customers = olist_customers[olist_customers['customer_id'].isin(customer_ids)].copy()
+        order_ids = orders['order_id'].unique()
+        items = olist_order_items[olist_order_items['order_id'].isin(order_ids)].copy()
+
+        orders.to_csv(out_dir / outputs['orders'], index=False)
+        customers.to_csv(out_dir / outputs['customers'], index=False)
+        items.to_csv(out_dir / outputs['order_items'], index=False)
+
+        print(f"   ✓ Created {label} subset: {len(orders)} orders")
+
+
+def create_olist_subsets_duckdb():
+    """
+    Same subsets, computed inside DuckDB straight from the CSV files.
+
+    Orders are picked by hashing order_id with the subset's seed, so the
+    selection is reproducible no matter how many threads scan the file (a
+    different sample than pandas' random_state draws). Customers and items
+    are semi-joined against the picked orders and written with COPY, so
+    the full tables are never loaded into Python. All columns are read as
+    text and copied through unchanged (zip prefixes keep leading zeros).
+    """
+    import duckdb
+
+    print("\n[1/3] Creating Olist subsets for teaching and exercise (DuckDB)...")
+    con = duckdb.connect(':memory:')
+    sources = {table: str(OLIST_DIR / filename) for table, filename in OLIST_FILES.items()}
+
+    for label, out_dir, n_orders, seed, outputs in OLIST_SUBSETS:
+        con.execute("""
+            CREATE OR REPLACE TEMP TABLE picked_orders AS
+            SELECT * FROM read_csv(?, header = true, all_varchar = true)
+            ORDER BY hash(order_id, ?::INTEGER)
+            LIMIT ?
+        """, [sources['orders'], seed, n_orders])
+
+        queries = {
+            'orders': "SELECT * FROM picked_orders",
+            'customers': f"""
+                SELECT * FROM read_csv({sql_string(sources['customers'])}, header = true, all_varchar = true)
+                WHERE customer_id IN (SELECT customer_id FROM picked_orders)
+            """,
+            'order_items': f"""
+                SELECT * FROM read_csv({sql_string(sources['order_items'])}, header = true, all_varchar = true)
+                WHERE order_id IN (SELECT order_id FROM picked_orders)
+            """,
+        }
+        for table, query in queries.items():
+            con.execute(f"COPY ({query}) TO {sql_string(out_dir / outputs[table])} (HEADER, DELIMITER ',')")
+
+        n_picked = con.execute("SELECT count(*) FROM picked_orders").fetchone()[0]
+        print(f"   ✓ Created {label} subset: {n_picked} orders")
+
+    con.close()
 
-# Save exercise subset
-exercise_orders.to_csv(EXERCISE_DIR / "mini_orders.csv", index=False)
-exercise_customers.to_csv(EXERCISE_DIR / "mini_customers.csv", index=False)
-exercise_items.to_csv(EXERCISE_DIR / "mini_order_items.csv", index=False)
-
-print(f"   ✓ Created exercise subset: {len(exercise_orders)} orders")
 
 # =============================================================================
 # Part 2: Download Chicago Business Licenses (CSV)
 # =============================================================================
 
-print("\n[2/3] Downloading Chicago Business Licenses...")
+def open_source(fetcher: SocrataFetcher, url: str, max_rows, outputs, refresh: bool):
+    """
+    Returns (checkpoint, skip). skip is True if the source has not changed
+    since its last complete download and all output files exist.
 
-# Chicago Data Portal API endpoint (using Socrata API)
-# https://data.cityofchicago.org/Community-Economic-Development/Business-Licenses/r5kz-chrr
-chicago_url = "https://data.cityofchicago.org/resource/r5kz-chrr.csv"
+    Without a cache every run downloads and the checkpoint is None.
+    """
+    print(f"   Fetching from: {url}")
+    print(f"   ({'all rows' if max_rows is None else f'up to {max_rows} rows'}, "
+          f"{fetcher.page_size} per page, {fetcher.max_workers} pages at a time)")
 
-try:
-    # Download with limit (we'll get ~50K rows as subset)
-    print(f"   Fetching from: {chicago_url}")
-    print(f"   (This may take 30-60 seconds...)")
+    if fetcher.cache is None:
+        return None, False
 
-    # Note: Socrata API returns max 1000 rows by default, we need to use $limit parameter
-    chicago_df = pd.read_csv(f"{chicago_url}?$limit=50000")
+    source = fetcher.open_source(url, max_rows=max_rows, refresh=refresh)
+    if source.unchanged and all(output.exists() for output in outputs):
+        print(f"   ✓ Unchanged since last download, keeping {', '.join(map(str, outputs))}")
+        return source, True
+    if source.resumed_pages:
+        print(f"   Resuming: {source.resumed_pages} pages already downloaded")
+    return source, False
 
-    print(f"   Downloaded {len(chicago_df)} records")
-    print(f"   Columns: {list(chicago_df.columns)}")
 
-    # Save to HW3 data pack
-    chicago_df.to_csv(HW3_DIR / "chicago_business_licenses.csv", index=False)
-    print(f"   ✓ Saved to {HW3_DIR / 'chicago_business_licenses.csv'}")
+def download_chicago(fetcher: SocrataFetcher, url: str = CHICAGO_URL, max_rows=CHICAGO_LIMIT,
+                     refresh: bool = False) -> bool:
+    """Download the Chicago CSV; returns False if the download failed."""
+    print("\n[2/3] Downloading Chicago Business Licenses...")
+    output = HW3_DIR / "chicago_business_licenses.csv"
 
-except Exception as e:
-    print(f"   ✗ Error downloading Chicago data: {e}")
-    print(f"   Please download manually from: https://data.cityofchicago.org/resource/r5kz-chrr.csv")
+    try:
+        source, skip = open_source(fetcher, url, max_rows, [output], refresh)
+        if skip:
+            return True
 
-# =============================================================================
-# Part 3: Download NYC DOB Permit Issuance (JSON)
-# =============================================================================
+        started = time.perf_counter()
+        csv_text = fetcher.fetch_csv(url, max_rows=max_rows, checkpoint=source)
+        chicago_df = pd.read_csv(io.StringIO(csv_text))
 
-print("\n[3/3] Downloading NYC DOB Permit Issuance...")
+        print(f"   Downloaded {len(chicago_df)} records in {time.perf_counter() - started:.1f}s")
+        print(f"   Columns: {list(chicago_df.columns)}")
 
-# NYC Open Data API endpoint (using Socrata API)
-# https://data.cityofnewyork.us/Housing-Development/DOB-Permit-Issuance/ipu4-2q9a
-nyc_url = "https://data.cityofnewyork.us/resource/ipu4-2q9a.json"
-
-try:
-    print(f"   Fetching from: {nyc_url}")
-    print(f"   (This may take 30-60 seconds...)")
-
-    # Download JSON (limit to 20000 records)
-    response = requests.get(f"{nyc_url}?$limit=20000")
-    response.raise_for_status()
+        # Save to HW3 data pack
+        chicago_df.to_csv(output, index=False)
+        print(f"   ✓ Saved to {output}")
 
-    nyc_data = response.json()
-    print(f"   Downloaded {len(nyc_data)} records")
+    except Exception as e:
+        print(f"   ✗ Error downloading Chicago data: {e}")
+        print(f"   Please download manually from: {CHICAGO_URL}")
+        return False
+    return True
 
-    # Show sample structure
-    if nyc_data:
-        print(f"   Sample keys: {list(nyc_data[0].keys())[:10]}...")
 
-    # Save as JSON
-    with open(HW3_DIR / "nyc_building_permits.json", 'w') as f:
-        json.dump(nyc_data, f, indent=2)
+# =============================================================================
+# Part 3: Download NYC DOB Permit Issuance (JSON)
+# =============================================================================
 
-    print(f"   ✓ Saved to {HW3_DIR / 'nyc_building_permits.json'}")
+def nyc_outputs(formats):
+    return [HW3_DIR / f"nyc_building_permits{NYC_FORMATS[fmt]}" for fmt in formats]
+
+
+def download_nyc(fetcher: SocrataFetcher, url: str = NYC_URL, max_rows=NYC_LIMIT,
+                 refresh: bool = False, formats=NYC_DEFAULT_FORMATS) -> bool:
+    """Download the NYC permits; returns False if the download failed."""
+    print("\n[3/3] Downloading NYC DOB Permit Issuance...")
+    formats = list(dict.fromkeys(formats))
+    outputs = nyc_outputs(formats)
+
+    try:
+        source, skip = open_source(fetcher, url, max_rows, outputs, refresh)
+        if skip:
+            return True
+
+        # Records go to the files page by page; only the pages in flight are in memory
+        writer_classes = {
+            'parquet': lambda path: ParquetRecordWriter(path, fetcher.source_schema(url)),
+            'ndjson': NDJSONRecordWriter,
+            'json': JSONRecordWriter,
+        }
+        writers = [writer_classes[fmt](output) for fmt, output in zip(formats, outputs)]
+
+        started = time.perf_counter()
+        rows = fetcher.fetch_json_to(url, writers, max_rows=max_rows, checkpoint=source)
+        print(f"   Downloaded {rows} records in {time.perf_counter() - started:.1f}s")
+
+        for writer in writers:
+            if isinstance(writer, ParquetRecordWriter):
+                print(f"   Columns: {list(writer.columns or {})[:10]}...")
+                if writer.dropped_fields:
+                    print(f"   ⚠️  Fields missing from the first page were dropped: "
+                          f"{sorted(writer.dropped_fields)}")
+            size_mb = writer.path.stat().st_size / (1024 * 1024)
+            print(f"   ✓ Saved to {writer.path} ({size_mb:.1f} MB)")
+
+    except Exception as e:
+        print(f"   ✗ Error downloading NYC data: {e}")
+        print(f"   Please download manually from: {NYC_URL}")
+        return False
+    return True
 
-except Exception as e:
-    print(f"   ✗ Error downloading NYC data: {e}")
-    print(f"   Please download manually from: https://data.cityofnewyork.us/resource/ipu4-2q9a.json")
 
 # =============================================================================
 # Summary
 # =============================================================================
 
-print("\n" + "=" * 70)
-print("Dataset Preparation Complete!")
-print("=" * 70)
-print("\nCreated files:")
-print(f"  Teaching (Block A):")
-print(f"    - {TEACHING_DIR / 'olist_orders_subset.csv'}")
-print(f"    - {TEACHING_DIR / 'olist_customers_subset.csv'}")
-print(f"    - {TEACHING_DIR / 'olist_order_items_subset.csv'}")
-print(f"  Exercise:")
-print(f"    - {EXERCISE_DIR / 'mini_orders.csv'}")
-print(f"    - {EXERCISE_DIR / 'mini_customers.csv'}")
-print(f"    - {EXERCISE_DIR / 'mini_order_items.csv'}")
-print(f"  HW3 Data Pack:")
-print(f"    - {HW3_DIR / 'chicago_business_licenses.csv'}")
-print(f"    - {HW3_DIR / 'nyc_building_permits.json'}")
-print("\nNext steps:")
-print("  1. Review downloaded data for quality")
-print("  2. Create data pack README with attribution")
-print("  3. Test loading in DuckDB")
+def print_summary(steps=STEPS, nyc_formats=NYC_DEFAULT_FORMATS):
+    """List the files written by the given (successful) steps."""
+    print("\n" + "=" * 70)
+    print("Dataset Preparation Complete!")
+    print("=" * 70)
+    print("\nCreated files:")
+    if 'olist' in steps:
+        print(f"  Teaching (Block A):")
+        print(f"    - {TEACHING_DIR / 'olist_orders_subset.csv'}")
+        print(f"    - {TEACHING_DIR / 'olist_customers_subset.csv'}")
+        print(f"    - {TEACHING_DIR / 'olist_order_items_subset.csv'}")
+        print(f"  Exercise:")
+        print(f"    - {EXERCISE_DIR / 'mini_orders.csv'}")
+        print(f"    - {EXERCISE_DIR / 'mini_customers.csv'}")
+        print(f"    - {EXERCISE_DIR / 'mini_order_items.csv'}")
+    if 'chicago' in steps or 'nyc' in steps:
+        print(f"  HW3 Data Pack:")
+    if 'chicago' in steps:
+        print(f"    - {HW3_DIR / 'chicago_business_licenses.csv'}")
+    if 'nyc' in steps:
+        for output in nyc_outputs(nyc_formats):
+            print(f"    - {output}")
+    if not steps:
+        print("  (none)")
+    print("\nNext steps:")
+    print("  1. Review downloaded data for quality")
+    print("  2. Create data pack README with attribution")
+    print("  3. Test loading in DuckDB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Prepare Day 3 datasets (Olist subsets + HW3 data pack)')
+    parser.add_argument(
+        '--steps',
+        nargs='+',
+        choices=STEPS,
+        default=STEPS,
+        help='Steps to run (default: all)'
+    )
+    parser.add_argument(
+        '--olist-engine',
+        choices=OLIST_ENGINES,
+        default='pandas',
+        help='Engine for the Olist subsets; duckdb works on the CSV files directly '
+             'and scales past memory, but samples different orders (default: pandas)'
+    )
+    parser.add_argument(
+        '--chicago-url',
+        default=CHICAGO_URL,
+        help='Chicago business licenses CSV endpoint'
+    )
+    parser.add_argument(
+        '--nyc-url',
+        default=NYC_URL,
+        help='NYC DOB permit issuance JSON endpoint'
+    )
+    parser.add_argument(
+        '--chicago-limit',
+        type=int,
+        default=CHICAGO_LIMIT,
+        help=f'Chicago rows to download (default: {CHICAGO_LIMIT})'
+    )
+    parser.add_argument(
+        '--nyc-limit',
+        type=int,
+        default=NYC_LIMIT,
+        help=f'NYC rows to download (default: {NYC_LIMIT})'
+    )
+    parser.add_argument(
+        '--nyc-format',
+        nargs='+',
+        choices=list(NYC_FORMATS),
+        default=NYC_DEFAULT_FORMATS,
+        help='NYC output files; add json for the pretty-printed file used by the '
+             'HW3 starter (default: parquet)'
+    )
+    parser.add_argument(
+        '--full',
+        action='store_true',
+        help='Download complete datasets instead of the capped subsets'
+    )
+    parser.add_argument(
+        '--page-size',
+        type=int,
+        default=DEFAULT_PAGE_SIZE,
+        help=f'Rows per API request (default: {DEFAULT_PAGE_SIZE})'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f'Pages fetched concurrently (default: {DEFAULT_WORKERS})'
+    )
+    parser.add_argument(
+        '--retries',
+        type=int,
+        default=DEFAULT_RETRIES,
+        help=f'Retries per page on network errors, 429 and 5xx (default: {DEFAULT_RETRIES})'
+    )
+    parser.add_argument(
+        '--refresh',
+        action='store_true',
+        help='Ignore download checkpoints (cached pages are still revalidated)'
+    )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Do not use or fill the HTTP cache in .http_cache/'
+    )
+    parser.add_argument(
+        '--cache-max-mb',
+        type=int,
+        default=DEFAULT_MAX_BYTES // (1024 * 1024),
+        help=f'HTTP cache size limit in MB (default: {DEFAULT_MAX_BYTES // (1024 * 1024)})'
+    )
+    args = parser.parse_args()
+
+    # Ensure directories exist
+    for dir_path in [TEACHING_DIR, EXERCISE_DIR, HW3_DIR]:
+        dir_path.mkdir(parents=True, exist_ok=True)
+
+    print("=" * 70)
+    print("Day 3 Dataset Preparation")
+    print("=" * 70)
+
+    if 'olist' in args.steps:
+        if args.olist_engine == 'duckdb':
+            create_olist_subsets_duckdb()
+        else:
+            create_olist_subsets()
+
+    cache = HTTPCache(max_bytes=args.cache_max_mb * 1024 * 1024, enabled=not args.no_cache)
+
+    failed = []
+    with SocrataFetcher(page_size=args.page_size, max_workers=args.workers,
+                        retries=args.retries, cache=cache) as fetcher:
+        if 'chicago' in args.steps:
+            if not download_chicago(fetcher, args.chicago_url,
+                                    max_rows=None if args.full else args.chicago_limit,
+                                    refresh=args.refresh):
+                failed.append('chicago')
+        if 'nyc' in args.steps:
+            if not download_nyc(fetcher, args.nyc_url,
+                                max_rows=None if args.full else args.nyc_limit,
+                                refresh=args.refresh, formats=args.nyc_format):
+                failed.append('nyc')
+
+    print_summary([step for step in args.steps if step not in failed], args.nyc_format)
+    print(f"\n{cache.stats_line()}")
+
+    # Non-zero exit so callers (build_materials.py) do not take old files
+    # on disk for a successful download
+    if failed:
+        print(f"\n❌ Download failed: {', '.join(failed)} (files above may be missing or out of date)")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,499 @@
+#!/usr/bin/env python3
+"""
+Profile Notebooks - Per-cell execution profile with baseline regression report
+
+Runs each notebook (via run_notebooks.py) and records for every code cell:
+- wall time
+- peak RSS of the kernel process after the cell
+- time spent inside DuckDB calls (execute / sql / df / fetch*), including
+  materializing the relations that sql() / query() return
+
+The first run of a notebook stores its profile as the baseline. Later runs
+are compared against it, and any cell that got slower (or hungrier) by more
+than --threshold percent is flagged. Small absolute changes are ignored
+(--min-seconds / --min-rss-mb) so sub-second noise does not trigger reports.
+
+The kernel-side probes are installed with a silent execute before the first
+cell: duckdb.connect() is wrapped so connections time their query methods,
+relations time df() / fetch* / show() / repr(), and resource.getrusage()
+reports peak RSS. Notebook outputs and execution
+counts are not affected, and outputs are not written back unless --write is
+given.
+
+Usage:
+    python scripts/profile_notebooks.py notebooks/day1/day1_block_b_03_window_functions_primer.ipynb
+    python scripts/profile_notebooks.py notebooks/day2/day2_block_a_joins.ipynb --threshold 50
+    python scripts/profile_notebooks.py --update-baseline     # re-record all baselines
+    python scripts/profile_notebooks.py --json > profile.json
+
+Timings are only comparable between runs on the same machine; run with the
+default --jobs 1 when recording a baseline.
+
+Exit codes:
+    0 - No regressions
+    1 - Regressions found or a notebook failed to run
+"""
+
+import argparse
+import ast
+import json
+import os
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from check_notebook_outputs import print_report
+from notebook_discovery import REPO_ROOT, find_notebooks
+from run_notebooks import DEFAULT_ROOTS, nbformat, run_notebooks
+
+try:
+    from nbclient.util import run_sync
+except ImportError:  # pragma: no cover - reported in main()
+    run_sync = None
+
+
+DEFAULT_BASELINE = REPO_ROOT / '.notebook_cache' / 'profile_baseline.json'
+BASELINE_FORMAT = 1
+
+# Metric -> (label, unit) in report order
+METRICS = {
+    'seconds': ('wall', 's'),
+    'duckdb_seconds': ('duckdb', 's'),
+    'peak_rss_mb': ('peak RSS', ' MB'),
+}
+
+# Installed into the kernel once per notebook (silently, no outputs)
+KERNEL_PROBES = r'''
+import resource as _nb_profile_resource
+import sys as _nb_profile_sys
+import time as _nb_profile_time
+
+
+class _NotebookProfile:
+    """Per-cell probes installed by scripts/profile_notebooks.py."""
+
+    QUERY_METHODS = {
+        'execute', 'executemany', 'sql', 'query', 'df', 'fetchdf', 'fetchall',
+        'fetchone', 'fetchmany', 'fetchnumpy', 'arrow', 'fetch_arrow_table', 'pl',
+    }
+    # Relations (con.sql / con.query) are lazy: the query runs when they are
+    # materialized or displayed
+    RELATION_METHODS = QUERY_METHODS - {'execute', 'executemany', 'sql', 'query'} | {
+        'show', '__repr__', '__str__',
+    }
+
+    def __init__(self):
+        self.duckdb_seconds = 0.0
+
+    def snapshot(self):
+        """Measurements since the previous snapshot."""
+        peak = _nb_profile_resource.getrusage(_nb_profile_resource.RUSAGE_SELF).ru_maxrss
+        scale = 1024 * 1024 if _nb_profile_sys.platform == 'darwin' else 1024
+        result = {
+            'peak_rss_mb': round(peak / scale, 1),
+            'duckdb_seconds': round(self.duckdb_seconds, 4),
+        }
+        self.duckdb_seconds = 0.0
+        return result
+
+    def wrap_duckdb(self):
+        try:
+            import duckdb
+        except ImportError:
+            return
+
+        profile = self
+        connect = duckdb.connect
+
+        class TimedConnection:
+            def __init__(self, con):
+                self._con = con
+
+            def __getattr__(self, name):
+                attr = getattr(self._con, name)
+                if name not in profile.QUERY_METHODS or not callable(attr):
+                    return attr
+
+                def timed(*args, **kwargs):
+                    started = _nb_profile_time.perf_counter()
+                    try:
+                        result = attr(*args, **kwargs)
+                    finally:
+                        profile.duckdb_seconds += _nb_profile_time.perf_counter() - started
+                    # con.execute(...) returns the connection; keep chaining timed
+                    return self if result is self._con else result
+
+                return timed
+
+            def __enter__(self):
+                self._con.__enter__()
+                return self
+
+            def __exit__(self, *exc):
+                return self._con.__exit__(*exc)
+
+            def __repr__(self):
+                return repr(self._con)
+
+        def timed_connect(*args, **kwargs):
+            con = connect(*args, **kwargs)
+            # Replacement scans (SELECT ... FROM df) look in the calling frame,
+            # which is now timed(); let them reach the notebook's own frames
+            try:
+                con.execute("SET python_scan_all_frames = true")
+            except duckdb.Error:
+                pass
+            return TimedConnection(con)
+
+        duckdb.connect = timed_connect
+
+        # Patched on the class rather than proxied, so relations still work
+        # as replacement scans (SELECT ... FROM rel) and isinstance() checks
+        relation = getattr(duckdb, 'DuckDBPyRelation', None)
+        for name in sorted(self.RELATION_METHODS):
+            method = getattr(relation, name, None)
+            if method is None:
+                continue
+            try:
+                setattr(relation, name, self._timed_method(method))
+            except (AttributeError, TypeError):
+                pass
+
+    def _timed_method(self, method):
+        profile = self
+
+        def timed(*args, **kwargs):
+            started = _nb_profile_time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                profile.duckdb_seconds += _nb_profile_time.perf_counter() - started
+
+        return timed
+
+
+_nb_profile = _NotebookProfile()
+_nb_profile.wrap_duckdb()
+'''
+
+PROBE_EXPRESSION = '_nb_profile.snapshot()'
+
+
+def _kernel_call(client, code: str = '', expressions: Optional[Dict[str, str]] = None,
+                 timeout: int = 30) -> Dict[str, Any]:
+    """Run code silently in the notebook's kernel and return user_expressions."""
+    msg_id = client.kc.execute(
+        code, silent=True, store_history=False, user_expressions=expressions or {}
+    )
+    while True:
+        reply = run_sync(client.kc.get_shell_msg)(timeout=timeout)
+        if reply['parent_header'].get('msg_id') == msg_id:
+            break
+
+    content = reply['content']
+    if content.get('status') != 'ok':
+        raise RuntimeError(f"Profiling probe failed: {content.get('ename')}: {content.get('evalue')}")
+    return content.get('user_expressions', {})
+
+
+def install_probes(client):
+    """setup_hook for execute_notebook(): install the kernel-side probes."""
+    _kernel_call(client, KERNEL_PROBES)
+
+
+def read_probes(client, index, cell, seconds) -> Dict[str, Any]:
+    """cell_hook for execute_notebook(): collect and reset per-cell measurements."""
+    value = _kernel_call(client, expressions={'probe': PROBE_EXPRESSION})['probe']
+    if value.get('status') != 'ok':
+        return {}
+    return ast.literal_eval(value['data']['text/plain'])
+
+
+# ----------------------------------------------------------------------
+# Baseline
+# ----------------------------------------------------------------------
+
+def notebook_key(notebook_path) -> str:
+    """Baseline key: path relative to the repo root when possible."""
+    path = Path(notebook_path).resolve()
+    return str(path.relative_to(REPO_ROOT)) if path.is_relative_to(REPO_ROOT) else str(path)
+
+
+def load_baseline(baseline_path: Path) -> Dict[str, Any]:
+    try:
+        with open(baseline_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if data.get('format') != BASELINE_FORMAT:
+        return {}
+    return data.get('notebooks', {})
+
+
+def save_baseline(baseline_path: Path, notebooks: Dict[str, Any]):
+    """Write the baseline file atomically."""
+    baseline_path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix='.profile.', suffix='.tmp', dir=baseline_path.parent)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({'format': BASELINE_FORMAT, 'notebooks': notebooks}, f, indent=2, sort_keys=True)
+            f.write('\n')
+        os.replace(tmp_path, baseline_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def baseline_entry(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Baseline record for one profiled notebook, cells keyed by cell ID."""
+    return {
+        'recorded_at': datetime.now().isoformat(timespec='seconds'),
+        'total_seconds': result['total_seconds'],
+        'cells': {
+            cell['id']: {
+                'index': cell['index'],
+                **{metric: cell[metric] for metric in METRICS if metric in cell},
+            }
+            for cell in result['cells']
+        },
+    }
+
+
+def find_regressions(result: Dict[str, Any], baseline: Dict[str, Any],
+                     threshold: float, floors: Dict[str, float]) -> List[Dict[str, Any]]:
+    """
+    Cells whose metrics exceed the baseline by more than threshold.
+
+    Args:
+        result: execute_notebook() result with probe measurements
+        baseline: baseline_entry() of the same notebook
+        threshold: Allowed relative increase (0.25 = 25%)
+        floors: Minimum absolute increase per metric before a cell is flagged
+
+    Returns:
+        List of {'index', 'id', 'metric', 'baseline', 'current', 'change'}
+    """
+    regressions = []
+    for cell in result['cells']:
+        previous = baseline['cells'].get(cell['id'])
+        if previous is None:
+            continue
+        for metric in METRICS:
+            if metric not in cell or metric not in previous:
+                continue
+            before, now = previous[metric], cell[metric]
+            if now - before < floors.get(metric, 0):
+                continue
+            if now > before * (1 + threshold):
+                regressions.append({
+                    'index': cell['index'],
+                    'id': cell['id'],
+                    'metric': metric,
+                    'baseline': before,
+                    'current': now,
+                    'change': (now - before) / before if before else None,
+                    'source_preview': cell['source_preview'],
+                })
+    return regressions
+
+
+# ----------------------------------------------------------------------
+# Reporting
+# ----------------------------------------------------------------------
+
+def print_profile(result: Dict[str, Any], slowest: int = 10):
+    """Print the slowest cells of one notebook with all measurements."""
+    cells = sorted(result['cells'], key=lambda c: c['seconds'], reverse=True)
+    print(f"\n⏱️  PROFILE ({len(result['cells'])} code cells, {result['total_seconds']:.1f}s total):")
+    print(f"  {'Cell':>6}  {'wall':>8}  {'duckdb':>8}  {'peak RSS':>10}  Source")
+    for cell in cells[:slowest]:
+        duckdb = f"{cell['duckdb_seconds']:.2f}s" if 'duckdb_seconds' in cell else '-'
+        rss = f"{cell['peak_rss_mb']:.0f} MB" if 'peak_rss_mb' in cell else '-'
+        preview = ' '.join(cell['source_preview'].split())
+        print(f"  {cell['index']:>6}  {cell['seconds']:>7.2f}s  {duckdb:>8}  {rss:>10}  {preview[:40]}")
+
+
+def print_regressions(regressions: List[Dict[str, Any]], verbose: bool = False) -> bool:
+    """Print regressions against the baseline; True if there are none."""
+    if not regressions:
+        print(f"\n✅ NO REGRESSIONS against baseline")
+        return True
+
+    print(f"\n🚨 REGRESSIONS ({len(regressions)}):")
+    for reg in regressions:
+        label, unit = METRICS[reg['metric']]
+        change = f"+{reg['change']:.0%}" if reg['change'] is not None else 'new'
+        print(f"\n  Cell {reg['index']} ({reg['id']}): {label} "
+              f"{reg['baseline']:.2f}{unit} -> {reg['current']:.2f}{unit} ({change})")
+        if verbose:
+            print(f"    Source: {' '.join(reg['source_preview'].split())}")
+    return False
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Profile notebook cells (wall time, peak RSS, DuckDB time) against a baseline',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument(
+        'notebooks',
+        nargs='*',
+        help='Notebooks (or directories) to profile (default: notebooks/day1-3 and assignments/)'
+    )
+    parser.add_argument(
+        '--baseline',
+        type=Path,
+        default=DEFAULT_BASELINE,
+        help=f'Baseline file (default: {DEFAULT_BASELINE.relative_to(REPO_ROOT)})'
+    )
+    parser.add_argument(
+        '--update-baseline',
+        action='store_true',
+        help='Replace the stored baseline with this run'
+    )
+    parser.add_argument(
+        '--threshold',
+        type=float,
+        default=25.0,
+        help='Flag cells more than N percent above baseline (default: 25)'
+    )
+    parser.add_argument(
+        '--min-seconds',
+        type=float,
+        default=0.5,
+        help='Ignore time increases smaller than this many seconds (default: 0.5)'
+    )
+    parser.add_argument(
+        '--min-rss-mb',
+        type=float,
+        default=50.0,
+        help='Ignore peak RSS increases smaller than this many MB (default: 50)'
+    )
+    parser.add_argument(
+        '-j', '--jobs',
+        type=int,
+        default=1,
+        help='Profile N notebooks in parallel (skews timings; default: 1)'
+    )
+    parser.add_argument(
+        '--timeout',
+        type=int,
+        default=600,
+        help='Per-cell timeout in seconds (default: 600)'
+    )
+    parser.add_argument(
+        '--kernel',
+        default='python3',
+        help='Kernel name (default: python3)'
+    )
+    parser.add_argument(
+        '--write',
+        action='store_true',
+        help='Write the executed outputs back to the notebook files'
+    )
+    parser.add_argument(
+        '--slowest',
+        type=int,
+        default=10,
+        help='Show the N slowest cells per notebook (default: 10)'
+    )
+    parser.add_argument(
+        '-v', '--verbose',
+        action='store_true',
+        help='Show detailed output (source code, full errors)'
+    )
+    parser.add_argument(
+        '--json',
+        action='store_true',
+        help='Output profiles and regressions as JSON'
+    )
+
+    args = parser.parse_args()
+
+    if nbformat is None or run_sync is None:
+        print("❌ ERROR: nbclient and nbformat are required (pip install jupyter)", file=sys.stderr)
+        return 1
+
+    roots = [Path(p) for p in args.notebooks] if args.notebooks else DEFAULT_ROOTS
+    notebook_paths = find_notebooks(roots=roots)
+    if not notebook_paths:
+        print("❌ No notebooks to profile", file=sys.stderr)
+        return 1
+
+    baseline = load_baseline(args.baseline)
+    floors = {
+        'seconds': args.min_seconds,
+        'duckdb_seconds': args.min_seconds,
+        'peak_rss_mb': args.min_rss_mb,
+    }
+    options = {
+        'timeout': args.timeout,
+        'kernel_name': args.kernel,
+        'write_back': args.write,
+        'setup_hook': install_probes,
+        'cell_hook': read_probes,
+    }
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+
+    all_clean = True
+    profiles = []
+    recorded = 0
+    total_regressions = 0
+
+    for result in run_notebooks(notebook_paths, jobs=jobs, **options):
+        key = notebook_key(result['notebook_path'])
+
+        if result['error'] is not None:
+            all_clean = False
+            print(f"❌ ERROR running {result['notebook_path']}: {result['error']}", file=sys.stderr)
+            profiles.append({'notebook': key, 'profile': result, 'regressions': []})
+            continue
+
+        regressions = []
+        new_baseline = key not in baseline or args.update_baseline
+        if new_baseline:
+            baseline[key] = baseline_entry(result)
+            recorded += 1
+        else:
+            regressions = find_regressions(result, baseline[key], args.threshold / 100, floors)
+
+        total_regressions += len(regressions)
+        profiles.append({'notebook': key, 'profile': result, 'regressions': regressions})
+
+        if args.json:
+            if regressions:
+                all_clean = False
+            continue
+
+        print_report(result['report'], verbose=args.verbose)
+        print_profile(result, slowest=args.slowest)
+        if new_baseline:
+            print(f"\n📌 Baseline recorded")
+        elif not print_regressions(regressions, verbose=args.verbose):
+            all_clean = False
+
+    if recorded:
+        save_baseline(args.baseline, baseline)
+
+    if args.json:
+        print(json.dumps(profiles, indent=2))
+    else:
+        print(f"\n{'SUMMARY':-^70}")
+        print(f"  Notebooks profiled: {len(profiles)}")
+        print(f"  Baselines recorded: {recorded}")
+        print(f"  Regressions: {total_regressions} (threshold {args.threshold:g}%)")
+        if all_clean:
+            print(f"\n✅ NO REGRESSIONS!")
+        else:
+            print(f"\n⚠️ REGRESSIONS FOUND - See details above")
+        print(f"{'='*70}\n")
+
+    return 0 if all_clean else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+Run Notebooks - Execute course notebooks headlessly and inspect the results
+
+check_notebook_outputs.py only looks at notebooks someone already ran by
+hand. This script executes the notebooks itself across a pool of local
+kernels (one kernel per worker process), writes the outputs back, and feeds
+each executed notebook straight into NotebookInspector.
+
+Every code cell is timed, so slow teaching cells (the heavy window-function
+and join notebooks) can be found and fixed before a live session.
+
+Each notebook runs with its own directory as the working directory, like
+Jupyter does, so relative paths such as '../../data/day1/...' resolve.
+
+Usage:
+    python scripts/run_notebooks.py                     # all course notebooks
+    python scripts/run_notebooks.py --jobs 4
+    python scripts/run_notebooks.py notebooks/day1/day1_block_b_03_window_functions_primer.ipynb
+    python scripts/run_notebooks.py --no-write --slowest 10
+    python scripts/run_notebooks.py --json > run_report.json
+
+Requires nbclient, nbformat and ipykernel (installed with `jupyter`).
+
+Exit codes:
+    0 - All notebooks executed and inspected clean
+    1 - Execution failures or inspection issues
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List
+
+try:
+    import nbformat
+    from nbclient import NotebookClient
+    from nbclient.exceptions import CellExecutionError
+except ImportError:  # pragma: no cover - reported in main()
+    nbformat = None
+
+from check_notebook_outputs import NotebookInspector, print_report
+from notebook_discovery import REPO_ROOT, find_notebooks
+
+
+# Course notebooks executed by default
+DEFAULT_ROOTS = [
+    REPO_ROOT / 'notebooks' / 'day1',
+    REPO_ROOT / 'notebooks' / 'day2',
+    REPO_ROOT / 'notebooks' / 'day3',
+    REPO_ROOT / 'assignments',
+]
+
+
+def write_notebook_atomic(nb, notebook_path: Path):
+    """Write an executed notebook via temp file + rename."""
+    fd, tmp_path = tempfile.mkstemp(
+        prefix=f'.{notebook_path.name}.', suffix='.tmp', dir=notebook_path.parent
+    )
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            nbformat.write(nb, f)
+        os.replace(tmp_path, notebook_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def execute_notebook(notebook_path, timeout: int = 600, kernel_name: str = 'python3',
+                     allow_errors: bool = True, write_back: bool = True,
+                     setup_hook=None, cell_hook=None) -> Dict[str, Any]:
+    """
+    Execute one notebook cell by cell in a fresh kernel.
+
+    Args:
+        notebook_path: Path to the notebook file
+        timeout: Per-cell timeout in seconds
+        kernel_name: Jupyter kernel to start
+        allow_errors: Keep going after a cell raises (errors end up in the
+            outputs, where NotebookInspector reports them)
+        write_back: Write the executed notebook over the original
+        setup_hook: Optional callable(client) run once after the kernel has
+            started, before the first cell
+        cell_hook: Optional callable(client, index, cell, seconds) returning a
+            dict of extra per-cell measurements (used by profile_notebooks.py)
+
+    Returns:
+        Dict with 'notebook_path', 'total_seconds', 'cells' (per-cell
+        timings), 'error' (None if the run completed) and 'report' (the
+        NotebookInspector report of the executed notebook)
+    """
+    notebook_path = Path(notebook_path)
+    result = {
+        'notebook_path': str(notebook_path),
+        'total_seconds': 0.0,
+        'cells': [],
+        'error': None,
+        'report': None,
+    }
+
+    nb = nbformat.read(notebook_path, as_version=4)
+    client = NotebookClient(
+        nb,
+        timeout=timeout,
+        kernel_name=kernel_name,
+        allow_errors=allow_errors,
+        resources={'metadata': {'path': str(notebook_path.parent)}},
+    )
+
+    started = time.perf_counter()
+    try:
+        with client.setup_kernel():
+            if setup_hook is not None:
+                setup_hook(client)
+            for index, cell in enumerate(nb.cells):
+                if cell.cell_type != 'code':
+                    continue
+
+                cell_started = time.perf_counter()
+                try:
+                    client.execute_cell(cell, index)
+                finally:
+                    seconds = time.perf_counter() - cell_started
+                    timing = {
+                        'index': index,
+                        'id': cell.get('id', f'cell-{index}'),
+                        'seconds': round(seconds, 4),
+                        'source_preview': ''.join(cell.source)[:100].strip(),
+                    }
+                    if cell_hook is not None:
+                        timing.update(cell_hook(client, index, cell, seconds))
+                    result['cells'].append(timing)
+    except CellExecutionError as e:
+        last_line = (str(e).strip().splitlines() or ['CellExecutionError'])[-1]
+        result['error'] = f"Stopped at failing cell: {last_line}"
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+
+    result['total_seconds'] = round(time.perf_counter() - started, 4)
+
+    if write_back:
+        write_notebook_atomic(nb, notebook_path)
+
+    # Inspect the executed notebook in memory (no re-read from disk)
+    result['report'] = NotebookInspector(notebook_path, notebook=nb).inspect()
+    return result
+
+
+def _execute_worker(task):
+    """Process-pool entry point; each worker drives its own kernel."""
+    notebook_path, options = task
+    try:
+        return execute_notebook(notebook_path, **options)
+    except Exception as e:
+        return {
+            'notebook_path': str(notebook_path),
+            'total_seconds': 0.0,
+            'cells': [],
+            'error': f"{type(e).__name__}: {e}",
+            'report': None,
+        }
+
+
+def run_notebooks(notebook_paths: List[Path], jobs: int = 1, **options):
+    """Yield execute_notebook() results in input order."""
+    tasks = [(path, options) for path in notebook_paths]
+    if jobs > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(tasks))) as executor:
+            yield from executor.map(_execute_worker, tasks)
+    else:
+        yield from map(_execute_worker, tasks)
+
+
+def print_timings(result: Dict[str, Any], slowest: int = 5):
+    """Print total runtime and the slowest cells of one notebook."""
+    cells = sorted(result['cells'], key=lambda c: c['seconds'], reverse=True)
+    print(f"  ⏱️  Executed {len(result['cells'])} code cells in {result['total_seconds']:.1f}s")
+    for cell in cells[:slowest]:
+        preview = ' '.join(cell['source_preview'].split())
+        print(f"     {cell['seconds']:8.2f}s  Cell {cell['index']} ({cell['id']}): {preview[:50]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Execute course notebooks headlessly, time every cell and inspect the outputs',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument(
+        'notebooks',
+        nargs='*',
+        help='Notebooks (or directories) to run (default: notebooks/day1-3 and assignments/)'
+    )
+    parser.add_argument(
+        '-j', '--jobs',
+        type=int,
+        default=1,
+        help='Run N notebooks in parallel, each with its own kernel (0 = one per CPU core)'
+    )
+    parser.add_argument(
+        '--timeout',
+        type=int,
+        default=600,
+        help='Per-cell timeout in seconds (default: 600)'
+    )
+    parser.add_argument(
+        '--kernel',
+        default='python3',
+        help='Kernel name (default: python3)'
+    )
+    parser.add_argument(
+        '--stop-on-error',
+        action='store_true',
+        help='Stop a notebook at the first failing cell'
+    )
+    parser.add_argument(
+        '--no-write',
+        action='store_true',
+        help='Do not write outputs back to the notebook files'
+    )
+    parser.add_argument(
+        '--slowest',
+        type=int,
+        default=5,
+        help='Show the N slowest cells per notebook (default: 5)'
+    )
+    parser.add_argument(
+        '-v', '--verbose',
+        action='store_true',
+        help='Show detailed inspection output (source code, full errors)'
+    )
+    parser.add_argument(
+        '--json',
+        action='store_true',
+        help='Output results (timings + inspection reports) as JSON'
+    )
+
+    args = parser.parse_args()
+
+    if nbformat is None:
+        print("❌ ERROR: nbclient and nbformat are required (pip install jupyter)", file=sys.stderr)
+        return 1
+
+    roots = [Path(p) for p in args.notebooks] if args.notebooks else DEFAULT_ROOTS
+    notebook_paths = find_notebooks(roots=roots)
+    if not notebook_paths:
+        print("❌ No notebooks to run", file=sys.stderr)
+        return 1
+
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    options = {
+        'timeout': args.timeout,
+        'kernel_name': args.kernel,
+        'allow_errors': not args.stop_on_error,
+        'write_back': not args.no_write,
+    }
+
+    all_clean = True
+    results = []
+
+    if not args.json:
+        print(f"🚀 Running {len(notebook_paths)} notebooks with {min(jobs, len(notebook_paths))} kernel(s)...")
+
+    for result in run_notebooks(notebook_paths, jobs=jobs, **options):
+        results.append(result)
+
+        if result['error'] is not None:
+            all_clean = False
+            print(f"❌ ERROR running {result['notebook_path']}: {result['error']}", file=sys.stderr)
+
+        if result['report'] is None:
+            continue
+
+        if not args.json:
+            if not print_report(result['report'], verbose=args.verbose):
+                all_clean = False
+            print_timings(result, slowest=args.slowest)
+        elif (result['report']['cells_without_outputs'] > 0 or
+              result['report']['empty_result_cells'] > 0 or
+              result['report']['error_cells'] > 0):
+            all_clean = False
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        total_seconds = sum(r['total_seconds'] for r in results)
+        all_cells = [c for r in results for c in r['cells']]
+        print(f"\n{'SUMMARY':-^70}")
+        print(f"  Notebooks run: {len(results)}")
+        print(f"  Code cells executed: {len(all_cells)}")
+        print(f"  Total kernel time: {total_seconds:.1f}s")
+        if all_cells:
+            slowest = max(
+                ((r, c) for r in results for c in r['cells']),
+                key=lambda rc: rc[1]['seconds']
+            )
+            print(f"  Slowest cell: {slowest[1]['seconds']:.2f}s in "
+                  f"{Path(slowest[0]['notebook_path']).name} (cell {slowest[1]['index']})")
+        if all_clean:
+            print(f"\n✅ ALL NOTEBOOKS RAN CLEAN!")
+        else:
+            print(f"\n⚠️ ISSUES FOUND - See details above")
+        print(f"{'='*70}\n")
+
+    return 0 if all_clean else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Socrata Export - Write Socrata JSON records page by page
+
+SocrataFetcher.fetch_json() keeps the whole dataset in memory as a list of
+dicts. The writers here take one page of records at a time instead, so a
+download only ever holds the pages in flight:
+
+- ParquetRecordWriter: typed, zstd-compressed Parquet, one row group per page
+- NDJSONRecordWriter:  one JSON object per line
+- JSONRecordWriter:    a pretty-printed JSON array (same layout as
+                       json.dump(records, f, indent=2))
+
+Parquet column types come from the X-SODA2-Fields / X-SODA2-Types headers
+Socrata sends with every response (see SocrataFetcher.source_schema):
+numbers become DOUBLE, checkboxes BOOLEAN, floating timestamps TIMESTAMP,
+everything else VARCHAR (nested values such as points are stored as JSON
+text). Without those headers (e.g. a local stub server) every column is
+VARCHAR and the columns are taken from the first page.
+
+Each writer fills a temp file next to its output and renames it into place
+on close(), so an interrupted download never leaves a truncated file behind.
+
+Usage:
+    schema = fetcher.source_schema(url)
+    writers = [ParquetRecordWriter('permits.parquet', schema), NDJSONRecordWriter('permits.ndjson')]
+    for _, records, _ in fetcher.iter_pages(url, parse_json_page):
+        for writer in writers:
+            writer.write(records)
+    for writer in writers:
+        writer.close()
+"""
+
+import json
+import os
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+
+# Socrata column type -> Parquet column type (anything else is stored as text)
+SODA_TYPES = {
+    'number': 'float64',
+    'double': 'float64',
+    'money': 'float64',
+    'percent': 'float64',
+    'checkbox': 'bool',
+    'floating_timestamp': 'timestamp',
+    'calendar_date': 'timestamp',
+}
+
+PARQUET_COMPRESSION = 'zstd'
+
+
+class _AtomicWriter:
+    """Temp file in the output directory, renamed into place on close()."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, self._tmp_path = tempfile.mkstemp(prefix=f'.{self.path.stem}.', suffix='.tmp',
+                                              dir=self.path.parent)
+        os.close(fd)
+        self.rows = 0
+
+    def write(self, records: List[Dict[str, Any]]):
+        raise NotImplementedError
+
+    def _finish(self):
+        pass
+
+    def close(self):
+        """Finish the file and move it into place."""
+        self._finish()
+        os.chmod(self._tmp_path, 0o644)  # mkstemp creates files as 0600
+        os.replace(self._tmp_path, self.path)
+
+    def abort(self):
+        """Discard the partial file."""
+        try:
+            self._finish()
+        finally:
+            if os.path.exists(self._tmp_path):
+                os.unlink(self._tmp_path)
+
+
+class NDJSONRecordWriter(_AtomicWriter):
+    """One JSON object per line."""
+
+    def __init__(self, path):
+        super().__init__(path)
+        self._file = open(self._tmp_path, 'w', encoding='utf-8')
+
+    def write(self, records: List[Dict[str, Any]]):
+        self._file.writelines(json.dumps(record) + '\n' for record in records)
+        self.rows += len(records)
+
+    def _finish(self):
+        if not self._file.closed:
+            self._file.close()
+
+
+class JSONRecordWriter(_AtomicWriter):
+    """A JSON array written incrementally, laid out like json.dump(indent=2)."""
+
+    def __init__(self, path):
+        super().__init__(path)
+        self._file = open(self._tmp_path, 'w', encoding='utf-8')
+        self._file.write('[')
+
+    def write(self, records: List[Dict[str, Any]]):
+        for record in records:
+            # JSON strings never contain raw newlines, so indenting every
+            # line of the record nests it one level inside the array
+            self._file.write(',\n  ' if self.rows else '\n  ')
+            self._file.write(json.dumps(record, indent=2).replace('\n', '\n  '))
+            self.rows += 1
+
+    def _finish(self):
+        if not self._file.closed:
+            self._file.write('\n]' if self.rows else ']')
+            self._file.close()
+
+
+class ParquetRecordWriter(_AtomicWriter):
+    """Typed, compressed Parquet with one row group per page."""
+
+    def __init__(self, path, schema: Optional[Dict[str, str]] = None,
+                 compression: str = PARQUET_COMPRESSION):
+        """
+        Args:
+            path: Output .parquet file
+            schema: {field: Socrata type} in column order, or None to use the
+                fields of the first page as text columns
+            compression: Parquet codec
+        """
+        import pyarrow  # noqa: F401  (fail before the download starts)
+
+        super().__init__(path)
+        self.compression = compression
+        self.columns = None if schema is None else {
+            field: SODA_TYPES.get(soda_type, 'string') for field, soda_type in schema.items()
+        }
+        self.dropped_fields = set()
+        self._writer = None
+
+    def write(self, records: List[Dict[str, Any]]):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if not records:
+            return
+        if self.columns is None:
+            self.columns = {}
+            for record in records:
+                for field in record:
+                    self.columns.setdefault(field, 'string')
+        for record in records:
+            self.dropped_fields.update(field for field in record if field not in self.columns)
+
+        table = pa.table({
+            field: _column(records, field, arrow_type)
+            for field, arrow_type in self.columns.items()
+        })
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(self._tmp_path, table.schema, compression=self.compression)
+        self._writer.write_table(table)
+        self.rows += len(records)
+
+    def _finish(self):
+        if self._writer is None:
+            # No rows at all: still write a valid (empty) file
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            pq.write_table(pa.table({field: _column([], field, arrow_type)
+                                     for field, arrow_type in (self.columns or {}).items()}),
+                           self._tmp_path, compression=self.compression)
+        else:
+            self._writer.close()
+            self._writer = None
+
+
+def _to_float(value) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_bool(value) -> Optional[bool]:
+    if value is None or isinstance(value, bool):
+        return value
+    return str(value).lower() in ('true', '1', 'y', 'yes')
+
+
+def _to_timestamp(value) -> Optional[datetime]:
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_text(value) -> Optional[str]:
+    if value is None or isinstance(value, str):
+        return value
+    return json.dumps(value)
+
+
+def _column(records: List[Dict[str, Any]], field: str, arrow_type: str):
+    """One Arrow column; values that do not parse as the column type become null."""
+    import pyarrow as pa
+
+    values = [record.get(field) for record in records]
+    if arrow_type == 'float64':
+        return pa.array([_to_float(v) for v in values], pa.float64())
+    if arrow_type == 'bool':
+        return pa.array([_to_bool(v) for v in values], pa.bool_())
+    if arrow_type == 'timestamp':
+        try:
+            return pa.array([_to_text(v) for v in values], pa.string()).cast(pa.timestamp('ms'))
+        except pa.ArrowInvalid:
+            return pa.array([_to_timestamp(v) for v in values], pa.timestamp('ms'))
+    return pa.array([_to_text(v) for v in values], pa.string())
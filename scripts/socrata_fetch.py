@@ -0,0 +1,436 @@
+#!/usr/bin/env python3
+"""
+Socrata Fetch - Concurrent paginated downloads from Socrata open data APIs
+
+The Chicago and NYC open data portals (Socrata) cap a single response with
+$limit. Pulling a large dataset in one request is slow, blocks for minutes
+and has to start over on any network hiccup. This module pages through a
+resource with $offset/$limit instead:
+
+- a bounded number of pages are in flight at once (thread pool)
+- all requests share one pooled requests.Session (keep-alive)
+- failed requests (connection errors, timeouts, 429, 5xx) are retried with
+  exponential backoff, honouring Retry-After
+- pages are returned in offset order, ordered by :id so paging is stable
+
+With an HTTPCache (http_cache.py) downloads are also resumable:
+- every page is cached with its ETag / Last-Modified and re-requested as a
+  conditional GET, so unchanged pages come back as tiny 304s
+- a per-source checkpoint records the pages already fetched; after an
+  interruption those pages are read from disk without any request
+- the dataset's last-modified stamp is recorded with the checkpoint, so a
+  rerun can skip a source that has not changed since its last complete
+  download (SourceCheckpoint.unchanged)
+
+The resource URL is just a parameter, so the fetcher can be pointed at a
+local stub server (anything answering $limit/$offset) for offline testing.
+
+Usage:
+    from socrata_fetch import SocrataFetcher
+
+    fetcher = SocrataFetcher(page_size=10000, max_workers=4)
+    records = fetcher.fetch_json('https://data.cityofnewyork.us/resource/ipu4-2q9a.json',
+                                 max_rows=20000)
+    csv_text = fetcher.fetch_csv('https://data.cityofchicago.org/resource/r5kz-chrr.csv')
+
+    # Page by page into files (socrata_export.py), one page of records at a time
+    writer = ParquetRecordWriter('permits.parquet', fetcher.source_schema(url))
+    rows = fetcher.fetch_json_to(url, [writer], max_rows=20000)
+
+    # Resumable
+    fetcher = SocrataFetcher(cache=HTTPCache())
+    source = fetcher.open_source(url, max_rows=20000)
+    if not source.unchanged:
+        records = fetcher.fetch_json(url, max_rows=20000, checkpoint=source)
+"""
+
+import csv
+import io
+import json
+import random
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from http_cache import HTTPCache, request_key, write_json_atomic
+
+
+DEFAULT_PAGE_SIZE = 10000
+DEFAULT_WORKERS = 4
+DEFAULT_RETRIES = 5
+DEFAULT_BACKOFF = 1.0
+DEFAULT_TIMEOUT = 60
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Response headers that identify a dataset version, most specific first
+VERSION_HEADERS = ['X-SODA2-Truth-Last-Modified', 'Last-Modified', 'ETag']
+
+
+class FetchError(RuntimeError):
+    """Raised when a page still fails after all retries."""
+    pass
+
+
+class SocrataFetcher:
+    """Paginated, concurrent, retrying reader for one Socrata endpoint at a time."""
+
+    def __init__(self, page_size: int = DEFAULT_PAGE_SIZE,
+                 max_workers: int = DEFAULT_WORKERS,
+                 retries: int = DEFAULT_RETRIES,
+                 backoff: float = DEFAULT_BACKOFF,
+                 timeout: float = DEFAULT_TIMEOUT,
+                 session: Optional[requests.Session] = None,
+                 cache: Optional[HTTPCache] = None):
+        self.page_size = page_size
+        self.max_workers = max(1, max_workers)
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.session = session or self._make_session()
+        self.cache = cache if cache is not None and cache.enabled else None
+        self.requests_made = 0
+        self.retries_made = 0
+        self._stats_lock = threading.Lock()
+        self._probes: Dict[str, requests.Response] = {}
+
+    def _make_session(self) -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=self.max_workers)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    def close(self):
+        if self.cache is not None:
+            self.cache.save()
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    # ------------------------------------------------------------------
+    # Single page
+    # ------------------------------------------------------------------
+
+    def _sleep_before_retry(self, attempt: int, response: Optional[requests.Response]):
+        delay = self.backoff * (2 ** attempt) * (0.5 + random.random())
+        if response is not None:
+            retry_after = response.headers.get('Retry-After', '')
+            if retry_after.isdigit():
+                delay = max(delay, int(retry_after))
+        time.sleep(delay)
+
+    def _from_cache(self, url: str, entry: Dict[str, Any],
+                    revalidated: bool = False) -> Optional[requests.Response]:
+        """Build a 200 response from a cached body (None if it is gone)."""
+        body = self.cache.read(entry, revalidated=revalidated)
+        if body is None:
+            return None
+        response = requests.Response()
+        response.status_code = 200
+        response.url = url
+        response._content = body
+        response.headers = CaseInsensitiveDict({
+            name: value for name, value in [
+                ('Content-Type', entry.get('content_type')),
+                ('ETag', entry.get('etag')),
+                ('Last-Modified', entry.get('last_modified')),
+            ] if value
+        })
+        return response
+
+    def cached(self, url: str, params: Optional[Dict[str, Any]] = None) -> Optional[requests.Response]:
+        """Cached response without any request, or None."""
+        if self.cache is None:
+            return None
+        entry = self.cache.lookup(url, params)
+        return self._from_cache(url, entry) if entry is not None else None
+
+    def get(self, url: str, params: Optional[Dict[str, Any]] = None,
+            headers: Optional[Dict[str, str]] = None,
+            use_cache: bool = True) -> requests.Response:
+        """
+        GET with retries and backoff; raises FetchError when retries run out.
+
+        With a cache the request is conditional on the cached validators and
+        a 304 is answered from disk; fresh 200 responses are stored.
+        """
+        use_cache = use_cache and self.cache is not None
+        entry = self.cache.lookup(url, params) if use_cache else None
+
+        last_error = None
+        for attempt in range(self.retries + 1):
+            with self._stats_lock:
+                self.requests_made += 1
+                self.retries_made += bool(attempt)
+            request_headers = {**(headers or {}), **(self.cache.validators(entry) if entry else {})}
+            response = None
+            try:
+                response = self.session.get(url, params=params, headers=request_headers,
+                                            timeout=self.timeout)
+                if response.status_code == 304 and entry is not None:
+                    cached = self._from_cache(url, entry, revalidated=True)
+                    if cached is not None:
+                        return cached
+                    # Body evicted since the lookup: ask again unconditionally
+                    entry = None
+                    continue
+                if response.status_code not in RETRY_STATUSES:
+                    response.raise_for_status()
+                    if use_cache:
+                        self.cache.store(url, params, response.content, response.headers)
+                    return response
+                last_error = f"HTTP {response.status_code}"
+            except (requests.ConnectionError, requests.Timeout) as e:
+                last_error = f"{type(e).__name__}: {e}"
+            except requests.HTTPError as e:
+                # 4xx other than 429: retrying will not help
+                raise FetchError(f"{url}: {e}") from e
+
+            if attempt < self.retries:
+                self._sleep_before_retry(attempt, response)
+
+        raise FetchError(f"{url} (params {params}): giving up after {self.retries + 1} attempts ({last_error})")
+
+    def page_params(self, offset: int, limit: int) -> Dict[str, Any]:
+        return {'$limit': limit, '$offset': offset, '$order': ':id'}
+
+    def fetch_page(self, url: str, offset: int, limit: int,
+                   trusted: bool = False) -> requests.Response:
+        """One page; trusted (checkpointed) pages are read from disk if cached."""
+        params = self.page_params(offset, limit)
+        if trusted:
+            response = self.cached(url, params)
+            if response is not None:
+                return response
+        return self.get(url, params=params)
+
+    # ------------------------------------------------------------------
+    # Checkpoints
+    # ------------------------------------------------------------------
+
+    def _probe(self, url: str) -> requests.Response:
+        """Uncached 1-row request, made once per URL for its headers."""
+        if url not in self._probes:
+            self._probes[url] = self.get(url, params=self.page_params(0, 1), use_cache=False)
+        return self._probes[url]
+
+    def source_schema(self, url: str) -> Optional[Dict[str, str]]:
+        """
+        {field: Socrata type} in column order, from the X-SODA2-Fields /
+        X-SODA2-Types headers (None if the server does not send them).
+        """
+        headers = self._probe(url).headers
+        try:
+            fields = json.loads(headers['X-SODA2-Fields'])
+            types = json.loads(headers['X-SODA2-Types'])
+        except (KeyError, ValueError):
+            return None
+        if len(fields) != len(types):
+            return None
+        return dict(zip(fields, types))
+
+    def source_version(self, url: str) -> Optional[str]:
+        """Dataset version stamp from a 1-row probe (None if the server gives none)."""
+        response = self._probe(url)
+        for header in VERSION_HEADERS:
+            if response.headers.get(header):
+                return response.headers[header]
+        return None
+
+    def open_source(self, url: str, max_rows: Optional[int] = None,
+                    refresh: bool = False) -> 'SourceCheckpoint':
+        """
+        Checkpoint for downloading url with these max_rows / page_size.
+
+        Progress is kept if the dataset version matches the previous run (or
+        the previous run never finished and no version is available);
+        otherwise the download starts over. Requires a cache.
+        """
+        if self.cache is None:
+            raise ValueError('open_source() needs a SocrataFetcher with a cache')
+        version = self.source_version(url)
+        key = request_key(url, {'max_rows': max_rows, 'page_size': self.page_size})
+        path = self.cache.cache_dir / 'checkpoints.json'
+
+        previous = SourceCheckpoint.load_all(path).get(key)
+        keep = (
+            previous is not None and not refresh and
+            previous.get('version') == version and
+            (version is not None or not previous.get('complete'))
+        )
+        state = previous if keep else {'url': url, 'version': version, 'pages': {}, 'complete': False}
+        return SourceCheckpoint(path, key, state, unchanged=keep and version is not None and state['complete'])
+
+    # ------------------------------------------------------------------
+    # Pagination
+    # ------------------------------------------------------------------
+
+    def iter_pages(self, url: str, parse, max_rows: Optional[int] = None,
+                   checkpoint: Optional['SourceCheckpoint'] = None) -> Iterator[Tuple[int, Any, int]]:
+        """
+        Yield (offset, parsed_page, row_count) in offset order.
+
+        Up to 2 * max_workers pages are requested ahead of the one being
+        consumed. Paging stops at the first short page (end of data) or once
+        max_rows rows have been requested.
+
+        Args:
+            url: Resource URL (.json or .csv endpoint)
+            parse: Callable(response) -> (parsed_page, row_count)
+            max_rows: Stop after this many rows (None = whole dataset)
+            checkpoint: Record finished pages here; pages it already lists
+                are read from the cache without a request
+        """
+        def load(offset, limit):
+            trusted = checkpoint is not None and checkpoint.has_page(offset, limit)
+            return parse(self.fetch_page(url, offset, limit, trusted=trusted))
+
+        next_offset = 0
+        in_flight = deque()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            def schedule():
+                nonlocal next_offset
+                while len(in_flight) < 2 * self.max_workers:
+                    if max_rows is not None and next_offset >= max_rows:
+                        return
+                    limit = self.page_size
+                    if max_rows is not None:
+                        limit = min(limit, max_rows - next_offset)
+                    in_flight.append((next_offset, limit, executor.submit(load, next_offset, limit)))
+                    next_offset += limit
+
+            schedule()
+            try:
+                while in_flight:
+                    offset, limit, future = in_flight.popleft()
+                    page, rows = future.result()
+                    if checkpoint is not None:
+                        checkpoint.mark_page(offset, limit, rows)
+                        self.cache.save()
+                    yield offset, page, rows
+                    if rows < limit:
+                        break
+                    schedule()
+            finally:
+                for _, _, future in in_flight:
+                    future.cancel()
+
+        if checkpoint is not None:
+            checkpoint.finish()
+
+    def fetch_json(self, url: str, max_rows: Optional[int] = None,
+                   checkpoint: Optional['SourceCheckpoint'] = None) -> List[Dict[str, Any]]:
+        """All records of a .json resource as one list."""
+        records = []
+        for _, page, _ in self.iter_pages(url, parse_json_page, max_rows=max_rows, checkpoint=checkpoint):
+            records.extend(page)
+        return records
+
+    def fetch_json_to(self, url: str, writers: List[Any], max_rows: Optional[int] = None,
+                      checkpoint: Optional['SourceCheckpoint'] = None) -> int:
+        """
+        Stream a .json resource into record writers (socrata_export.py) page
+        by page; returns the number of records. The writers are closed on
+        success and aborted on failure.
+        """
+        total = 0
+        try:
+            for _, page, rows in self.iter_pages(url, parse_json_page, max_rows=max_rows,
+                                                 checkpoint=checkpoint):
+                for writer in writers:
+                    writer.write(page)
+                total += rows
+        except BaseException:
+            for writer in writers:
+                writer.abort()
+            raise
+        for writer in writers:
+            writer.close()
+        return total
+
+    def fetch_csv(self, url: str, max_rows: Optional[int] = None,
+                  checkpoint: Optional['SourceCheckpoint'] = None) -> str:
+        """All rows of a .csv resource as CSV text with a single header line."""
+        parts = []
+        for _, page, _ in self.iter_pages(url, parse_csv_page, max_rows=max_rows, checkpoint=checkpoint):
+            header, body = page
+            if not parts:
+                parts.append(header)
+            if body:
+                parts.append(body)
+        return ''.join(parts)
+
+
+class SourceCheckpoint:
+    """
+    Download progress for one source, persisted in checkpoints.json.
+
+    state: {'url', 'version', 'pages': {offset: [limit, rows]}, 'complete'}
+    unchanged: True if the previous download finished and the dataset
+        version has not changed since
+    """
+
+    def __init__(self, path: Path, key: str, state: Dict[str, Any], unchanged: bool = False):
+        self.path = path
+        self.key = key
+        self.state = state
+        self.unchanged = unchanged
+        self.resumed_pages = 0 if unchanged else len(state['pages'])
+
+    @staticmethod
+    def load_all(path: Path) -> Dict[str, Any]:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def has_page(self, offset: int, limit: int) -> bool:
+        page = self.state['pages'].get(str(offset))
+        return page is not None and page[0] == limit
+
+    def mark_page(self, offset: int, limit: int, rows: int):
+        self.state['pages'][str(offset)] = [limit, rows]
+        self.save()
+
+    def finish(self):
+        self.state['complete'] = True
+        self.save()
+
+    def save(self):
+        checkpoints = self.load_all(self.path)
+        checkpoints[self.key] = self.state
+        write_json_atomic(self.path, checkpoints)
+
+
+def parse_json_page(response: requests.Response) -> Tuple[List[Dict[str, Any]], int]:
+    records = response.json()
+    return records, len(records)
+
+
+def parse_csv_page(response: requests.Response) -> Tuple[Tuple[str, str], int]:
+    """
+    Split a CSV page into (header line, data lines) and count its rows.
+
+    Rows are counted with the csv module so newlines inside quoted text
+    fields do not inflate the count.
+    """
+    text = response.content.decode('utf-8')
+    header, _, body = text.partition('\n')
+    if body and not body.endswith('\n'):
+        body += '\n'
+    rows = sum(1 for _ in csv.reader(io.StringIO(body)))
+    return (header + '\n', body), rows
@@ -11,10 +11,15 @@ Used by pre-commit hook to enforce notebook format standards.
 """
 
 import json
-import re
 import sys
+import time
 from pathlib import Path
-from typing import List, Tuple
+from typing import List, Optional, Tuple
+
+from notebook_cache import ResultCache
+from notebook_discovery import add_selection_arguments, record_run, select_notebooks, wants_discovery
+from notebook_lint import lint_cache, lint_with_cache
+from notebook_stream import NotebookStreamError
 
 
 class NotebookValidationError(Exception):
@@ -22,86 +27,37 @@ class NotebookValidationError(Exception):
     pass
 
 
-def validate_notebook(notebook_path: Path) -> List[str]:
+def validate_notebook(notebook_path: Path, cache: Optional[ResultCache] = None) -> List[str]:
     """
     Validate a single notebook file.
 
+    The checks themselves live in notebook_lint.NotebookFormatRule.
+
     Args:
         notebook_path: Path to the notebook file
+        cache: Optional shared lint cache (see notebook_lint.lint_cache)
 
     Returns:
         List of error messages (empty if valid)
     """
-    errors = []
-
     try:
-        with open(notebook_path, 'r', encoding='utf-8') as f:
-            notebook = json.load(f)
-    except json.JSONDecodeError as e:
+        results = lint_with_cache(notebook_path, cache)
+    except (json.JSONDecodeError, NotebookStreamError) as e:
         return [f"Invalid JSON: {e}"]
     except Exception as e:
         return [f"Failed to read file: {e}"]
 
-    # Check nbformat version
-    nbformat = notebook.get('nbformat')
-    nbformat_minor = notebook.get('nbformat_minor')
-
-    if nbformat != 4:
-        errors.append(f"nbformat must be 4, got {nbformat}")
-
-    if nbformat_minor is None or nbformat_minor < 5:
-        errors.append(f"nbformat_minor must be >= 5, got {nbformat_minor}")
-
-    # Check cells
-    cells = notebook.get('cells', [])
-
-    if not cells:
-        errors.append("Notebook has no cells")
-        return errors
-
-    # Track cell IDs for uniqueness check
-    cell_ids = []
-    cell_id_pattern = re.compile(r'^[0-9a-f]{8}$')
-
-    for idx, cell in enumerate(cells):
-        # Check cell has ID
-        cell_id = cell.get('id')
-
-        if cell_id is None:
-            errors.append(f"Cell at index {idx} missing 'id' field")
-            continue
-
-        # Check ID format (8 lowercase hex characters)
-        if not isinstance(cell_id, str):
-            errors.append(f"Cell {idx} has non-string ID: {cell_id}")
-        elif not cell_id_pattern.match(cell_id):
-            if len(cell_id) != 8:
-                errors.append(f"Cell {idx} ID '{cell_id}' must be exactly 8 characters (got {len(cell_id)})")
-            elif not all(c in '0123456789abcdef' for c in cell_id):
-                errors.append(f"Cell {idx} ID '{cell_id}' must be lowercase hexadecimal (0-9, a-f)")
-            else:
-                errors.append(f"Cell {idx} ID '{cell_id}' has invalid format")
-
-        # Track for duplicate check
-        cell_ids.append((idx, cell_id))
-
-    # Check for duplicate IDs
-    seen_ids = {}
-    for idx, cell_id in cell_ids:
-        if cell_id in seen_ids:
-            errors.append(f"Duplicate cell ID '{cell_id}' found at indices {seen_ids[cell_id]} and {idx}")
-        else:
-            seen_ids[cell_id] = idx
-
-    return errors
+    return results['format']
 
 
-def validate_notebooks(notebook_paths: List[Path]) -> Tuple[bool, dict]:
+def validate_notebooks(notebook_paths: List[Path],
+                       cache: Optional[ResultCache] = None) -> Tuple[bool, dict]:
     """
     Validate multiple notebooks.
 
     Args:
         notebook_paths: List of notebook file paths
+        cache: Optional result cache; unchanged notebooks are not re-parsed
 
     Returns:
         Tuple of (all_valid: bool, results: dict)
@@ -111,13 +67,16 @@ def validate_notebooks(notebook_paths: List[Path]) -> Tuple[bool, dict]:
     all_valid = True
 
     for notebook_path in notebook_paths:
-        errors = validate_notebook(notebook_path)
+        errors = validate_notebook(notebook_path, cache=cache)
         if errors:
             all_valid = False
             results[str(notebook_path)] = errors
         else:
             results[str(notebook_path)] = []
 
+    if cache is not None:
+        cache.save()
+
     return all_valid, results
 
 
@@ -175,6 +134,10 @@ Examples:
   # Validate specific notebook
   python scripts/validate_notebook_format.py notebooks/day1_intro.ipynb
 
+  # Validate only notebooks changed since a git ref / since the last run
+  python scripts/validate_notebook_format.py --changed-since origin/main
+  python scripts/validate_notebook_format.py --changed
+
 Exit codes:
   0 - All notebooks valid
   1 - One or more notebooks invalid
@@ -184,11 +147,13 @@ Exit codes:
 
     parser.add_argument(
         'notebooks',
-        nargs='+',
+        nargs='*',
         type=Path,
-        help='Notebook files to validate'
+        help='Notebook files to validate (directories with --all/--changed*)'
     )
 
+    add_selection_arguments(parser)
+
     parser.add_argument(
         '-v', '--verbose',
         action='store_true',
@@ -201,18 +166,38 @@ Exit codes:
         help='Only show errors (no success messages)'
     )
 
-    args = parser.parse_args()
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Re-validate every notebook instead of reusing cached results'
+    )
 
-    # Filter to only .ipynb files
-    notebook_paths = [p for p in args.notebooks if p.suffix == '.ipynb' and p.exists()]
+    args = parser.parse_args()
+    started = time.time()
+
+    if wants_discovery(args):
+        try:
+            # Solution notebooks are read-only here, so they are validated too
+            notebook_paths = select_notebooks(args, 'validate', paths=args.notebooks,
+                                              exclude_solutions=False)
+        except ValueError as e:
+            print(f"Error selecting notebooks: {e}", file=sys.stderr)
+            return 2
+    elif not args.notebooks:
+        parser.error('provide notebook files or use --all / --changed-since / --changed')
+    else:
+        # Filter to only .ipynb files
+        notebook_paths = [p for p in args.notebooks if p.suffix == '.ipynb' and p.exists()]
 
     if not notebook_paths:
         print("No notebook files found to validate.", file=sys.stderr)
         return 0
 
+    cache = lint_cache(enabled=not args.no_cache)
+
     # Validate notebooks
     try:
-        all_valid, results = validate_notebooks(notebook_paths)
+        all_valid, results = validate_notebooks(notebook_paths, cache=cache)
     except Exception as e:
         print(f"Error validating notebooks: {e}", file=sys.stderr)
         return 2
@@ -221,8 +206,13 @@ Exit codes:
     if not args.quiet:
         print_validation_results(results, verbose=args.verbose)
 
+    if not args.quiet:
+        print(f"   {cache.stats_line()}")
+
     # Return exit code
     if all_valid:
+        if args.all or args.changed:
+            record_run('validate', started)
         if not args.quiet and not args.verbose:
             print(f"✅ All {len(notebook_paths)} notebooks are valid")
         return 0
@@ -5,17 +5,34 @@ Password Health Check Script
 Verifies that all solution passwords are documented and working.
 Run this regularly to ensure password loss is impossible.
 
+Passwords are checked on all archives concurrently. By default each check
+decrypts only the member header and a bounded prefix (see
+zip_archiver.check_member); --full streams every first member and checks
+its CRC / HMAC without loading it into memory.
+
+Documentation is checked against solutions/.password_manifest.sqlite (see
+password_manifest.py) by archive name, including whether each ZIP still
+matches the SHA-256 recorded when it was encrypted. Only archives whose
+size or mtime changed since then are hashed, concurrently. The manifest is
+opened read-only: the check never migrates or regenerates anything.
+
 Usage:
     python scripts/verify_password_health.py
+    python scripts/verify_password_health.py --full --workers 8
 """
 
+import argparse
 import os
 import sys
-import json
+import time
 import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 
+from password_manifest import MANIFEST_PATH, PasswordManifest, archive_changed
+from zip_archiver import DEFAULT_WORKERS, ArchiveError, check_member, encryption_method
+
 
 def check_gitignore():
     """Verify password files are gitignored."""
@@ -23,8 +40,10 @@ def check_gitignore():
 
     required_ignores = [
         'solutions/PASSWORDS.md',
+        'solutions/PASSWORDS.pre-manifest.md',
         'solutions/.encryption_log.txt',
-        'solutions/.password_backup.json'
+        'solutions/.password_backup.json',
+        'solutions/.password_manifest.sqlite'
     ]
 
     if not os.path.exists('.gitignore'):
@@ -50,9 +69,9 @@ def check_backup_files_exist():
     print("\n📁 Checking password backup files...")
 
     files_to_check = {
+        'solutions/.password_manifest.sqlite': 'Indexed password manifest + encryption log',
         'solutions/PASSWORDS.md': 'Human-readable password list',
-        'solutions/.password_backup.json': 'Machine-readable backup',
-        'solutions/.encryption_log.txt': 'Encryption history log'
+        'solutions/.password_backup.json': 'Machine-readable backup'
     }
 
     all_exist = True
@@ -68,15 +87,15 @@ def check_backup_files_exist():
 
 
 def load_passwords():
-    """Load passwords from backup JSON."""
-    if not os.path.exists('solutions/.password_backup.json'):
-        return {}
-
-    with open('solutions/.password_backup.json', 'r') as f:
-        return json.load(f)
+    """
+    Load documented archives from the manifest, read-only (from the backup
+    JSON and PASSWORDS.md, in memory, if there is no manifest yet).
+    """
+    with PasswordManifest(read_only=True) as manifest:
+        return {entry['archive']: entry for entry in manifest.entries()}
 
 
-def check_all_zips_documented():
+def check_all_zips_documented(workers=DEFAULT_WORKERS):
     """Verify all solution ZIPs have documented passwords."""
     print("\n📦 Checking solution ZIPs are documented...")
 
@@ -91,64 +110,88 @@ def check_all_zips_documented():
         print("  ℹ️  No solution ZIPs found")
         return True
 
-    # Load documented passwords
+    # One indexed lookup per archive (no scan of PASSWORDS.md)
     passwords = load_passwords()
+    source = 'manifest' if os.path.exists(MANIFEST_PATH) else '.password_backup.json'
 
-    # Also check PASSWORDS.md
-    passwords_md_zips = set()
-    if os.path.exists('solutions/PASSWORDS.md'):
-        with open('solutions/PASSWORDS.md', 'r') as f:
-            for line in f:
-                if line.strip().startswith('- File:'):
-                    # Extract filename from: - File: `filename.zip`
-                    filename = line.split('`')[1] if '`' in line else ''
-                    if filename:
-                        passwords_md_zips.add(filename)
+    # Size / mtime first; archives that may have changed are hashed concurrently
+    recorded = [zip_file for zip_file in solution_zips
+                if passwords.get(zip_file, {}).get('sha256')]
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        changed = dict(zip(recorded, executor.map(
+            lambda zip_file: archive_changed(passwords[zip_file], f"solutions/{zip_file}"),
+            recorded)))
 
     all_documented = True
     for zip_file in sorted(solution_zips):
-        if zip_file in passwords:
-            print(f"  ✅ {zip_file} - documented in .password_backup.json")
-        elif zip_file in passwords_md_zips:
-            print(f"  ⚠️  {zip_file} - in PASSWORDS.md but not in backup JSON")
-        else:
+        entry = passwords.get(zip_file)
+        if entry is None:
             print(f"  ❌ {zip_file} - NO PASSWORD DOCUMENTED!")
             all_documented = False
+        elif changed.get(zip_file):
+            print(f"  ⚠️  {zip_file} - documented, but the ZIP changed since "
+                  f"{entry.get('updated', entry.get('created'))} (re-encrypted by hand?)")
+        else:
+            print(f"  ✅ {zip_file} - documented in {source}")
 
     return all_documented
 
 
-def verify_passwords_work():
-    """Test that all documented passwords actually work."""
-    print("\n🔐 Verifying passwords work...")
+def check_archive_password(zip_path, password, full=False):
+    """Check one archive; returns (error or None, seconds)."""
+    started = time.perf_counter()
+    try:
+        with zipfile.ZipFile(zip_path, 'r') as zf:
+            infos = zf.infolist()
+            if not infos:
+                raise ArchiveError("archive is empty")
+            check_member(zf, infos[0], password, full=full)
+        error = None
+    except Exception as e:
+        error = str(e) or type(e).__name__
+    return error, time.perf_counter() - started
+
+
+def verify_passwords_work(full=False, workers=DEFAULT_WORKERS):
+    """Test that all documented passwords actually work (all archives at once)."""
+    mode = 'full CRC/HMAC check' if full else 'header + prefix check'
+    print(f"\n🔐 Verifying passwords work ({mode}, {workers} at a time)...")
 
     passwords = load_passwords()
 
     if not passwords:
-        print("  ⚠️  No passwords in backup JSON to verify")
+        print("  ⚠️  No documented passwords to verify")
         return True
 
-    all_work = True
+    to_check = []
     for zip_file, info in sorted(passwords.items()):
         zip_path = f"solutions/{zip_file}"
-
         if not os.path.exists(zip_path):
             print(f"  ⚠️  {zip_file} - ZIP file not found (password documented but file missing)")
             continue
+        to_check.append((zip_file, zip_path, info['password']))
 
-        password = info['password']
-
-        try:
-            with zipfile.ZipFile(zip_path, 'r') as zf:
-                # Try to read first file with password
-                first_file = zf.namelist()[0]
-                zf.read(first_file, pwd=password.encode())
-            print(f"  ✅ {zip_file} - password works: {password}")
-        except Exception as e:
-            print(f"  ❌ {zip_file} - password FAILED: {password}")
-            print(f"     Error: {e}")
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        results = list(executor.map(
+            lambda item: check_archive_password(item[1], item[2], full=full), to_check))
+    elapsed = time.perf_counter() - started
+
+    all_work = True
+    for (zip_file, zip_path, password), (error, seconds) in zip(to_check, results):
+        if error is None:
+            print(f"  ✅ {zip_file} - password works: {password} "
+                  f"({encryption_method(zip_path)}, {seconds * 1000:.0f} ms)")
+        else:
+            print(f"  ❌ {zip_file} - password FAILED: {password} ({seconds * 1000:.0f} ms)")
+            print(f"     Error: {error}")
             all_work = False
 
+    if to_check:
+        total = sum(seconds for _, seconds in results)
+        print(f"  ⏱️  Checked {len(to_check)} archives in {elapsed:.2f}s "
+              f"({total:.2f}s of checks)")
+
     return all_work
 
 
@@ -169,13 +212,13 @@ def check_for_undocumented_zips():
     undocumented = [z for z in all_zips if z not in documented_zips]
 
     if undocumented:
-        print(f"  ⚠️  Found {len(undocumented)} ZIPs without JSON backup:")
+        print(f"  ⚠️  Found {len(undocumented)} ZIPs without a documented password:")
         for z in undocumented:
             print(f"     - {z}")
         print("  These may have been created with the old encrypt_solutions.py script")
         return False
     else:
-        print(f"  ✅ All {len(all_zips)} solution ZIPs have JSON backup")
+        print(f"  ✅ All {len(all_zips)} solution ZIPs are documented")
 
     return True
 
@@ -202,7 +245,7 @@ def check_old_script_disabled():
         return False
 
 
-def generate_report():
+def generate_report(full=False, workers=DEFAULT_WORKERS):
     """Generate summary report."""
     print("\n" + "=" * 60)
     print("📊 PASSWORD HEALTH REPORT")
@@ -211,8 +254,8 @@ def generate_report():
     results = {
         'gitignore_protected': check_gitignore(),
         'backup_files_exist': check_backup_files_exist(),
-        'all_documented': check_all_zips_documented(),
-        'passwords_work': verify_passwords_work(),
+        'all_documented': check_all_zips_documented(workers=workers),
+        'passwords_work': verify_passwords_work(full=full, workers=workers),
         'no_undocumented': check_for_undocumented_zips(),
         'old_script_warned': check_old_script_disabled()
     }
@@ -242,6 +285,25 @@ def generate_report():
 
 
 def main():
+    parser = argparse.ArgumentParser(
+        description='Verify solution passwords are documented, protected and working',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument(
+        '--full',
+        action='store_true',
+        help='Stream each first member completely and check its CRC/HMAC '
+             '(default: header + first 64 KB only)'
+    )
+    parser.add_argument(
+        '--workers', '-j',
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f'Archives checked in parallel (default: {DEFAULT_WORKERS})'
+    )
+    args = parser.parse_args()
+
     print("🔐 Password Health Check")
     print("=" * 60)
     print("Verifying password documentation and protection...\n")
@@ -250,7 +312,7 @@ def main():
     script_dir = Path(__file__).parent.parent
     os.chdir(script_dir)
 
-    exit_code = generate_report()
+    exit_code = generate_report(full=args.full, workers=args.workers)
     sys.exit(exit_code)
 
 
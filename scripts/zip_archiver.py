@@ -0,0 +1,520 @@
+#!/usr/bin/env python3
+"""
+Zip Archiver - Password-protected ZIP files of any number of files
+
+The encrypt scripts used to run `zip -P` with every file name on the command
+line (large directories can exceed the argument limit). This module builds
+the archive for them:
+
+- two encryption methods:
+    zipcrypto - traditional PKWARE encryption; opens with unzip, Finder,
+                Windows Explorer and Python's zipfile. Members are still
+                compressed and encrypted by the `zip` command (ZipCrypto
+                is a byte-at-a-time cipher - far too slow in Python), but
+                the file list goes through stdin (`zip -@`), so there is
+                no argument limit, and names in the archive come from the
+                members list rather than from the paths
+    aes       - WinZip AES-256 (AE-2); much stronger, opens with 7-Zip,
+                Keka, WinZip and pyzipper, but NOT with unzip or Finder.
+                Members are deflated and encrypted in a thread pool (zlib
+                and pycryptodomex release the GIL). Needs the optional
+                pycryptodomex package (requirements-aes.txt, not in
+                requirements.txt); require_method() reports it missing
+- members are streamed into the archive in order; only a bounded window of
+  members is held in memory
+- the archive is written to a temp file and renamed into place, so a failed
+  run never leaves a half-written ZIP behind
+- an archive can be updated by copying the still-encrypted bytes of its
+  unchanged members from the previous version (reuse=...), so only changed
+  files are compressed and encrypted again
+
+read_member() / check_member() / verify_password() read both kinds, so the
+scripts can check every archive they write without external tools. Password
+checks stream the member instead of buffering it, and a quick check only
+decrypts the member header and a bounded prefix.
+
+Usage:
+    from zip_archiver import write_encrypted_zip, verify_password
+
+    members = [('notebooks/hw1_solution.ipynb', 'hw1_solution.ipynb')]
+    write_encrypted_zip('solutions/solutions-hw1.zip', members, 'secret', method='aes')
+    assert verify_password('solutions/solutions-hw1.zip', 'secret')
+"""
+
+import hashlib
+import hmac
+import os
+import shutil
+import struct
+import subprocess
+import tempfile
+import time
+import zipfile
+import zlib
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Collection, List, Optional, Sequence, Tuple
+
+try:
+    from Cryptodome.Cipher import AES
+    from Cryptodome.Util import Counter
+except ImportError:  # pragma: no cover - reported when method='aes' is used
+    AES = None
+
+
+ENCRYPTION_METHODS = ['zipcrypto', 'aes']
+DEFAULT_LEVEL = 6
+DEFAULT_WORKERS = 4
+
+# Password checks read members in chunks; quick checks stop after a prefix
+CHUNK_SIZE = 1024 * 1024
+VERIFY_PREFIX = 64 * 1024
+
+# WinZip AES (AE-2) parameters for 256-bit keys
+AES_METHOD = 99
+AES_EXTRA_ID = 0x9901
+AES_STRENGTH = 3
+AES_SALT_SIZE = 16
+AES_KEY_SIZE = 32
+AES_MAC_SIZE = 10
+AES_PBKDF2_ITERATIONS = 1000
+
+FLAG_ENCRYPTED = 0x1
+FLAG_DATA_DESCRIPTOR = 0x8
+FLAG_UTF8 = 0x800
+ZIP_LIMIT = 0xFFFFFFFF
+
+
+class ArchiveError(Exception):
+    """Raised when an archive cannot be written or read."""
+    pass
+
+
+# =============================================================================
+# Encryption
+# =============================================================================
+
+def _aes_keys(password: bytes, salt: bytes) -> Tuple[bytes, bytes, bytes]:
+    derived = hashlib.pbkdf2_hmac('sha1', password, salt, AES_PBKDF2_ITERATIONS,
+                                  2 * AES_KEY_SIZE + 2)
+    return derived[:AES_KEY_SIZE], derived[AES_KEY_SIZE:2 * AES_KEY_SIZE], derived[2 * AES_KEY_SIZE:]
+
+
+def _aes_cipher(key: bytes):
+    # WinZip AES is CTR mode with a little-endian counter starting at 1
+    return AES.new(key, AES.MODE_CTR, counter=Counter.new(128, initial_value=1, little_endian=True))
+
+
+def _aes_payload(data: bytes, password: bytes) -> bytes:
+    """salt + password verifier + ciphertext + HMAC-SHA1 (first 10 bytes)."""
+    salt = os.urandom(AES_SALT_SIZE)
+    enc_key, mac_key, verifier = _aes_keys(password, salt)
+    ciphertext = _aes_cipher(enc_key).encrypt(data)
+    mac = hmac.new(mac_key, ciphertext, hashlib.sha1).digest()[:AES_MAC_SIZE]
+    return salt + verifier + ciphertext + mac
+
+
+def _aes_extra(compress_type: int) -> bytes:
+    return struct.pack('<HHH2sBH', AES_EXTRA_ID, 7, 2, b'AE', AES_STRENGTH, compress_type)
+
+
+def require_method(method: str):
+    """Raise ArchiveError if the encryption method cannot be used here."""
+    if method not in ENCRYPTION_METHODS:
+        raise ArchiveError(f"unknown encryption method {method!r} (use {', '.join(ENCRYPTION_METHODS)})")
+    if method == 'aes' and AES is None:
+        raise ArchiveError("AES-256 needs the optional pycryptodomex package, which is not "
+                           "installed: pip install -r requirements-aes.txt")
+    if method == 'zipcrypto' and shutil.which('zip') is None:
+        raise ArchiveError("ZipCrypto archives need the `zip` command "
+                           "(apt install zip / brew install zip), or use AES")
+
+
+# =============================================================================
+# Writing
+# =============================================================================
+
+def _dos_datetime(mtime: float) -> Tuple[int, int]:
+    t = time.localtime(mtime)
+    year = max(t.tm_year, 1980)
+    return (t.tm_hour << 11) | (t.tm_min << 5) | (t.tm_sec // 2), \
+        ((year - 1980) << 9) | (t.tm_mon << 5) | t.tm_mday
+
+
+def _pack_member(path: str, arcname: str, password: bytes, level: int) -> dict:
+    """Read, compress and AES-encrypt one file (runs in a worker thread)."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    stat = os.stat(path)
+    if len(data) > ZIP_LIMIT:
+        raise ArchiveError(f"{path}: files over 4 GB are not supported")
+
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+    compressed = compressor.compress(data) + compressor.flush()
+    compress_type = zipfile.ZIP_DEFLATED
+    if len(compressed) >= len(data):
+        compressed, compress_type = data, zipfile.ZIP_STORED
+
+    payload = _aes_payload(compressed, password)
+    name = arcname.replace(os.sep, '/').encode('utf-8')
+    flags = FLAG_ENCRYPTED | (FLAG_UTF8 if not arcname.isascii() else 0)
+    dos_time, dos_date = _dos_datetime(stat.st_mtime)
+    return {
+        'name': name, 'extra': _aes_extra(compress_type), 'flags': flags, 'method': AES_METHOD,
+        'version': 51, 'time': dos_time, 'date': dos_date, 'crc': 0,
+        'compressed_size': len(payload), 'size': len(data),
+        'external_attr': (stat.st_mode & 0xFFFF) << 16, 'payload': payload,
+    }
+
+
+def _pack_with_zip(members: Sequence[Tuple[str, str]], password: str, level: int,
+                   work_dir: str) -> str:
+    """
+    Compress and ZipCrypto-encrypt files with the `zip` command; returns the
+    archive it wrote, with one member per file in the given order.
+
+    Each file is linked into work_dir under its position and those names are
+    passed on stdin, so neither the number of files nor their names run into
+    the command line; write_encrypted_zip renames the members as it copies them.
+    """
+    staging = os.path.join(work_dir, 'files')
+    os.makedirs(staging)
+    names = []
+    for index, (path, _) in enumerate(members):
+        if not os.path.isfile(path):
+            raise ArchiveError(f"{path}: not a file")
+        if os.path.getsize(path) > ZIP_LIMIT:
+            raise ArchiveError(f"{path}: files over 4 GB are not supported")
+        name = str(index)
+        try:
+            os.symlink(os.path.abspath(path), os.path.join(staging, name))
+        except OSError:  # no symlinks (Windows without developer mode)
+            shutil.copy2(path, os.path.join(staging, name))
+        names.append(name)
+
+    archive = os.path.abspath(os.path.join(work_dir, 'packed.zip'))
+    # -X: no extra attributes, so members look like the ones _pack_member writes
+    result = subprocess.run(['zip', '-q', '-X', f'-{level}', '-P', password, '-@', archive],
+                            cwd=staging, input='\n'.join(names) + '\n',
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        raise ArchiveError(f"zip failed (exit {result.returncode}): {result.stderr.strip()}")
+    return archive
+
+
+def _split_by_size(members: Sequence[Tuple[str, str]], parts: int) -> List[list]:
+    """Split members into up to `parts` consecutive runs of similar total size."""
+    sizes = [os.path.getsize(path) if os.path.isfile(path) else 0 for path, _ in members]
+    target = sum(sizes) / max(1, parts)
+    chunks, total = [[]], 0
+    for member, size in zip(members, sizes):
+        if chunks[-1] and len(chunks) < parts and total >= target * len(chunks):
+            chunks.append([])
+        chunks[-1].append(member)
+        total += size
+    return chunks
+
+
+def _reusable(info: zipfile.ZipInfo) -> bool:
+    """
+    Whether a member's stored bytes can be copied into a new archive as is:
+    it must be encrypted and have a name that is stored unambiguously.
+    """
+    return bool(info.flag_bits & FLAG_ENCRYPTED) \
+        and (info.filename.isascii() or bool(info.flag_bits & FLAG_UTF8))
+
+
+def _copy_member(zf: zipfile.ZipFile, info: zipfile.ZipInfo, arcname: Optional[str] = None) -> dict:
+    """
+    An existing member's stored (compressed + encrypted) bytes, unchanged,
+    optionally under a new name. ZipCrypto's password check byte comes from
+    the CRC or, with a data descriptor, from the modification time - never
+    from the name - so both are kept as they are.
+    """
+    year, month, day, hour, minute, second = info.date_time
+    name = info.filename if arcname is None else arcname.replace(os.sep, '/')
+    flags = info.flag_bits & ~FLAG_UTF8 | (FLAG_UTF8 if not name.isascii() else 0)
+    return {
+        'name': name.encode('utf-8'), 'extra': info.extra,
+        'flags': flags, 'method': info.compress_type, 'version': info.extract_version,
+        'time': (hour << 11) | (minute << 5) | (second // 2),
+        'date': ((year - 1980) << 9) | (month << 5) | day, 'crc': info.CRC,
+        'compressed_size': info.compress_size, 'size': info.file_size,
+        'external_attr': info.external_attr, 'payload': _raw_member(zf, info),
+    }
+
+
+def write_encrypted_zip(output_path, members: Sequence[Tuple[str, str]], password: str,
+                        method: str = 'zipcrypto', level: int = DEFAULT_LEVEL,
+                        workers: int = DEFAULT_WORKERS, reuse_from=None,
+                        reuse: Collection[str] = ()) -> int:
+    """
+    Write an encrypted ZIP of (file path, name in archive) members.
+
+    Members are compressed and encrypted up to `workers` at a time (ZipCrypto
+    by that many `zip` runs over consecutive members, AES in threads) and
+    written in the given order.
+    Members named in `reuse` are copied as
+    stored bytes from the existing archive `reuse_from` instead (it must
+    have been written with the same password and method), so updating an
+    archive only re-encrypts the files that changed; members that are not
+    there or cannot be copied are packed from their file as usual.
+    Replaces output_path atomically; returns the number of members written.
+    """
+    require_method(method)
+    if not members:
+        raise ArchiveError("no files to archive")
+    if len(members) > 0xFFFF:
+        raise ArchiveError("more than 65535 files are not supported")
+
+    output_path = os.fspath(output_path)
+    output_dir = os.path.dirname(output_path) or '.'
+    os.makedirs(output_dir, exist_ok=True)
+    secret = password.encode('utf-8')
+
+    previous = work_dir = None
+    packed = []
+    stored = {}
+    fd, tmp_path = tempfile.mkstemp(prefix='.zip.', suffix='.tmp', dir=output_dir)
+    try:
+        if reuse:
+            previous = zipfile.ZipFile(reuse_from)
+            stored = {info.filename: info for info in previous.infolist() if _reusable(info)}
+
+        def reused(member) -> Optional[zipfile.ZipInfo]:
+            return stored.get(member[1].replace(os.sep, '/')) if member[1] in reuse else None
+
+        if method == 'zipcrypto':
+            to_pack = [member for member in members if reused(member) is None]
+            if to_pack:
+                work_dir = tempfile.mkdtemp(prefix='.zip.', dir=output_dir)
+                chunks = _split_by_size(to_pack, max(1, workers))
+                with ThreadPoolExecutor(max_workers=len(chunks)) as executor:
+                    paths = list(executor.map(
+                        lambda index: _pack_with_zip(chunks[index], password, level,
+                                                     os.path.join(work_dir, str(index))),
+                        range(len(chunks))))
+                packed = [zipfile.ZipFile(path) for path in paths]
+                packed_infos = [(zf, info) for zf in packed for info in zf.infolist()]
+                if len(packed_infos) != len(to_pack):
+                    raise ArchiveError(f"zip wrote {len(packed_infos)} of {len(to_pack)} files")
+                packed_infos = iter(packed_infos)
+
+        with os.fdopen(fd, 'wb') as out, ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            central = []
+            in_flight = deque()
+            pending = iter(members)
+
+            def schedule():
+                while len(in_flight) < 2 * max(1, workers):
+                    member = next(pending, None)
+                    if member is None:
+                        return
+                    info = reused(member)
+                    if info is not None or packed:
+                        # Plain read of already-encrypted bytes: no worker needed
+                        copied = Future()
+                        copied.set_result(_copy_member(previous, info) if info is not None
+                                          else _copy_member(*next(packed_infos), member[1]))
+                        in_flight.append(copied)
+                        continue
+                    in_flight.append(executor.submit(_pack_member, member[0], member[1],
+                                                     secret, level))
+
+            schedule()
+            while in_flight:
+                entry = in_flight.popleft().result()
+                schedule()
+                entry['offset'] = out.tell()
+                if entry['offset'] > ZIP_LIMIT:
+                    raise ArchiveError("archives over 4 GB are not supported")
+                out.write(struct.pack(
+                    '<IHHHHHIIIHH', 0x04034B50, entry['version'], entry['flags'], entry['method'],
+                    entry['time'], entry['date'], entry['crc'], entry['compressed_size'],
+                    entry['size'], len(entry['name']), len(entry['extra'])))
+                out.write(entry['name'])
+                out.write(entry['extra'])
+                out.write(entry.pop('payload'))
+                if entry['flags'] & FLAG_DATA_DESCRIPTOR:
+                    # `zip` streams ZipCrypto members with a trailing descriptor
+                    out.write(struct.pack('<IIII', 0x08074B50, entry['crc'],
+                                          entry['compressed_size'], entry['size']))
+                central.append(entry)
+
+            directory_offset = out.tell()
+            for entry in central:
+                out.write(struct.pack(
+                    '<IHHHHHHIIIHHHHHII', 0x02014B50, (3 << 8) | entry['version'], entry['version'],
+                    entry['flags'], entry['method'], entry['time'], entry['date'], entry['crc'],
+                    entry['compressed_size'], entry['size'], len(entry['name']),
+                    len(entry['extra']), 0, 0, 0, entry['external_attr'], entry['offset']))
+                out.write(entry['name'])
+                out.write(entry['extra'])
+            directory_size = out.tell() - directory_offset
+            out.write(struct.pack('<IHHHHIIH', 0x06054B50, 0, 0, len(central), len(central),
+                                  directory_size, directory_offset, 0))
+
+        os.chmod(tmp_path, 0o644)  # mkstemp creates files as 0600
+        os.replace(tmp_path, output_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    finally:
+        for archive in [previous] + packed:
+            if archive is not None:
+                archive.close()
+        if work_dir is not None:
+            shutil.rmtree(work_dir, ignore_errors=True)
+    return len(members)
+
+
+# =============================================================================
+# Reading
+# =============================================================================
+
+def _aes_compress_type(info: zipfile.ZipInfo) -> Optional[int]:
+    extra = info.extra
+    while len(extra) >= 4:
+        header_id, size = struct.unpack('<HH', extra[:4])
+        if header_id == AES_EXTRA_ID and size >= 7:
+            return struct.unpack('<H', extra[9:11])[0]
+        extra = extra[4 + size:]
+    return None
+
+
+def _seek_member_data(zf: zipfile.ZipFile, info: zipfile.ZipInfo):
+    """Position the archive file at a member's stored bytes; returns the file."""
+    zf.fp.seek(info.header_offset)
+    header = zf.fp.read(30)
+    if header[:4] != b'PK\x03\x04':
+        raise ArchiveError(f"{info.filename}: bad local header")
+    name_len, extra_len = struct.unpack('<HH', header[26:30])
+    zf.fp.seek(info.header_offset + 30 + name_len + extra_len)
+    return zf.fp
+
+
+def _raw_member(zf: zipfile.ZipFile, info: zipfile.ZipInfo) -> bytes:
+    """Stored bytes of a member (after its local header)."""
+    return _seek_member_data(zf, info).read(info.compress_size)
+
+
+def read_member(zf: zipfile.ZipFile, info: zipfile.ZipInfo, password: str) -> bytes:
+    """
+    Decrypted contents of one member (ZipCrypto or WinZip AES).
+
+    Raises RuntimeError (like zipfile) for a wrong password and ArchiveError
+    for a damaged member.
+    """
+    if info.compress_type != AES_METHOD:
+        return zf.read(info, pwd=password.encode('utf-8'))
+
+    require_method('aes')
+    compress_type = _aes_compress_type(info)
+    if compress_type is None:
+        raise ArchiveError(f"{info.filename}: missing AES extra field")
+    raw = _raw_member(zf, info)
+    salt = raw[:AES_SALT_SIZE]
+    verifier = raw[AES_SALT_SIZE:AES_SALT_SIZE + 2]
+    ciphertext = raw[AES_SALT_SIZE + 2:-AES_MAC_SIZE]
+    mac = raw[-AES_MAC_SIZE:]
+
+    enc_key, mac_key, expected_verifier = _aes_keys(password.encode('utf-8'), salt)
+    if not hmac.compare_digest(verifier, expected_verifier):
+        raise RuntimeError(f"Bad password for file {info.filename!r}")
+    if not hmac.compare_digest(mac, hmac.new(mac_key, ciphertext, hashlib.sha1).digest()[:AES_MAC_SIZE]):
+        raise ArchiveError(f"{info.filename}: authentication code mismatch (corrupt archive)")
+
+    data = _aes_cipher(enc_key).decrypt(ciphertext)
+    if compress_type == zipfile.ZIP_DEFLATED:
+        data = zlib.decompress(data, -15)
+    elif compress_type != zipfile.ZIP_STORED:
+        raise ArchiveError(f"{info.filename}: unsupported compression method {compress_type}")
+    return data
+
+
+def check_member(zf: zipfile.ZipFile, info: zipfile.ZipInfo, password: str, full: bool = False):
+    """
+    Check a password against one member without buffering it.
+
+    Quick (default): the password check in the member header (1 byte for
+    ZipCrypto, 2 for AES) plus decrypting and inflating the first
+    VERIFY_PREFIX bytes - a wrong password that slips past the header check
+    produces an invalid deflate stream almost immediately. Stored
+    (uncompressed) members have no deflate stream to catch it, so they are
+    always checked in full.
+
+    full=True: stream the whole member in chunks and check its CRC-32
+    (ZipCrypto) or HMAC (AES).
+
+    Raises RuntimeError for a wrong password; zipfile.BadZipFile,
+    zlib.error or ArchiveError if the data does not check out.
+    """
+    if info.compress_type != AES_METHOD:
+        full = full or info.compress_type == zipfile.ZIP_STORED
+        # zipfile decrypts and inflates lazily; the CRC is checked at EOF
+        with zf.open(info, pwd=password.encode('utf-8')) as member:
+            if not full:
+                member.read(VERIFY_PREFIX)
+                return
+            while member.read(CHUNK_SIZE):
+                pass
+        return
+
+    require_method('aes')
+    compress_type = _aes_compress_type(info)
+    if compress_type is None:
+        raise ArchiveError(f"{info.filename}: missing AES extra field")
+    full = full or compress_type == zipfile.ZIP_STORED
+    fp = _seek_member_data(zf, info)
+    salt = fp.read(AES_SALT_SIZE)
+    verifier = fp.read(2)
+    enc_key, mac_key, expected_verifier = _aes_keys(password.encode('utf-8'), salt)
+    if not hmac.compare_digest(verifier, expected_verifier):
+        raise RuntimeError(f"Bad password for file {info.filename!r}")
+
+    cipher = _aes_cipher(enc_key)
+    mac = hmac.new(mac_key, digestmod=hashlib.sha1)
+    inflater = zlib.decompressobj(-15) if compress_type == zipfile.ZIP_DEFLATED else None
+    body_size = info.compress_size - AES_SALT_SIZE - 2 - AES_MAC_SIZE
+    remaining = body_size if full else min(body_size, VERIFY_PREFIX)
+    while remaining > 0:
+        chunk = fp.read(min(CHUNK_SIZE, remaining))
+        if not chunk:
+            raise ArchiveError(f"{info.filename}: truncated member")
+        remaining -= len(chunk)
+        mac.update(chunk)
+        plain = cipher.decrypt(chunk)
+        while inflater is not None and plain:
+            # Bounded output per call: highly compressed notebooks inflate 20x+
+            inflater.decompress(plain, CHUNK_SIZE)
+            plain = inflater.unconsumed_tail
+    if full:
+        if not hmac.compare_digest(fp.read(AES_MAC_SIZE), mac.digest()[:AES_MAC_SIZE]):
+            raise ArchiveError(f"{info.filename}: authentication code mismatch (corrupt archive)")
+        if inflater is not None and not inflater.eof:
+            raise ArchiveError(f"{info.filename}: truncated deflate stream")
+
+
+def verify_password(zip_path, password: str, full: bool = True) -> bool:
+    """True if password opens the first member of the archive (see check_member)."""
+    with zipfile.ZipFile(zip_path, 'r') as zf:
+        infos = zf.infolist()
+        if not infos:
+            return False
+        try:
+            check_member(zf, infos[0], password, full=full)
+        except (RuntimeError, zipfile.BadZipFile, zlib.error):
+            # A wrong ZipCrypto password passes the 1-byte check 1 time in 256
+            # and then fails on decompression or the CRC
+            return False
+    return True
+
+
+def encryption_method(zip_path) -> str:
+    """'aes', 'zipcrypto' or 'none' (from the first member)."""
+    with zipfile.ZipFile(zip_path, 'r') as zf:
+        infos = zf.infolist()
+    if not infos or not infos[0].flag_bits & FLAG_ENCRYPTED:
+        return 'none'
+    return 'aes' if infos[0].compress_type == AES_METHOD else 'zipcrypto'